@@ -1,4 +1,5 @@
 
+import itertools
 import pandas as pd
 import numpy as np
 from typing import Dict, List
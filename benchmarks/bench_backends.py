@@ -0,0 +1,68 @@
+'''
+Speed of the recursive indicators on each smoothing backend.
+
+    python -m benchmarks.bench_backends [--sizes 10000 1000000 10000000] [--repeat 3]
+'''
+import argparse
+import time
+import numpy as np
+from indicators import smoothing
+from indicators.rsi import RSI
+from indicators.macd import MACD
+from indicators.atr import ATR
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes=DEFAULT_SIZES, repeat=3, seed=0):
+    backends = ['numpy'] + (['numba'] if smoothing.numba is not None else [])
+    previous = smoothing.get_backend()
+    results = []
+    rng = np.random.default_rng(seed)
+    try:
+        for size in sizes:
+            close = 100 + np.cumsum(rng.normal(0, 1, size))
+            high = close + rng.random(size)
+            low = close - rng.random(size)
+            cases = {
+                'EMA(20)': lambda: smoothing.ema(close, 20),
+                'RSI(14)': lambda: RSI(14).calculate(close),
+                'MACD(12,26,9)': lambda: MACD(12, 26, 9).calculate(close),
+                'ATR(14)': lambda: ATR(14).calculate(high, low, close),
+            }
+            for name, function in cases.items():
+                row = {'indicator': name, 'bars': size}
+                for backend in backends:
+                    smoothing.set_backend(backend)
+                    function()  # warm up (JIT compilation, page faults)
+                    row[backend] = best_time(function, repeat)
+                results.append(row)
+    finally:
+        smoothing.set_backend(previous)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for row in run(args.sizes, args.repeat):
+        line = f"{row['indicator']:<14} {row['bars']:>10,} bars  numpy {row['numpy'] * 1e3:9.2f} ms"
+        if 'numba' in row:
+            line += f"  numba {row['numba'] * 1e3:9.2f} ms  speedup x{row['numpy'] / row['numba']:.1f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
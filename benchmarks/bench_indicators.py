@@ -0,0 +1,161 @@
+'''
+Microbenchmarks of the indicators package, batch and streaming, per storage dtype.
+
+    python -m benchmarks.bench_indicators --output results.json
+    python -m benchmarks.bench_indicators --output new.json --compare results.json --tolerance 0.2
+
+Batch cases time `calculate` on the full series. Streaming cases time
+`update` over at most --stream-bars bars after seeding, and report the mean
+cost per update (a Python-level loop over 10M bars would only measure the
+interpreter). With --compare, cases slower than the baseline by more than
+--tolerance are reported and the exit status is 1.
+'''
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+from benchmarks.bench_backends import best_time
+from indicators import smoothing
+from indicators.rsi import RSI, StreamingRSI
+from indicators.macd import MACD, StreamingMACD
+from indicators.bollinger_bands import BollingerBands, StreamingBollingerBands
+from indicators.ema import EMA, StreamingEMA
+from indicators.sma import SMA, StreamingSMA
+from indicators.atr import ATR, StreamingATR
+from indicators.dmi import DMI, StreamingDMI
+from indicators.adx import ADX, StreamingADX
+from utils.precision import set_precision, get_storage_dtype, PRECISIONS
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+DEFAULT_STREAM_BARS = 100_000
+
+# name -> (batch indicator, streaming indicator, takes high/low/close)
+CASES = {
+    'RSI(14)': (lambda: RSI(14), lambda: StreamingRSI(14), False),
+    'MACD(12,26,9)': (lambda: MACD(12, 26, 9), lambda: StreamingMACD(12, 26, 9), False),
+    'BollingerBands(20,2)': (lambda: BollingerBands(20, 2), lambda: StreamingBollingerBands(20, 2), False),
+    'EMA(20)': (lambda: EMA(20), lambda: StreamingEMA(20), False),
+    'SMA(20)': (lambda: SMA(20), lambda: StreamingSMA(20), False),
+    'ATR(14)': (lambda: ATR(14), lambda: StreamingATR(14), True),
+    'DMI(14)': (lambda: DMI(14), lambda: StreamingDMI(14), True),
+    'ADX(14)': (lambda: ADX(14), lambda: StreamingADX(14), True),
+}
+
+
+def make_bars(size, dtype, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    high = close + rng.random(size)
+    low = close - rng.random(size)
+    return high.astype(dtype), low.astype(dtype), close.astype(dtype)
+
+
+def time_streaming(factory, bars, ohlc, stream_bars):
+    high, low, close = bars
+    updates = min(stream_bars, len(close) - 1)
+    seed_end = len(close) - updates
+    indicator = factory()
+    if ohlc:
+        indicator.seed(high[:seed_end], low[:seed_end], close[:seed_end])
+        tail = list(zip(high[seed_end:].tolist(), low[seed_end:].tolist(), close[seed_end:].tolist()))
+        start = time.perf_counter()
+        for bar in tail:
+            indicator.update(*bar)
+    else:
+        indicator.seed(close[:seed_end])
+        tail = close[seed_end:].tolist()
+        start = time.perf_counter()
+        for price in tail:
+            indicator.update(price)
+    return (time.perf_counter() - start) / max(updates, 1)
+
+
+def run(sizes=DEFAULT_SIZES, dtypes=tuple(PRECISIONS), repeat=3, stream_bars=DEFAULT_STREAM_BARS, cases=None):
+    previous = get_storage_dtype()
+    results = []
+    try:
+        for dtype_name in dtypes:
+            set_precision(dtype_name)
+            for size in sizes:
+                bars = make_bars(size, PRECISIONS[dtype_name])
+                for name in cases or CASES:
+                    batch, streaming, ohlc = CASES[name]
+                    inputs = bars if ohlc else bars[2:]
+                    indicator = batch()
+                    indicator.calculate(*inputs)  # warm up
+                    results.append({'indicator': name, 'mode': 'batch', 'dtype': dtype_name, 'bars': size,
+                                    'seconds': best_time(lambda: indicator.calculate(*inputs), repeat)})
+                    results.append({'indicator': name, 'mode': 'streaming', 'dtype': dtype_name, 'bars': size,
+                                    'seconds_per_update': time_streaming(streaming, bars, ohlc, stream_bars)})
+    finally:
+        set_precision(np.dtype(previous).name)
+    return results
+
+
+def case_key(result):
+    return (result['indicator'], result['mode'], result['dtype'], result['bars'])
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Cases whose time grew by more than `tolerance` (relative) against the baseline.
+    '''
+    reference = {case_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = reference.get(case_key(result))
+        if previous is None:
+            continue
+        metric = 'seconds' if result['mode'] == 'batch' else 'seconds_per_update'
+        ratio = result[metric] / previous[metric] if previous[metric] else float('inf')
+        if ratio > 1 + tolerance:
+            regressions.append(dict(result, baseline=previous[metric], ratio=ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--dtypes', nargs='+', choices=list(PRECISIONS), default=list(PRECISIONS))
+    parser.add_argument('--indicators', nargs='+', choices=list(CASES), default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stream-bars', type=int, default=DEFAULT_STREAM_BARS)
+    parser.add_argument('--output', help="JSON file to write the results to")
+    parser.add_argument('--compare', help="baseline JSON file written by a previous run")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.dtypes, args.repeat, args.stream_bars, args.indicators)
+    for result in results:
+        if result['mode'] == 'batch':
+            timing = f"{result['seconds'] * 1e3:10.3f} ms"
+        else:
+            timing = f"{result['seconds_per_update'] * 1e6:10.3f} us/update"
+        print(f"{result['indicator']:<22} {result['mode']:<9} {result['dtype']:<7} {result['bars']:>10,}  {timing}")
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'backend': smoothing.get_backend(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['indicator']} {regression['mode']} {regression['dtype']} "
+                  f"{regression['bars']:,} bars: x{regression['ratio']:.2f} vs baseline")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,9 @@
 EXCHANGE = {
     'name': 'binance',
     'api_key': 'YOUR_API_KEY_HERE',
-    'secret_key': 'YOUR_SECRET_KEY_HERE'
+    'secret_key': 'YOUR_SECRET_KEY_HERE',
+    # Durée (s) de mise en cache des réponses par endpoint ; les requêtes identiques simultanées sont toujours mutualisées
+    'cache_ttl': {'get_ticker': 0.5, 'get_tickers': 0.5}
 }
 
 # Paramètres de trading
@@ -68,6 +70,12 @@ PERFORMANCE = {
     'benchmark': 'DOGE/USDT',  # Symbole à utiliser comme référence pour la performance
 }
 
+# Précision de stockage des bougies et des buffers d'indicateurs
+# 'float32' divise par deux la mémoire des historiques ; les calculs restent en float64 (voir utils/precision.py)
+PRECISION = {
+    'dtype': 'float64'
+}
+
 # Paramètres de logging
 LOGGING = {
     'level': 'INFO',
@@ -80,6 +88,20 @@ DATABASE = {
     'type': 'sqlite'
 }
 
+# Stockage local des bougies (Parquet partitionné par symbole/timeframe/jour, nécessite pyarrow)
+DATA_STORE = {
+    'path': 'data/candles',
+    # Progression des backfills, pour reprendre un téléchargement interrompu
+    'backfill_checkpoint': 'data/candles/backfill.json'
+}
+
+# Flux de marché en streaming (WebSocket au format MarketStream) ; sans URL, les tickers sont interrogés par polling
+STREAM = {
+    'url': None,
+    # Bougies construites à partir des trades du flux (TradingEngine.stream_candles) au lieu du polling OHLCV
+    'trade_candles': True
+}
+
 # Paramètres de backtesting
 BACKTESTING = {
     'start_date': '2023-01-01',
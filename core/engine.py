@@ -1,16 +1,24 @@
 
 import asyncio
+import time
+import pandas as pd
 from typing import Dict, List
 from core.exchange_handler import ExchangeHandler
 from core.plugin_manager import PluginManager
 from data.exchange_data import ExchangeData
 from data.historical_data import HistoricalData
+from data.candle_store import CandleStore
+from data.backfill import BackfillCheckpoint
+from data.resampler import can_resample
+from utils.timeframes import timeframe_to_ms, align
+from data.trade_aggregator import TradeAggregator
+from data.database import Database
 from portfolio_management.portfolio import Portfolio
 from portfolio_management.risk_management import RiskManager
 from utils.logging_config import setup_logging
 from utils.volatility_analyzer import VolatilityAnalyzer
 from analysis.parameter_optimizer import ParameterOptimizer
-from utils.error_handling import error_handler, StrategyError
+from utils.error_handling import error_handler, StrategyError, DataError
 from strategies.grid_trading_strategy import GridTradingStrategy
 from strategies.breakout_strategy import BreakoutStrategy
 
@@ -25,26 +33,121 @@ class TradingEngine:
         self.volatility_analyzer = VolatilityAnalyzer()
         self.exchange_handler = ExchangeHandler(config['exchange'])
         self.plugin_manager = PluginManager()
-        self.exchange_data = ExchangeData(self.exchange_handler)
-        self.historical_data = HistoricalData(self.exchange_handler)
-        self.portfolio = Portfolio(config['TRADING_PARAMS']['initial_balance'])
+        store_path = config.get('data_store_path')
+        store = CandleStore(store_path) if store_path else None
+        # Un seul checkpoint partagé : les backfills interrompus reprennent au redémarrage
+        checkpoint_path = config.get('backfill_checkpoint')
+        checkpoint = BackfillCheckpoint(checkpoint_path) if store is not None and checkpoint_path else None
+        self.exchange_data = ExchangeData(self.exchange_handler, store=store, checkpoint=checkpoint)
+        self.historical_data = HistoricalData(self.exchange_handler, store, checkpoint=checkpoint)
+        database_path = config.get('database_path')
+        self.database = Database(database_path) if database_path else None
+        self.portfolio = Portfolio(config['TRADING_PARAMS']['initial_balance'], ledger=self.database)
         self.risk_manager = RiskManager(config['RISK_MANAGEMENT'])
         
         self.strategies = []
         self.running = False
         self.data_manager = None
         self.sentiment_analyzer = None
+        self.trade_aggregator = None
 
         # Update trading pairs
         self.trading_pairs = config['TRADING_PARAMS']['symbols']
+        self.base_timeframe = config.get('base_timeframe', '1m')
 
     async def initialize_historical_data(self):
         self.logger.info("Initializing historical data...")
+        # La base (1m) est téléchargée sur assez de bougies pour agréger localement les timeframes
+        # qu'elle couvre ; les autres (4h, 1d avec les valeurs par défaut) sont téléchargés directement
+        base_timeframe = self.base_timeframe
+        timeframes = [timeframe for timeframe in self.config['TRADING_PARAMS']['timeframes'] if timeframe != base_timeframe]
+        history_bars = self.config.get('history_bars', 500)
+        base_span = self.config.get('max_base_bars', 50_000) * timeframe_to_ms(base_timeframe)
+        derived = [timeframe for timeframe in timeframes
+                   if can_resample(base_timeframe, timeframe) and history_bars * timeframe_to_ms(timeframe) <= base_span]
+        span = max(history_bars * timeframe_to_ms(timeframe) for timeframe in [base_timeframe] + derived)
+        end = pd.Timestamp(int(time.time() * 1000), unit='ms')
+        store = self.historical_data.store
         for symbol in self.trading_pairs:
-            for timeframe in self.config['TRADING_PARAMS']['timeframes']:
-                await self.historical_data.update_data(symbol, timeframe)
+            if store is not None:
+                # Chaque requête ajoute un fichier par jour : on fusionne ceux des exécutions précédentes
+                for timeframe in [base_timeframe] + timeframes:
+                    store.compact(symbol, timeframe)
+                self.historical_data.load_from_store(symbol, base_timeframe, end - pd.Timedelta(milliseconds=span))
+            try:
+                await self.historical_data.backfill_missing(symbol, base_timeframe, end - pd.Timedelta(milliseconds=span), end)
+            except DataError as e:
+                self.logger.error(f"Incomplete {base_timeframe} history for {symbol}: {e}")
+            for timeframe in timeframes:
+                if timeframe in derived:
+                    self.historical_data.derive_timeframe(symbol, base_timeframe, timeframe)
+                else:
+                    await self.historical_data.update_data(symbol, timeframe)
+            # Les bougies de base ajoutées ensuite mettent à jour tous les timeframes agrégeables
+            tracked = [timeframe for timeframe in timeframes if can_resample(base_timeframe, timeframe)]
+            if tracked:
+                self.historical_data.track_timeframes(symbol, base_timeframe, tracked)
         self.logger.info("Historical data initialization complete.")
 
+    def stream_candles(self, stream, timeframes=None, allowed_lateness=2_000):
+        '''
+        Construit les bougies à partir des trades du stream au lieu du polling
+        REST : chaque bougie clôturée est écrite dans les buffers de
+        HistoricalData, et dans ceux d'ExchangeData pour le 1m.
+
+        Seul le timeframe de base est agrégé (plus ceux qui ne s'en déduisent
+        pas) : ses bougies mettent à jour les autres via les Resampler de
+        HistoricalData (track_timeframes), un seul producteur par timeframe.
+        '''
+        timeframes = timeframes or self.config['TRADING_PARAMS']['timeframes']
+        aggregated = [self.base_timeframe] + [timeframe for timeframe in timeframes
+                                              if timeframe != self.base_timeframe and not can_resample(self.base_timeframe, timeframe)]
+        self.trade_aggregator = TradeAggregator(aggregated, allowed_lateness, self.on_bar_close)
+        for symbol in self.trading_pairs:
+            stream.subscribe('trades', symbol, self.on_trades)
+        # Trades perdus (trou de séquence) : les bougies manquées sont rechargées en REST
+        stream.on_gap(self.on_stream_gap)
+
+    async def on_stream_gap(self, channel, symbol, expected_seq, received_seq):
+        if channel != 'trades' or self.trade_aggregator is None or symbol not in self.trading_pairs:
+            return
+        try:
+            count = await self.resync_candles(symbol)
+            self.logger.info(f"Trades {expected_seq}-{received_seq - 1} of {symbol} missed: {count} candles reloaded")
+        except DataError as e:
+            self.logger.error(f"Resync of {symbol} after a stream gap incomplete: {e}")
+
+    async def resync_candles(self, symbol):
+        '''
+        Recharge en REST (Backfill) les bougies de base clôturées depuis la
+        dernière connue. Les barres partielles de l'agrégateur sont abandonnées
+        et les bougies rechargées passent par on_bar_close comme celles du
+        stream. Renvoie le nombre de bougies rechargées.
+        '''
+        base_timeframe = self.base_timeframe
+        step = timeframe_to_ms(base_timeframe)
+        # La bougie en cours reste construite à partir des trades
+        end = align(int(time.time() * 1000), base_timeframe)
+        window = self.historical_data.data.window(f"{symbol}_{base_timeframe}", 1)
+        # La dernière bougie connue est rechargée aussi : elle a pu être clôturée sans tous ses trades
+        start = int(window.timestamp[-1]) if len(window) else end - self.config.get('history_bars', 500) * step
+        self.trade_aggregator.discard_until(symbol, end)
+        if start >= end:
+            return 0
+        rows = await self.historical_data.backfill.run(symbol, base_timeframe, start, end)
+        for row in rows:
+            self.on_bar_close(symbol, base_timeframe, row)
+        return len(rows)
+
+    def on_trades(self, symbol, trades):
+        self.trade_aggregator.add_trades(symbol, trades if isinstance(trades, list) else [trades])
+
+    def on_bar_close(self, symbol, timeframe, bar):
+        self.historical_data.append_candle(symbol, timeframe, bar)
+        if timeframe == '1m':
+            self.exchange_data.data.buffer(symbol).append(*bar)
+            self.exchange_data.cache.add(symbol, bar)
+
     def set_data_manager(self, data_manager):
         self.data_manager = data_manager
         self.logger.info("RealTimeDataManager set in TradingEngine")
@@ -84,6 +187,8 @@ class TradingEngine:
         for strategy in self.strategies:
             if hasattr(strategy, 'cleanup'):
                 strategy.cleanup()
+        if self.database:
+            self.database.close()
         self.logger.info("Trading engine stopped.")
 
     def get_available_symbols(self):
@@ -107,7 +212,19 @@ class TradingEngine:
     async def update_market_data(self):
         while self.running:
             try:
-                await self.exchange_data.update()
+                if self.trade_aggregator is None:
+                    await self.exchange_data.update()
+                    if self.base_timeframe == '1m':
+                        # Bougie 1m en cours : sa clôture met à jour les timeframes agrégés de HistoricalData
+                        for symbol in self.trading_pairs:
+                            candle = self.exchange_data.data.buffer(symbol).last()
+                            if candle is not None:
+                                self.historical_data.append_candle(symbol, '1m', candle)
+                else:
+                    # Bougies construites depuis les trades : clôture sur l'horloge pour les marchés sans trade
+                    now = int(time.time() * 1000) - self.trade_aggregator.allowed_lateness
+                    for symbol in self.trading_pairs:
+                        self.trade_aggregator.advance_watermark(symbol, now)
                 latest_data = self.exchange_data.get_latest_data()
                 self.volatility_analyzer.update(latest_data)
                 self.adjust_strategies_for_volatility()
@@ -218,6 +335,7 @@ class TradingEngine:
         if self.risk_manager.check_risk(signal, self.portfolio):
             order = await self.exchange_handler.place_order(signal)
             if order:
+                self.record_order(order)
                 self.portfolio.update(order)
                 self.logger.info(f"Order placed: {order}")
 
@@ -244,9 +362,12 @@ class TradingEngine:
                 try:
                     for symbol in strategy.symbols:
                         latest_data = self.data_manager.get_latest_data(symbol)
-                        historical_data = await self.get_historical_data(symbol, strategy.timeframe)
+                        # Le dernier prix met à jour la bougie ouverte dans le buffer, sans concaténation
+                        if latest_data:
+                            self.historical_data.update_from_ticker(symbol, strategy.timeframe, latest_data)
+                        candles = await self.get_historical_data(symbol, strategy.timeframe)
                         sentiment_score = await self.sentiment_analyzer.analyze(symbol)
-                        analysis_result = await strategy.analyze(symbol, strategy.timeframe, historical_data + latest_data, sentiment_score)
+                        analysis_result = await strategy.analyze(symbol, strategy.timeframe, candles, sentiment_score)
                         signal = await strategy.generate_signal(analysis_result)
                         if signal and self.risk_manager.check_risk(signal, self.portfolio):
                             order = await self.execute_trade(signal)
@@ -273,11 +394,17 @@ class TradingEngine:
                 take_profit=take_profit
             )
             self.logger.info(f"Executed trade: {order}")
+            if order:
+                self.record_order(order)
             return order
         except Exception as e:
             self.logger.error(f"Error executing trade: {e}")
             return None
 
+    def record_order(self, order):
+        if self.database and isinstance(order, dict) and order.get('id') is not None:
+            self.database.record_order(order)
+
     async def get_historical_data(self, symbol: str, timeframe: str, limit: int = 100):
         return await self.historical_data.get_candles(symbol, timeframe, limit)
 
@@ -2,11 +2,13 @@
 import asyncio
 import ccxt.async_support as ccxt
 from typing import Dict
+from core.order_book import OrderBook, OrderBookOutOfSync
+from core.request_coalescer import RequestCoalescer, coalesced
 from utils.logging_config import setup_logging
 
 class ExchangeHandler:
     def __init__(self, exchange_config: Dict):
-        self.logger = setup_logging()
+        self.logger, _ = setup_logging()
         self.exchange_name = exchange_config['name']
         self.exchange = getattr(ccxt, self.exchange_name)({
             'apiKey': exchange_config['api_key'],
@@ -15,11 +17,18 @@ class ExchangeHandler:
         })
         self.markets = {}
         self.rate_limiter = asyncio.Semaphore(10)  # Limit to 10 requests per second
+        # Identical concurrent read requests share one API call; optional short cache per endpoint, e.g. {'get_ticker': 0.5}
+        self.coalescer = RequestCoalescer(exchange_config.get('cache_ttl'))
+        # Local order books kept up to date by apply_order_book_update
+        self.order_books: Dict[str, OrderBook] = {}
+        # symbol -> stream applying its deltas (track_order_book)
+        self.order_book_streams = {}
 
     async def initialize(self):
         self.logger.info(f"Initializing {self.exchange_name} exchange handler")
         self.markets = await self.exchange.load_markets()
 
+    @coalesced
     async def get_ticker(self, symbol: str) -> Dict:
         async with self.rate_limiter:
             try:
@@ -28,7 +37,52 @@ class ExchangeHandler:
                 self.logger.error(f"Error fetching ticker for {symbol}: {e}")
                 return {}
 
-    async def get_order_book(self, symbol: str) -> Dict:
+    @coalesced
+    async def get_tickers(self, symbols, concurrency: int = 5) -> Dict:
+        '''
+        Tickers of several symbols: one fetch_tickers request when the exchange
+        supports it, otherwise at most `concurrency` get_ticker calls at a time.
+        '''
+        if self.exchange.has.get('fetchTickers'):
+            async with self.rate_limiter:
+                try:
+                    tickers = await self.exchange.fetch_tickers(list(symbols))
+                    return {symbol: tickers[symbol] for symbol in symbols if symbol in tickers}
+                except Exception as e:
+                    self.logger.error(f"Error fetching tickers: {e}")
+                    return {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(symbol):
+            async with semaphore:
+                return await self.get_ticker(symbol)
+
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return {symbol: ticker for symbol, ticker in zip(symbols, results) if ticker}
+
+    async def get_order_book(self, symbol: str, depth: int = None) -> Dict:
+        book = await self.get_local_order_book(symbol)
+        return book.to_dict(depth) if book is not None else {}
+
+    async def get_local_order_book(self, symbol: str):
+        '''
+        Local OrderBook of a symbol. It is served as is only while a connected
+        stream applies its deltas (track_order_book); otherwise (not tracked,
+        stream disconnected, book out of sync) a new REST snapshot is applied.
+        '''
+        book = self.order_books.get(symbol)
+        stream = self.order_book_streams.get(symbol)
+        if book is not None and book.synced and stream is not None and stream.connected.is_set():
+            return book
+        snapshot = await self.fetch_order_book_snapshot(symbol)
+        if not snapshot:
+            return None
+        book = self.order_books.setdefault(symbol, OrderBook(symbol))
+        book.apply_snapshot(snapshot)
+        return book
+
+    @coalesced
+    async def fetch_order_book_snapshot(self, symbol: str) -> Dict:
         async with self.rate_limiter:
             try:
                 return await self.exchange.fetch_order_book(symbol)
@@ -36,6 +90,28 @@ class ExchangeHandler:
                 self.logger.error(f"Error fetching order book for {symbol}: {e}")
                 return {}
 
+    def apply_order_book_update(self, symbol: str, delta: Dict) -> bool:
+        '''
+        Apply a delta from a stream (MarketStream 'orderbook' channel). A delta
+        carrying 'snapshot': True replaces the book.
+        '''
+        book = self.order_books.setdefault(symbol, OrderBook(symbol))
+        if delta.get('snapshot'):
+            book.apply_snapshot(delta)
+            return True
+        if not book.synced:
+            return False
+        try:
+            return book.apply_delta(delta)
+        except OrderBookOutOfSync as e:
+            # The next get_order_book call fetches a new snapshot
+            self.logger.warning(f"Order book out of sync: {e}")
+            return False
+
+    def track_order_book(self, stream, symbol: str):
+        self.order_book_streams[symbol] = stream
+        stream.subscribe('orderbook', symbol, self.apply_order_book_update)
+
     async def place_order(self, symbol: str, side: str, amount: float, price: float = None) -> Dict:
         async with self.rate_limiter:
             try:
@@ -49,6 +125,7 @@ class ExchangeHandler:
                 self.logger.error(f"Error placing {side} order for {symbol}: {e}")
                 return {}
 
+    @coalesced
     async def get_balance(self) -> Dict:
         async with self.rate_limiter:
             try:
@@ -57,6 +134,7 @@ class ExchangeHandler:
                 self.logger.error(f"Error fetching balance: {e}")
                 return {}
 
+    @coalesced
     async def get_open_orders(self, symbol: str = None) -> list:
         async with self.rate_limiter:
             try:
@@ -73,6 +151,7 @@ class ExchangeHandler:
                 self.logger.error(f"Error cancelling order {order_id} for {symbol}: {e}")
                 return {}
 
+    @coalesced
     async def get_ohlcv(self, symbol: str, timeframe: str, since: int = None, limit: int = None) -> list:
         async with self.rate_limiter:
             try:
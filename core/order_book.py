@@ -0,0 +1,192 @@
+import zlib
+from bisect import bisect_left
+from utils.error_handling import DataError
+
+
+class OrderBookOutOfSync(DataError):
+    "Raised when a delta cannot be applied (sequence gap or checksum mismatch): a new snapshot is needed."
+    pass
+
+
+class BookSide:
+    '''
+    Price levels of one side, kept in a sorted list of prices plus a
+    price -> size dict. Finding a level is a binary search; inserting or
+    removing one shifts the list (a memmove, fast at book depths).
+    `descending` puts the best price first for bids.
+    '''
+    def __init__(self, descending):
+        self.descending = descending
+        self.keys = []  # ascending sort keys: -price for bids, price for asks
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+        self.sizes.clear()
+
+    def update(self, price, size):
+        key = -price if self.descending else price
+        if size == 0:
+            if self.sizes.pop(price, None) is not None:
+                del self.keys[bisect_left(self.keys, key)]
+        else:
+            if price not in self.sizes:
+                self.keys.insert(bisect_left(self.keys, key), key)
+            self.sizes[price] = size
+
+    def best(self):
+        if not self.keys:
+            return None
+        return -self.keys[0] if self.descending else self.keys[0]
+
+    def levels(self, depth=None):
+        keys = self.keys if depth is None else self.keys[:depth]
+        return [[-key if self.descending else key, self.sizes[-key if self.descending else key]] for key in keys]
+
+    def truncate(self, depth):
+        for key in self.keys[depth:]:
+            del self.sizes[-key if self.descending else key]
+        del self.keys[depth:]
+
+
+class OrderBook:
+    '''
+    Local L2 order book maintained from a snapshot and incremental deltas.
+
+    Snapshots and deltas are dicts with 'bids' and 'asks' lists of
+    [price, size] (size 0 removes the level), as returned by ccxt, plus an
+    optional 'sequence'. A delta must carry the next sequence (or a
+    'prev_sequence' equal to the current one); older deltas are ignored and
+    a gap raises OrderBookOutOfSync. With a 'checksum', the CRC32 of the
+    top levels is checked after the update (see checksum()).
+    '''
+    def __init__(self, symbol, depth=None, checksum_levels=25):
+        self.symbol = symbol
+        self.depth = depth
+        self.checksum_levels = checksum_levels
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.sequence = None
+        self.timestamp = None
+        self.synced = False
+
+    def apply_snapshot(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        for price, size, *_ in snapshot.get('bids', ()):
+            self.bids.update(float(price), float(size))
+        for price, size, *_ in snapshot.get('asks', ()):
+            self.asks.update(float(price), float(size))
+        self._truncate()
+        self.sequence = snapshot.get('sequence', snapshot.get('nonce'))
+        self.timestamp = snapshot.get('timestamp')
+        self.synced = True
+
+    def apply_delta(self, delta):
+        '''
+        Apply an incremental update; returns False if it was older than the book.
+        '''
+        if not self.synced:
+            raise OrderBookOutOfSync(f"{self.symbol}: no snapshot applied")
+        sequence = delta.get('sequence')
+        if sequence is not None and self.sequence is not None:
+            if sequence <= self.sequence:
+                return False
+            expected = delta.get('prev_sequence', sequence - 1)
+            if expected != self.sequence:
+                self.synced = False
+                raise OrderBookOutOfSync(f"{self.symbol}: sequence gap ({self.sequence} -> {sequence})")
+        for price, size, *_ in delta.get('bids', ()):
+            self.bids.update(float(price), float(size))
+        for price, size, *_ in delta.get('asks', ()):
+            self.asks.update(float(price), float(size))
+        self._truncate()
+        if sequence is not None:
+            self.sequence = sequence
+        self.timestamp = delta.get('timestamp', self.timestamp)
+        if delta.get('checksum') is not None and delta['checksum'] != self.checksum():
+            self.synced = False
+            raise OrderBookOutOfSync(f"{self.symbol}: checksum mismatch")
+        return True
+
+    def checksum(self, levels=None):
+        '''
+        Signed CRC32 of "bid_price:bid_size:ask_price:ask_size:..." over the
+        top levels, interleaving bids and asks (OKX style). Prices and sizes
+        are formatted with repr(float); adapt the formatting for exchanges
+        that checksum their original strings.
+        '''
+        levels = levels or self.checksum_levels
+        bids, asks = self.bids.levels(levels), self.asks.levels(levels)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend((repr(bids[i][0]), repr(bids[i][1])))
+            if i < len(asks):
+                parts.extend((repr(asks[i][0]), repr(asks[i][1])))
+        crc = zlib.crc32(':'.join(parts).encode())
+        return crc - (1 << 32) if crc >= 1 << 31 else crc
+
+    def best_bid(self):
+        price = self.bids.best()
+        return None if price is None else (price, self.bids.sizes[price])
+
+    def best_ask(self):
+        price = self.asks.best()
+        return None if price is None else (price, self.asks.sizes[price])
+
+    def mid_price(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else (bid + ask) / 2
+
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else ask - bid
+
+    def depth_at(self, price, side):
+        '''
+        Size resting at `price` on side 'bids' or 'asks' (0 if no level).
+        '''
+        return self._side(side).sizes.get(float(price), 0.)
+
+    def vwap(self, size, side):
+        '''
+        Average price to fill `size` against side 'asks' (a buy) or 'bids' (a
+        sell), walking the levels from the best one. None if the book is too thin.
+        '''
+        if not size > 0:
+            raise ValueError(f"Order size must be positive, got {size}")
+        book_side = self._side(side)
+        remaining, cost = size, 0.
+        for key in book_side.keys:
+            price = -key if book_side.descending else key
+            filled = min(remaining, book_side.sizes[price])
+            cost += filled * price
+            remaining -= filled
+            if remaining <= 0:
+                return cost / size
+        return None
+
+    def to_dict(self, depth=None):
+        return {
+            'symbol': self.symbol,
+            'bids': self.bids.levels(depth),
+            'asks': self.asks.levels(depth),
+            'timestamp': self.timestamp,
+            'nonce': self.sequence
+        }
+
+    def _side(self, side):
+        if side in ('bids', 'bid', 'sell', 'SELL'):
+            return self.bids
+        if side in ('asks', 'ask', 'buy', 'BUY'):
+            return self.asks
+        raise ValueError(f"Unknown order book side: {side}")
+
+    def _truncate(self):
+        if self.depth is not None:
+            self.bids.truncate(self.depth)
+            self.asks.truncate(self.depth)
@@ -3,13 +3,16 @@ import importlib
 import os
 from typing import Dict, Any
 from utils.logging_config import setup_logging
+from indicators.indicator_cache import CachedIndicator, default_cache
 
 class PluginManager:
-    def __init__(self):
-        self.logger = setup_logging()
+    def __init__(self, indicator_cache=None):
+        self.logger, _ = setup_logging()
         self.strategies = {}
         self.indicators = {}
         self.custom_plugins_dir = 'plugins/custom_plugins'
+        # Indicator results are shared by every strategy loading the same indicator and parameters
+        self.indicator_cache = indicator_cache if indicator_cache is not None else default_cache
 
     def load_strategy(self, strategy_name: str, config: Dict) -> Any:
         if strategy_name in self.strategies:
@@ -28,21 +31,26 @@ class PluginManager:
             # If not found, try to load from custom plugins
             return self.load_custom_plugin('strategies', strategy_name, config)
 
-    def load_indicator(self, indicator_name: str) -> Any:
-        if indicator_name in self.indicators:
-            return self.indicators[indicator_name]
+    def load_indicator(self, indicator_name: str, params: Dict = None) -> Any:
+        params = params or {}
+        key = indicator_name if not params else (indicator_name, tuple(sorted(params.items())))
+        if key in self.indicators:
+            return self.indicators[key]
 
         try:
             # Try to load from built-in indicators
             module = importlib.import_module(f'indicators.{indicator_name.lower()}')
             indicator_class = getattr(module, indicator_name)
-            self.indicators[indicator_name] = indicator_class()
+            self.indicators[key] = CachedIndicator(indicator_class(**params), self.indicator_cache)
             self.logger.info(f"Loaded built-in indicator: {indicator_name}")
-            return self.indicators[indicator_name]
+            return self.indicators[key]
         except ImportError:
             # If not found, try to load from custom plugins
             return self.load_custom_plugin('indicators', indicator_name)
 
+    def get_indicator_cache_stats(self) -> Dict[str, Any]:
+        return self.indicator_cache.stats()
+
     def load_custom_plugin(self, plugin_type: str, plugin_name: str, config: Dict = None) -> Any:
         plugin_path = os.path.join(self.custom_plugins_dir, plugin_type, f"{plugin_name.lower()}.py")
         if not os.path.exists(plugin_path):
@@ -58,6 +66,7 @@ class PluginManager:
         if plugin_type == 'strategies':
             self.strategies[plugin_name] = plugin_instance
         elif plugin_type == 'indicators':
+            plugin_instance = CachedIndicator(plugin_instance, self.indicator_cache)
             self.indicators[plugin_name] = plugin_instance
 
         self.logger.info(f"Loaded custom {plugin_type} plugin: {plugin_name}")
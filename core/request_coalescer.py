@@ -0,0 +1,90 @@
+import asyncio
+import time
+from functools import wraps
+
+# Expired entries are purged when the cache reaches this size
+MAX_CACHED = 1024
+
+
+class RequestCoalescer:
+    '''
+    Shares one in-flight request between identical concurrent calls (same
+    endpoint and arguments), and optionally caches results for a short time.
+
+    `ttl` maps endpoint names to seconds; endpoints not listed are only
+    coalesced. Errors and empty results (the handler returns {} / [] on
+    failure) are never cached. Callers receive the same result object and
+    must not modify it.
+    '''
+    def __init__(self, ttl=None):
+        self.ttl = dict(ttl or {})
+        self.in_flight = {}
+        self.cache = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def call(self, endpoint, function, *args, **kwargs):
+        key = (endpoint, _freeze(args), _freeze(kwargs))
+        ttl = self.ttl.get(endpoint)
+        if ttl:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.cache_hits += 1
+                return cached[1]
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: a cancelled caller must not cancel the request shared with the others
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(function(*args, **kwargs))
+        self.in_flight[key] = future
+        future.add_done_callback(lambda done: self._done(key, ttl, done))
+        return await asyncio.shield(future)
+
+    def _done(self, key, ttl, future):
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+        # exception() also marks the error as retrieved when every caller was cancelled
+        if future.cancelled() or future.exception() is not None:
+            return
+        if ttl and future.result():
+            now = time.monotonic()
+            if len(self.cache) >= MAX_CACHED:
+                self.cache = {cached_key: entry for cached_key, entry in self.cache.items() if entry[0] > now}
+            self.cache[key] = (now + ttl, future.result())
+
+    def invalidate(self, endpoint=None):
+        if endpoint is None:
+            self.cache.clear()
+        else:
+            for key in [key for key in self.cache if key[0] == endpoint]:
+                del self.cache[key]
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'cache_hits': self.cache_hits,
+            'in_flight': len(self.in_flight)
+        }
+
+
+def coalesced(method):
+    '''
+    Route an async method of an object having a `coalescer` through it, keyed by the method name and arguments.
+    '''
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self.coalescer.call(method.__name__, method, self, *args, **kwargs)
+    return wrapper
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import numpy as np
+from data.candle_buffer import frame_to_ohlcv
+from utils.error_handling import DataError
+from utils.logging_config import setup_logging
+from utils.timeframes import timeframe_to_ms, align
+
+
+class BackfillCheckpoint:
+    '''
+    JSON file recording the chunks of each backfill already fetched, so an
+    interrupted backfill resumes where it stopped. Written atomically after
+    every chunk. Share one instance between the Backfills using the same file.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {key: set(chunks) for key, chunks in json.load(f).items()}
+
+    def completed(self, key):
+        return self.done.get(key, set())
+
+    def mark(self, key, chunk_start):
+        self.done.setdefault(key, set()).add(chunk_start)
+        self._save()
+
+    def clear(self, key):
+        if self.done.pop(key, None) is not None:
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({key: sorted(chunks) for key, chunks in self.done.items()}, f)
+        os.replace(self.path + '.tmp', self.path)
+
+
+class Backfill:
+    '''
+    Concurrent OHLCV backfill.
+
+    The range is split into timeframe-aligned chunks of `page_limit` bars,
+    fetched concurrently (at most `concurrency` requests in flight, on top of
+    the handler's own rate limiting), then merged, sorted and de-duplicated.
+    With a `store` (CandleStore) every chunk is persisted as soon as it
+    arrives, and the days of the range are compacted once the chunks are
+    fetched (one part per chunk would otherwise pile up). With a `checkpoint` (path or BackfillCheckpoint) the full
+    chunks already stored are skipped (read back from the store) when a
+    backfill from the same start is run again, whatever its end.
+
+    A chunk is incomplete when the exchange stops answering before its end
+    (the handler returns [] on errors): it is not checkpointed, and run()
+    raises DataError once the other chunks are stored, so running it again
+    resumes.
+    '''
+    def __init__(self, exchange_handler, store=None, checkpoint=None, page_limit=1000, concurrency=5):
+        self.exchange_handler = exchange_handler
+        self.store = store
+        self.checkpoint = BackfillCheckpoint(checkpoint) if isinstance(checkpoint, str) else checkpoint
+        self.page_limit = page_limit
+        self.concurrency = concurrency
+        self.logger, _ = setup_logging()
+
+    def chunks(self, start, end, timeframe):
+        '''
+        [chunk_start, chunk_end) pairs (ms) covering [start, end), aligned on the timeframe.
+        '''
+        step = timeframe_to_ms(timeframe)
+        first = align(start, timeframe)
+        size = step * self.page_limit
+        return [(chunk_start, min(chunk_start + size, end)) for chunk_start in range(first, end, size)]
+
+    async def run(self, symbol, timeframe, start, end, semaphore=None):
+        '''
+        OHLCV rows with start <= timestamp < end (ms), sorted and unique.
+        Pass the same `semaphore` to concurrent runs to bound their requests together.
+        '''
+        step = timeframe_to_ms(timeframe)
+        # The end is not part of the key: a rerun up to "now" resumes the same backfill
+        key = f"{symbol}|{timeframe}|{start}"
+        chunks = self.chunks(start, end, timeframe)
+        completed = self.checkpoint.completed(key) if self.checkpoint is not None and self.store is not None else set()
+        semaphore = semaphore or asyncio.Semaphore(self.concurrency)
+        incomplete = []
+
+        async def fetch(chunk_start, chunk_end):
+            async with semaphore:
+                rows, reached = await self.fetch_chunk(symbol, timeframe, chunk_start, chunk_end)
+            last_bar = align(chunk_end - 1, timeframe)
+            if chunk_end == end:
+                last_bar -= step  # the bar open at `end` may not be published yet
+            if reached < last_bar:
+                incomplete.append(chunk_start)
+            if self.store is not None and rows:
+                self.store.append(symbol, timeframe, rows)
+            # Only full chunks are checkpointed: a chunk cut by `end` grows with a later end
+            if self.store is not None and self.checkpoint is not None and chunk_start not in incomplete \
+                    and chunk_end - chunk_start == step * self.page_limit:
+                self.checkpoint.mark(key, chunk_start)
+            return rows
+
+        pending = [chunk for chunk in chunks if chunk[0] not in completed]
+        if len(pending) < len(chunks):
+            self.logger.info(f"Resuming backfill of {symbol} {timeframe}: {len(chunks) - len(pending)}/{len(chunks)} chunks already stored")
+        results = await asyncio.gather(*(fetch(*chunk) for chunk in pending))
+        if self.store is not None and pending:
+            self.store.compact(symbol, timeframe, start=start, end=end)
+        if incomplete:
+            raise DataError(f"Backfill of {symbol} {timeframe} incomplete: {len(incomplete)}/{len(chunks)} chunks "
+                            f"stopped early (first at {min(incomplete)})")
+
+        parts = [np.asarray(rows, dtype=np.float64).reshape(-1, 6) for rows in results if rows]
+        for chunk_start, chunk_end in chunks:
+            if chunk_start in completed:
+                parts.append(frame_to_ohlcv(self.store.read(symbol, timeframe, chunk_start, chunk_end)))
+        if self.checkpoint is not None:
+            self.checkpoint.clear(key)
+        return merge_ohlcv(parts, start, end)
+
+    async def fetch_chunk(self, symbol, timeframe, chunk_start, chunk_end):
+        '''
+        Pages of one chunk, sequentially (exchanges may return fewer bars than
+        asked). Returns the rows and the timestamp of the latest bar the
+        exchange returned, which is at or past the chunk's last bar when the
+        chunk is complete (even if the exchange has no bar inside it).
+        '''
+        step = timeframe_to_ms(timeframe)
+        rows = []
+        reached = chunk_start - step
+        since = chunk_start
+        while since < chunk_end:
+            ohlcv = await self.exchange_handler.get_ohlcv(symbol, timeframe, since, self.page_limit)
+            if not ohlcv or ohlcv[-1][0] < since:
+                break
+            rows.extend(row for row in ohlcv if row[0] < chunk_end)
+            reached = ohlcv[-1][0]
+            # Next bar expected one step after the last one: no extra request once the chunk is full
+            since = ohlcv[-1][0] + step
+        return rows, reached
+
+
+def merge_ohlcv(parts, start=None, end=None):
+    '''
+    Concatenate OHLCV row arrays, keep start <= timestamp < end, sort by time
+    and de-duplicate timestamps (the part listed last wins).
+    '''
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return []
+    rows = np.concatenate(parts)
+    if start is not None:
+        rows = rows[rows[:, 0] >= start]
+    if end is not None:
+        rows = rows[rows[:, 0] < end]
+    # np.unique keeps the first occurrence: on the reversed rows that is the last written one
+    reversed_rows = rows[::-1]
+    _, first = np.unique(reversed_rows[:, 0], return_index=True)
+    merged = reversed_rows[first]
+    return [[int(row[0]), *row[1:].tolist()] for row in merged]
+
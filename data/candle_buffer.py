@@ -0,0 +1,270 @@
+from collections.abc import MutableMapping
+import numpy as np
+import pandas as pd
+from utils.precision import OHLCV_COLUMNS, get_storage_dtype
+
+PRICE_COLUMNS = OHLCV_COLUMNS[1:]
+
+
+class CandleWindow:
+    '''
+    Read-only columnar view of the latest candles of a CandleBuffer.
+
+    Columns are NumPy views into the buffer (no copy): `window.close`,
+    `window['close']`; timestamps are int64 milliseconds.
+    '''
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records):
+        '''
+        Window over a copy of candles given as dicts with OHLCV keys or [timestamp, o, h, l, c, v] rows.
+        '''
+        records = list(records)
+        if records and isinstance(records[0], dict):
+            rows = [[record.get(column, np.nan) for column in OHLCV_COLUMNS] for record in records]
+        else:
+            rows = records
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        columns = {'timestamp': rows[:, 0].astype(np.int64)}
+        columns.update({column: rows[:, i].astype(get_storage_dtype()) for i, column in enumerate(PRICE_COLUMNS, start=1)})
+        return cls(columns)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__['columns'][column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def __len__(self):
+        return len(self.columns['timestamp'])
+
+    def to_frame(self):
+        df = pd.DataFrame({column: np.array(self.columns[column]) for column in PRICE_COLUMNS},
+                          index=pd.DatetimeIndex(pd.to_datetime(self.columns['timestamp'], unit='ms'), name='timestamp'))
+        return df
+
+
+class CandleBuffer:
+    '''
+    Fixed-capacity ring buffer of candles, one NumPy array per column.
+
+    Every row is written twice, at `i` and `i + capacity` of arrays twice the
+    capacity long, so the latest n rows are always contiguous: appends are
+    O(1) and windows are zero-copy slices. A window is left untouched by at
+    least `capacity - n` further appends; copy it to keep it longer.
+    Appending a candle with the same timestamp as the last one updates it in
+    place (candle still open); older timestamps are ignored.
+    '''
+    def __init__(self, capacity=10_000, dtype=None):
+        self.capacity = capacity
+        self.dtype = dtype or get_storage_dtype()
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.values = {column: np.full(2 * capacity, np.nan, dtype=self.dtype) for column in PRICE_COLUMNS}
+        self.end = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def last_timestamp(self):
+        return int(self.timestamps[self._position(self.end - 1)]) if self.length else None
+
+    def append(self, timestamp, open, high, low, close, volume):
+        timestamp = int(timestamp)
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return False
+        if last is None or timestamp > last:
+            self.end += 1
+            self.length = min(self.length + 1, self.capacity)
+        index = self._position(self.end - 1)
+        for position in (index, index + self.capacity):
+            self.timestamps[position] = timestamp
+            self.values['open'][position] = open
+            self.values['high'][position] = high
+            self.values['low'][position] = low
+            self.values['close'][position] = close
+            self.values['volume'][position] = volume
+        return True
+
+    def extend(self, ohlcv):
+        '''
+        Bulk append of [timestamp, open, high, low, close, volume] rows sorted by time.
+        '''
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if not len(rows):
+            return 0
+        timestamps = rows[:, 0].astype(np.int64)
+        last = self.last_timestamp
+        if last is not None:
+            # A row with the last timestamp refreshes the open candle; older rows are ignored
+            same = timestamps == last
+            if same.any():
+                self.append(*rows[same][-1])
+            newer = timestamps > last
+            rows, timestamps = rows[newer], timestamps[newer]
+        rows, timestamps = rows[-self.capacity:], timestamps[-self.capacity:]
+
+        count = len(rows)
+        positions = (self.end + np.arange(count)) % self.capacity
+        for offset in (0, self.capacity):
+            self.timestamps[positions + offset] = timestamps
+            for column_index, column in enumerate(PRICE_COLUMNS, start=1):
+                self.values[column][positions + offset] = rows[:, column_index]
+        self.end += count
+        self.length = min(self.length + count, self.capacity)
+        return count
+
+    def window(self, n=None, until=None):
+        '''
+        Latest n rows as a CandleWindow. With `until` (an absolute row index
+        returned by seek()), only the rows before it are visible.
+        '''
+        stop = self._position(self.end - 1) + self.capacity + 1
+        visible = self.length
+        if until is not None:
+            hidden = min(max(self.end - until, 0), self.length)
+            stop -= hidden
+            visible -= hidden
+        n = visible if n is None else max(0, min(n, visible))
+        columns = {'timestamp': self.timestamps[stop - n:stop]}
+        columns.update({column: values[stop - n:stop] for column, values in self.values.items()})
+        for view in columns.values():
+            view.flags.writeable = False
+        return CandleWindow(columns)
+
+    def last(self):
+        if not self.length:
+            return None
+        index = self._position(self.end - 1)
+        candle = {'timestamp': int(self.timestamps[index])}
+        candle.update({column: float(values[index]) for column, values in self.values.items()})
+        return candle
+
+    def seek(self, timestamp, start=None):
+        '''
+        Absolute index just past the last row with a timestamp <= `timestamp`
+        (ms), for window(until=...). Indices count every row ever appended, so
+        they stay valid across appends. The binary search starts at `start`
+        when given (a previous result for an earlier timestamp).
+        '''
+        first = self.end - self.length
+        lo = first if start is None else min(max(start, first), self.end)
+        timestamps = self.window().timestamp[lo - first:]
+        return lo + int(np.searchsorted(timestamps, timestamp, side='right'))
+
+    def truncate_after(self, timestamp):
+        '''
+        Drop the candles more recent than `timestamp` (ms).
+        '''
+        timestamps = self.window().timestamp
+        keep = int(np.searchsorted(timestamps, timestamp, side='right'))
+        dropped = self.length - keep
+        self.end -= dropped
+        self.length = keep
+        return dropped
+
+    def to_frame(self, n=None):
+        return self.window(n).to_frame()
+
+    def _position(self, index):
+        return index % self.capacity
+
+
+class CandleBufferMap(MutableMapping):
+    '''
+    symbol -> CandleBuffer, used as ExchangeData.data.
+
+    Item access returns a DataFrame built on demand (a copy: write candles
+    with buffer().append() or by assignment), for compatibility with code
+    that works on frames; use buffer() / window() for zero-copy access.
+    Assigning a DataFrame or a list of OHLCV rows replaces the symbol's buffer.
+
+    After seek(timestamp), item access, items() and window() only see the
+    candles <= timestamp (replay); the buffers keep every candle and
+    clear_cursors() makes them visible again.
+    '''
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.buffers = {}
+        # symbol -> absolute end index of the visible rows (see CandleBuffer.seek)
+        self.cursors = {}
+        self.cursor_timestamp = None
+
+    def buffer(self, symbol):
+        if symbol not in self.buffers:
+            self.buffers[symbol] = CandleBuffer(self.capacity)
+            self._sync_cursor(symbol)
+        return self.buffers[symbol]
+
+    def window(self, symbol, n=None):
+        return self.buffer(symbol).window(n, self.cursors.get(symbol))
+
+    def seek(self, timestamp):
+        '''
+        Limit every symbol to its candles <= `timestamp` (ms). Moving forward,
+        the search starts from the previous cursors.
+        '''
+        forward = self.cursor_timestamp is not None and timestamp >= self.cursor_timestamp
+        for symbol, buffer in self.buffers.items():
+            self.cursors[symbol] = buffer.seek(timestamp, self.cursors.get(symbol) if forward else None)
+        self.cursor_timestamp = timestamp
+
+    def clear_cursors(self):
+        self.cursors.clear()
+        self.cursor_timestamp = None
+
+    def __getitem__(self, symbol):
+        return self.buffers[symbol].window(until=self.cursors.get(symbol)).to_frame()
+
+    def __setitem__(self, symbol, data):
+        rows = frame_to_ohlcv(data) if isinstance(data, pd.DataFrame) else data
+        buffer = CandleBuffer(max(self.capacity, len(rows)))
+        buffer.extend(rows)
+        self.buffers[symbol] = buffer
+        # Indices of the old buffer do not apply to the new one
+        self._sync_cursor(symbol)
+
+    def __contains__(self, symbol):
+        # Mapping.__contains__ would go through __getitem__ and build a frame
+        return symbol in self.buffers
+
+    def __delitem__(self, symbol):
+        del self.buffers[symbol]
+        self.cursors.pop(symbol, None)
+
+    def __iter__(self):
+        return iter(self.buffers)
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def _sync_cursor(self, symbol):
+        if self.cursor_timestamp is not None:
+            self.cursors[symbol] = self.buffers[symbol].seek(self.cursor_timestamp)
+
+
+def frame_to_ohlcv(df):
+    '''
+    OHLCV rows (timestamps in ms) from a DataFrame indexed by time or with a
+    'timestamp' column; missing price columns are NaN.
+    '''
+    if 'timestamp' in df.columns:
+        timestamps = df['timestamp']
+    else:
+        timestamps = df.index
+    if isinstance(timestamps, pd.Series):
+        timestamps = pd.Index(timestamps)
+    if isinstance(timestamps, pd.DatetimeIndex) or pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.DatetimeIndex(timestamps).as_unit('ms').asi8
+    rows = np.empty((len(df), len(OHLCV_COLUMNS)))
+    rows[:, 0] = np.asarray(timestamps, dtype=np.int64)
+    for column_index, column in enumerate(PRICE_COLUMNS, start=1):
+        rows[:, column_index] = df[column].to_numpy(dtype=np.float64) if column in df.columns else np.nan
+    return rows
@@ -0,0 +1,182 @@
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from data.candle_buffer import frame_to_ohlcv
+from utils.precision import OHLCV_COLUMNS, get_storage_dtype
+
+DAY_MS = 86_400_000
+
+
+class CandleStore:
+    '''
+    On-disk OHLCV store: Parquet files partitioned by symbol, timeframe and day.
+
+        root/BTC-USDT/1m/2024-01-31/part-<ns>.parquet
+
+    append() writes one new part per day touched (no rewrite of existing
+    files). read() only opens the day directories overlapping the requested
+    range and pushes the timestamp filter down to Parquet row groups.
+    Candles written later win over earlier ones with the same timestamp;
+    compact() merges the parts of each day into a single sorted file; the
+    Backfill and the engine's startup call it.
+    Timestamps are int64 milliseconds on disk, prices float64.
+    '''
+    def __init__(self, root='data/candles'):
+        if pa is None:
+            raise ImportError("CandleStore requires pyarrow (pip install pyarrow)")
+        self.root = root
+        self.schema = pa.schema([('timestamp', pa.int64())] + [(column, pa.float64()) for column in OHLCV_COLUMNS[1:]])
+
+    def append(self, symbol, timeframe, data):
+        '''
+        Store candles given as a DataFrame or [timestamp, o, h, l, c, v] rows.
+        Returns the number of candles written.
+        '''
+        rows = frame_to_ohlcv(data) if isinstance(data, pd.DataFrame) else np.asarray(data, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if not len(rows):
+            return 0
+        timestamps = rows[:, 0].astype(np.int64)
+        days = timestamps // DAY_MS
+        for day in np.unique(days):
+            selected = days == day
+            columns = [pa.array(timestamps[selected])] + [pa.array(rows[selected, i]) for i in range(1, len(OHLCV_COLUMNS))]
+            directory = self._day_path(symbol, timeframe, int(day))
+            os.makedirs(directory, exist_ok=True)
+            self._write(pa.Table.from_arrays(columns, schema=self.schema), directory)
+        return len(rows)
+
+    def read(self, symbol, timeframe, start=None, end=None, columns=None):
+        '''
+        Candles with start <= timestamp < end (datetimes or ms), as a DataFrame
+        indexed by time with columns in the storage dtype.
+        '''
+        start, end = _to_ms(start), _to_ms(end)
+        columns = list(columns) if columns else OHLCV_COLUMNS[1:]
+        return self._frame(self._read_files(self._files(symbol, timeframe, start, end), start, end, columns), columns)
+
+    def last_timestamp(self, symbol, timeframe):
+        days = self._days(symbol, timeframe)
+        for day in reversed(days):
+            files = self._day_files(symbol, timeframe, day)
+            if files:
+                timestamps = ds.dataset(files, schema=self.schema, format='parquet').to_table(columns=['timestamp'])['timestamp']
+                if len(timestamps):
+                    return int(pc.max(timestamps).as_py())
+        return None
+
+    def compact(self, symbol, timeframe, min_parts=2, start=None, end=None):
+        '''
+        Merge the parts of every day having at least `min_parts` files into one
+        deduplicated, time-sorted file, for the days overlapping [start, end)
+        (all days by default). Returns the number of days compacted.
+        '''
+        start, end = _to_ms(start), _to_ms(end)
+        first = start // DAY_MS if start is not None else None
+        last = (end - 1) // DAY_MS if end is not None else None
+        compacted = 0
+        for day in self._days(symbol, timeframe):
+            if (first is not None and day < first) or (last is not None and day > last):
+                continue
+            files = self._day_files(symbol, timeframe, day)
+            if len(files) < min_parts:
+                continue
+            # Read in float64 whatever the storage dtype, the values are written back
+            df = self._read_files(files, None, None, OHLCV_COLUMNS[1:])
+            table = pa.Table.from_arrays(
+                [pa.array(df['timestamp'].to_numpy(dtype=np.int64))] + [pa.array(df[column].to_numpy(dtype=np.float64)) for column in OHLCV_COLUMNS[1:]],
+                schema=self.schema)
+            # The merged part is newer than the parts it replaces, so a crash before the removal is harmless
+            self._write(table, self._day_path(symbol, timeframe, day))
+            for path in files:
+                os.remove(path)
+            compacted += 1
+        return compacted
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.replace('-', '/') for name in os.listdir(self.root))
+
+    def delete(self, symbol, timeframe):
+        shutil.rmtree(os.path.join(self.root, _symbol_dir(symbol), timeframe), ignore_errors=True)
+
+    def _write(self, table, directory):
+        path = os.path.join(directory, f"part-{time.time_ns()}.parquet")
+        while os.path.exists(path):
+            path = os.path.join(directory, f"part-{time.time_ns()}.parquet")
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def _read_files(self, files, start, end, columns):
+        '''
+        Sorted, deduplicated rows of `files` with start <= timestamp < end, as
+        a DataFrame with a 'timestamp' column and the columns as stored.
+        '''
+        if not files:
+            return pd.DataFrame({'timestamp': np.array([], dtype=np.int64)})
+        dataset = ds.dataset(files, schema=self.schema, format='parquet')
+        condition = None
+        if start is not None:
+            condition = ds.field('timestamp') >= start
+        if end is not None:
+            condition = ds.field('timestamp') < end if condition is None else condition & (ds.field('timestamp') < end)
+        # Fragments are scanned in file order (oldest part first), so keeping the last duplicate keeps the latest write
+        tables = [fragment.to_table(columns=['timestamp'] + columns, filter=condition)
+                  for fragment in dataset.get_fragments()]
+        df = pa.concat_tables(tables).to_pandas()
+        return df.sort_values('timestamp', kind='stable').drop_duplicates('timestamp', keep='last')
+
+    def _frame(self, df, columns):
+        index = pd.DatetimeIndex(pd.to_datetime(df['timestamp'].to_numpy(dtype=np.int64), unit='ms'), name='timestamp')
+        return pd.DataFrame({column: df[column].to_numpy(dtype=get_storage_dtype()) if column in df else np.array([], dtype=get_storage_dtype())
+                             for column in columns}, index=index)
+
+    def _days(self, symbol, timeframe):
+        directory = os.path.join(self.root, _symbol_dir(symbol), timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(_parse_day(name) for name in os.listdir(directory))
+
+    def _day_files(self, symbol, timeframe, day):
+        directory = self._day_path(symbol, timeframe, day)
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+    def _files(self, symbol, timeframe, start, end):
+        # Partition pruning: only the days overlapping [start, end)
+        first = start // DAY_MS if start is not None else None
+        last = (end - 1) // DAY_MS if end is not None else None
+        files = []
+        for day in self._days(symbol, timeframe):
+            if (first is None or day >= first) and (last is None or day <= last):
+                files.extend(self._day_files(symbol, timeframe, day))
+        return files
+
+    def _day_path(self, symbol, timeframe, day):
+        date = datetime.fromtimestamp(day * DAY_MS / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+        return os.path.join(self.root, _symbol_dir(symbol), timeframe, date)
+
+
+def _symbol_dir(symbol):
+    return symbol.replace('/', '-')
+
+
+def _parse_day(name):
+    return int(datetime.strptime(name, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000) // DAY_MS
+
+
+def _to_ms(timestamp):
+    if timestamp is None or isinstance(timestamp, (int, np.integer)):
+        return timestamp
+    return pd.Timestamp(timestamp).value // 1_000_000
@@ -1,28 +1,134 @@
+import sys
+from itertools import islice
+from collections import OrderedDict, deque
+from typing import NamedTuple, Optional
 
-from collections import OrderedDict
+class CandleRecord(NamedTuple):
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+# Approximate memory of one cached record (tuple + its int timestamp and five floats)
+RECORD_BYTES = sys.getsizeof(CandleRecord(0, 0., 0., 0., 0., 0.)) + sys.getsizeof(2 ** 40) + 5 * sys.getsizeof(0.)
+
+def to_record(data):
+    '''
+    CandleRecord from a record, a dict with OHLCV keys or a [timestamp, o, h, l, c, v] row.
+    '''
+    if isinstance(data, CandleRecord):
+        return data
+    if isinstance(data, dict):
+        return CandleRecord(*(data.get(field) for field in CandleRecord._fields))
+    return CandleRecord(*data)
 
 class DataCache:
-    def __init__(self, max_size=1000):
-        self.max_size = max_size
+    '''
+    Per-symbol cache of the latest candles.
+
+    Each key holds a deque bounded by `max_rows` (O(1) eviction of the oldest
+    row). Keys are kept in LRU order: beyond `max_keys` the least recently
+    used key is dropped, and beyond `max_bytes` the oldest rows of the least
+    recently used keys are dropped first. A record with the same timestamp as
+    the last one of its key replaces it (candle still open).
+    '''
+    def __init__(self, max_rows=1000, max_keys=100, max_bytes=64 * 1024 * 1024):
+        self.max_rows = max_rows
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
         self.cache = OrderedDict()
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted_rows = 0
+        self.evicted_keys = 0
 
     def add(self, symbol, data):
-        if symbol not in self.cache:
-            self.cache[symbol] = []
-        self.cache[symbol].append(data)
-        self.cache.move_to_end(symbol)
-        if len(self.cache[symbol]) > self.max_size:
-            self.cache[symbol].pop(0)
-        if len(self.cache) > self.max_size:
-            self.cache.popitem(last=False)
+        records = self._records(symbol)
+        self._append(records, to_record(data))
+        self._enforce_limits()
+
+    def extend(self, symbol, data):
+        '''
+        Bulk insert (e.g. a history load); only the last `max_rows` records are kept.
+        '''
+        records = self._records(symbol)
+        for record in list(data)[-self.max_rows:]:
+            self._append(records, to_record(record))
+        self._enforce_limits()
 
     def get(self, symbol, limit=None):
-        if symbol not in self.cache:
+        records = self._lookup(symbol)
+        if records is None:
             return []
-        data = self.cache[symbol]
-        if limit is not None:
-            return data[-limit:]
-        return data
+        if limit is None:
+            return list(records)
+        # Walk back from the newest record: O(limit) whatever the size of the deque
+        tail = list(islice(reversed(records), max(limit, 0)))
+        tail.reverse()
+        return tail
+
+    def latest(self, symbol) -> Optional[CandleRecord]:
+        records = self._lookup(symbol)
+        return records[-1] if records else None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'keys': len(self.cache),
+            'rows': self.rows,
+            'bytes': self.rows * RECORD_BYTES,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.,
+            'evicted_rows': self.evicted_rows,
+            'evicted_keys': self.evicted_keys
+        }
 
     def clear(self):
         self.cache.clear()
+        self.rows = 0
+
+    def _lookup(self, symbol):
+        if symbol not in self.cache:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.cache.move_to_end(symbol)
+        return self.cache[symbol]
+
+    def _records(self, symbol):
+        if symbol not in self.cache:
+            self.cache[symbol] = deque(maxlen=self.max_rows)
+        self.cache.move_to_end(symbol)
+        return self.cache[symbol]
+
+    def _append(self, records, record):
+        if records and records[-1].timestamp == record.timestamp:
+            records[-1] = record
+            return
+        if len(records) == self.max_rows:
+            self.evicted_rows += 1
+        else:
+            self.rows += 1
+        records.append(record)
+
+    def _enforce_limits(self):
+        while len(self.cache) > self.max_keys:
+            self._drop_oldest_key()
+        while self.rows * RECORD_BYTES > self.max_bytes and self.cache:
+            oldest = next(iter(self.cache.values()))
+            oldest.popleft()
+            self.rows -= 1
+            self.evicted_rows += 1
+            if not oldest:
+                self.cache.popitem(last=False)
+                self.evicted_keys += 1
+
+    def _drop_oldest_key(self):
+        _, records = self.cache.popitem(last=False)
+        self.rows -= len(records)
+        self.evicted_rows += len(records)
+        self.evicted_keys += 1
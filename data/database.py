@@ -0,0 +1,271 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    amount REAL NOT NULL,
+    price REAL NOT NULL,
+    order_id TEXT,
+    strategy TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_time ON trades (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades (timestamp);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    type TEXT,
+    amount REAL,
+    price REAL,
+    status TEXT,
+    info TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_time ON orders (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_time ON orders (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, timestamp);
+
+CREATE TABLE IF NOT EXISTS equity (
+    timestamp INTEGER NOT NULL,
+    total_value REAL NOT NULL,
+    balance REAL
+);
+CREATE INDEX IF NOT EXISTS idx_equity_time ON equity (timestamp);
+'''
+
+INSERT_TRADE = 'INSERT INTO trades (timestamp, symbol, side, amount, price, order_id, strategy) VALUES (?, ?, ?, ?, ?, ?, ?)'
+UPSERT_ORDER = 'INSERT OR REPLACE INTO orders (id, timestamp, symbol, side, type, amount, price, status, info) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+INSERT_EQUITY = 'INSERT INTO equity (timestamp, total_value, balance) VALUES (?, ?, ?)'
+
+
+class Database:
+    '''
+    SQLite ledger of trades, orders and equity snapshots (candles are kept
+    in the Parquet CandleStore).
+
+    record_* calls only enqueue rows and return immediately: a background
+    writer thread drains the queue and writes everything pending with one
+    executemany per statement inside a single transaction (at most
+    `batch_size` rows, at least every `flush_interval` seconds). The
+    database runs in WAL mode so the query methods, which use their own
+    per-thread connection, read while the writer commits.
+    Timestamps are stored as int64 milliseconds since epoch.
+    '''
+    def __init__(self, path='trading_bot.db', batch_size=1000, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.local = threading.local()
+        self.error = None
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.closed = False
+        self.writer = threading.Thread(target=self._write_loop, name='database-writer', daemon=True)
+        self.writer.start()
+
+    # Writes (non-blocking)
+
+    def record_trade(self, trade):
+        self.queue.put((INSERT_TRADE, (
+            _to_ms(trade.get('timestamp')), trade['symbol'], str(trade.get('side', trade.get('action'))).upper(),
+            float(trade['amount']), float(trade['price']), _optional_str(trade.get('order_id', trade.get('id'))),
+            trade.get('strategy'))))
+
+    def record_order(self, order):
+        info = {key: value for key, value in order.items()
+                if key not in ('id', 'timestamp', 'symbol', 'side', 'type', 'amount', 'price', 'status')}
+        self.queue.put((UPSERT_ORDER, (
+            str(order['id']), _to_ms(order.get('timestamp')), order['symbol'], str(order['side']).upper(),
+            order.get('type'), _optional_float(order.get('amount')), _optional_float(order.get('price')),
+            order.get('status'), json.dumps(info, default=str) if info else None)))
+
+    def record_equity(self, total_value, balance=None, timestamp=None):
+        self.queue.put((INSERT_EQUITY, (_to_ms(timestamp), float(total_value), _optional_float(balance))))
+
+    def flush(self, timeout=None):
+        '''
+        Block until everything recorded so far is committed.
+        '''
+        done = threading.Event()
+        self.queue.put(done)
+        if not done.wait(timeout):
+            return False
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return True
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    # Paged queries
+
+    def get_trades(self, symbol=None, start=None, end=None, limit=100, before_id=None):
+        '''
+        Trades newest first. Pass the smallest id of a page as `before_id` to
+        get the next one (keyset pagination, no OFFSET scan).
+        '''
+        conditions, parameters = _time_range(start, end)
+        if symbol is not None:
+            conditions.append('symbol = ?')
+            parameters.append(symbol)
+        if before_id is not None:
+            conditions.append('id < ?')
+            parameters.append(before_id)
+        return self._query('trades', conditions, parameters, 'id DESC', limit)
+
+    def get_orders(self, symbol=None, status=None, start=None, end=None, limit=100, before=None):
+        '''
+        Orders newest first. `before` is the (timestamp, id) of the last order
+        of the previous page: orders sharing its timestamp are not skipped.
+        '''
+        conditions, parameters = _time_range(start, end)
+        if symbol is not None:
+            conditions.append('symbol = ?')
+            parameters.append(symbol)
+        if status is not None:
+            conditions.append('status = ?')
+            parameters.append(status)
+        if before is not None:
+            conditions.append('(timestamp, id) < (?, ?)')
+            parameters.extend((_to_ms(before[0]), str(before[1])))
+        return self._query('orders', conditions, parameters, 'timestamp DESC, id DESC', limit)
+
+    def get_equity(self, start=None, end=None, limit=None):
+        '''
+        Equity snapshots in chronological order, as a DataFrame indexed by time.
+        '''
+        conditions, parameters = _time_range(start, end)
+        rows = self._query('equity', conditions, parameters, 'timestamp', limit)
+        return _frame(rows, ['total_value', 'balance'])
+
+    def count(self, table):
+        if table not in ('trades', 'orders', 'equity'):
+            raise ValueError(f"Unknown table: {table}")
+        return self._reader().execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def _query(self, table, conditions, parameters, order, limit):
+        sql = f'SELECT * FROM {table}'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters = parameters + [limit]
+        return [dict(row) for row in self._reader().execute(sql, parameters)]
+
+    def _reader(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+            connection.row_factory = sqlite3.Row
+            self.local.connection = connection
+        return connection
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # With WAL, NORMAL only syncs at checkpoints: a power loss can drop the last commits but never corrupts the file
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA busy_timeout=5000')
+        return connection
+
+    # Writer thread
+
+    def _write_loop(self):
+        connection = self._connect()
+        try:
+            stop = False
+            while not stop:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batches, waiters, stop = {}, [], False
+                pending = 0
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        sql, rows = item
+                        rows = rows if isinstance(rows, list) else [rows]
+                        batches.setdefault(sql, []).extend(rows)
+                        pending += len(rows)
+                    if stop or waiters or pending >= self.batch_size:
+                        break
+                    try:
+                        item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                self._write_batches(connection, batches)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
+
+    def _write_batches(self, connection, batches):
+        if not batches:
+            return
+        try:
+            connection.execute('BEGIN')
+            for sql, rows in batches.items():
+                connection.executemany(sql, rows)
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            self.error = e
+
+
+def _to_ms(timestamp):
+    if timestamp is None:
+        return int(time.time() * 1000)
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    return pd.Timestamp(timestamp).value // 1_000_000
+
+
+def _time_range(start, end):
+    conditions, parameters = [], []
+    if start is not None:
+        conditions.append('timestamp >= ?')
+        parameters.append(_to_ms(start))
+    if end is not None:
+        conditions.append('timestamp < ?')
+        parameters.append(_to_ms(end))
+    return conditions, parameters
+
+
+def _frame(rows, columns):
+    index = pd.DatetimeIndex(pd.to_datetime([row['timestamp'] for row in rows], unit='ms'), name='timestamp')
+    return pd.DataFrame({column: [row[column] for row in rows] for column in columns}, index=index, dtype=float)
+
+
+def _optional_float(value):
+    return None if value is None else float(value)
+
+
+def _optional_str(value):
+    return None if value is None else str(value)
@@ -4,39 +4,35 @@ import pandas as pd
 from datetime import datetime, timedelta
 import asyncio
 from data.data_cache import DataCache
+from data.candle_buffer import CandleBufferMap
+from data.backfill import Backfill
+
+def to_milliseconds(timestamp):
+    return pd.Timestamp(timestamp).value // 1_000_000
 
 class ExchangeData:
-    def __init__(self, exchange_handler, cache_size=1000):
+    def __init__(self, exchange_handler, cache_size=1000, buffer_capacity=10_000, store=None, checkpoint=None):
         self.exchange_handler = exchange_handler
-        self.data = {}
+        # Un ring buffer de bougies par symbole ; data[symbol] renvoie un DataFrame construit à la demande
+        self.data = CandleBufferMap(buffer_capacity)
         self.current_timestamp = None
         self.trading_pairs = []
         self.cache = DataCache(cache_size)
+        # Avec un CandleStore et un checkpoint, un chargement interrompu reprend où il s'est arrêté
+        self.backfill = Backfill(exchange_handler, store, checkpoint)
 
     def set_trading_pairs(self, pairs):
         self.trading_pairs = pairs
         for pair in pairs:
-            if pair not in self.data:
-                self.data[pair] = pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                self.data[pair].set_index('timestamp', inplace=True)
+            self.data.buffer(pair)
 
     async def load_historical_data(self, symbol, start_date, end_date, timeframe='1m'):
         since = int(start_date.timestamp() * 1000)
         end = int(end_date.timestamp() * 1000)
-        
-        all_ohlcv = []
-        while since < end:
-            ohlcv = await self.exchange_handler.get_ohlcv(symbol, timeframe, since)
-            if len(ohlcv) == 0:
-                break
-            all_ohlcv.extend(ohlcv)
-            since = ohlcv[-1][0] + 1
-        
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        self.data[symbol] = df
-        self.cache.add(symbol, df.to_dict('records'))
+        # Récupération concurrente par tranches alignées sur le timeframe
+        all_ohlcv = await self.backfill.run(symbol, timeframe, since, end)
+        self.data[symbol] = all_ohlcv
+        self.cache.extend(symbol, all_ohlcv)
 
     async def update(self):
         if self.current_timestamp is None:
@@ -53,26 +49,42 @@ class ExchangeData:
         try:
             latest_data = await self.exchange_handler.get_ohlcv(symbol, '1m', limit=1)
             if latest_data:
-                latest_df = pd.DataFrame(latest_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                latest_df['timestamp'] = pd.to_datetime(latest_df['timestamp'], unit='ms')
-                latest_df.set_index('timestamp', inplace=True)
-                self.data[symbol] = self.data[symbol].append(latest_df)
-                self.cache.add(symbol, latest_df.to_dict('records')[0])
+                self.data.buffer(symbol).append(*latest_data[-1])
+                self.cache.add(symbol, latest_data[-1])
         except Exception as e:
             print(f"Error updating {symbol}: {e}")
 
     def update_to_timestamp(self, timestamp):
+        '''
+        Limite la vue de chaque symbole aux bougies <= timestamp, sans rien
+        supprimer : get_window, get_data mais aussi data[symbol] et
+        data.items() ne voient plus les bougies futures.
+        '''
+        self.data.seek(to_milliseconds(timestamp))
         self.current_timestamp = timestamp
-        for symbol in self.data.keys():
-            self.data[symbol] = self.data[symbol][self.data[symbol].index <= timestamp]
+
+    def clear_cursors(self):
+        '''
+        Rend de nouveau visibles toutes les bougies.
+        '''
+        self.data.clear_cursors()
 
     def get_data(self, symbol):
-        return self.data.get(symbol)
+        if symbol not in self.data:
+            return None
+        return self.get_window(symbol).to_frame()
+
+    def get_window(self, symbol, n=None):
+        '''
+        Vue sans copie (CandleWindow) des n dernières bougies visibles d'un symbole.
+        '''
+        return self.data.window(symbol, n)
 
     def get_latest_price(self, symbol):
-        df = self.data.get(symbol)
-        if df is not None and not df.empty:
-            return df['close'].iloc[-1]
+        if symbol in self.data:
+            window = self.get_window(symbol, 1)
+            if len(window):
+                return float(window.close[-1])
         return None
 
     def get_total_value(self, portfolio):
@@ -84,16 +96,14 @@ class ExchangeData:
         return total_value
 
     def get_market_value(self, symbol):
-        df = self.data.get(symbol)
-        if df is not None and not df.empty:
-            return df['close'].iloc[-1]
-        return None
+        return self.get_latest_price(symbol)
 
     def get_latest_data(self):
         latest_data = {}
-        for symbol, df in self.data.items():
-            if not df.empty:
-                latest_data[symbol] = df.iloc[-1].to_dict()
+        for symbol in self.data:
+            window = self.get_window(symbol, 1)
+            if len(window):
+                latest_data[symbol] = {column: float(window[column][-1]) for column in ('open', 'high', 'low', 'close', 'volume')}
         return latest_data
 
 class MockExchange:
@@ -109,33 +119,12 @@ class MockExchange:
         return [[int(d.timestamp() * 1000), 0, 0, 0, p, 0] for d, p in zip(dates, close_prices)]
 
 class MockExchangeData(ExchangeData):
-    def __init__(self):
+    def __init__(self, buffer_capacity=10_000):
         self.exchange = MockExchange()
-        self.data = {}
+        self.data = CandleBufferMap(buffer_capacity)
         self.current_timestamp = None
         self.trading_pairs = []
 
-    def set_trading_pairs(self, pairs):
-        self.trading_pairs = pairs
-        for pair in pairs:
-            if pair not in self.data:
-                self.data[pair] = pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                self.data[pair].set_index('timestamp', inplace=True)
-
     def load_historical_data(self, symbol, start_date, end_date, timeframe='1d'):
         ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, int(start_date.timestamp() * 1000))
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        self.data[symbol] = df
-
-    def update_to_timestamp(self, timestamp):
-        self.current_timestamp = timestamp
-        for symbol in self.data.keys():
-            self.data[symbol] = self.data[symbol][self.data[symbol].index <= timestamp]
-
-    def get_latest_price(self, symbol):
-        df = self.data.get(symbol)
-        if df is not None and not df.empty:
-            return df['close'].iloc[-1]
-        return None
+        self.data[symbol] = ohlcv
@@ -1,54 +1,177 @@
 
+import asyncio
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 import os
 import json
 from datetime import datetime, timedelta
+from data.backfill import Backfill
+from data.candle_buffer import CandleBufferMap
+from data.resampler import resample, Resampler
+from utils.precision import ohlcv_frame
+from utils.timeframes import timeframe_to_ms, align
 
 class HistoricalData:
-    def __init__(self, exchange_handler):
+    def __init__(self, exchange_handler, store=None, buffer_capacity=10_000, checkpoint=None):
         self.exchange_handler = exchange_handler
-        self.data = {}
+        # "symbol_timeframe" -> CandleBuffer ; data[key] renvoie un DataFrame construit à la demande
+        self.data = CandleBufferMap(buffer_capacity)
+        # Optional CandleStore: history is loaded from disk and only the missing tail is fetched
+        self.store = store
+        self.backfill = Backfill(exchange_handler, store, checkpoint)
+        # (symbol, base timeframe) -> Resampler updating the derived timeframes (see track_timeframes)
+        self.resamplers = {}
 
     async def fetch_historical_data(self, symbol: str, timeframe: str, since: int = None, limit: int = None):
         ohlcv = await self.exchange_handler.get_ohlcv(symbol, timeframe, since, limit)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
+        df = ohlcv_frame(ohlcv)
+        if self.store is not None and len(ohlcv):
+            self.store.append(symbol, timeframe, ohlcv)
+        self.data[f"{symbol}_{timeframe}"] = df
+        return df
+
+    def load_from_store(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        df = self.store.read(symbol, timeframe, start, end)
         self.data[f"{symbol}_{timeframe}"] = df
         return df
 
     def get_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
         return self.data.get(f"{symbol}_{timeframe}", pd.DataFrame())
 
+    async def get_candles(self, symbol: str, timeframe: str, limit: int = None):
+        '''
+        Zero-copy CandleWindow over the last `limit` candles (all if None);
+        empty if nothing is loaded for this symbol and timeframe.
+        '''
+        return self.data.buffer(f"{symbol}_{timeframe}").window(limit)
+
+    def append_candle(self, symbol: str, timeframe: str, candle) -> bool:
+        '''
+        Append a candle (dict or [timestamp, o, h, l, c, v]) in place; a candle
+        with the timestamp of the last one replaces it.
+        '''
+        if isinstance(candle, dict):
+            candle = [candle[column] for column in ('timestamp', 'open', 'high', 'low', 'close', 'volume')]
+        buffer = self.data.buffer(f"{symbol}_{timeframe}")
+        previous = buffer.last()
+        appended = buffer.append(*candle)
+        resampler = self.resamplers.get((symbol, timeframe))
+        if resampler is not None and appended and previous is not None and int(candle[0]) > previous['timestamp']:
+            # A new base candle opened: the previous one is closed and updates the derived timeframes
+            self._append_resampled(symbol, resampler.update(*previous.values()))
+        return appended
+
+    def track_timeframes(self, symbol: str, base_timeframe: str, timeframes):
+        '''
+        Keep `timeframes` up to date from the `base_timeframe` candles passed
+        to append_candle, bar by bar (Resampler). The base candles of the bars
+        still open are replayed, except the last one which may still be open.
+        '''
+        resampler = Resampler(timeframes, base_timeframe)
+        window = self.data.window(f"{symbol}_{base_timeframe}")
+        if len(window) > 1:
+            last = int(window.timestamp[-1])
+            first = min(last - last % timeframe_to_ms(timeframe) for timeframe in timeframes)
+            start = int(np.searchsorted(window.timestamp, first))
+            columns = [window[column] for column in ('timestamp', 'open', 'high', 'low', 'close', 'volume')]
+            for i in range(start, len(window) - 1):
+                self._append_resampled(symbol, resampler.update(*(float(column[i]) for column in columns)))
+        self.resamplers[(symbol, base_timeframe)] = resampler
+        return resampler
+
+    def _append_resampled(self, symbol, closed):
+        for timeframe, bar in closed:
+            buffer = self.data.buffer(f"{symbol}_{timeframe}")
+            last = buffer.last()
+            if last is not None and last['timestamp'] > bar[0]:
+                # A bar opened by update_from_ticker is already there: the closed bar goes before it
+                buffer.truncate_after(bar[0])
+                buffer.append(*bar)
+                buffer.append(*last.values())
+            else:
+                buffer.append(*bar)
+
+    def update_from_ticker(self, symbol: str, timeframe: str, ticker: Dict) -> bool:
+        '''
+        Fold a ticker's last price into the open candle of `timeframe`
+        (opening a new one when the ticker belongs to the next bar).
+        '''
+        price = ticker.get('last', ticker.get('close'))
+        timestamp = ticker.get('timestamp')
+        if price is None or timestamp is None:
+            return False
+        buffer = self.data.buffer(f"{symbol}_{timeframe}")
+        bar = align(int(timestamp), timeframe)
+        last = buffer.last()
+        if last is not None and last['timestamp'] == bar:
+            return buffer.append(bar, last['open'], max(last['high'], price), min(last['low'], price), price, last['volume'])
+        return buffer.append(bar, price, price, price, price, 0.)
+
     async def update_data(self, symbol: str, timeframe: str):
         existing_data = self.get_data(symbol, timeframe)
+        if existing_data.empty and self.store is not None:
+            existing_data = self.load_from_store(symbol, timeframe)
         if not existing_data.empty:
             since = int(existing_data.index[-1].timestamp() * 1000)
         else:
             since = None
         new_data = await self.fetch_historical_data(symbol, timeframe, since)
-        updated_data = pd.concat([existing_data, new_data]).drop_duplicates().sort_index()
+        updated_data = pd.concat([existing_data, new_data])
+        updated_data = updated_data[~updated_data.index.duplicated(keep='last')].sort_index()
         self.data[f"{symbol}_{timeframe}"] = updated_data
 
+    def derive_timeframe(self, symbol: str, base_timeframe: str, timeframe: str) -> pd.DataFrame:
+        '''
+        Build the `timeframe` candles from the stored `base_timeframe` ones
+        instead of fetching them; the bar still open is left out.
+        '''
+        df = resample(self.get_data(symbol, base_timeframe), timeframe, base_timeframe)
+        self.data[f"{symbol}_{timeframe}"] = df
+        return df
+
     def get_missing_data_ranges(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> list:
-        data = self.get_data(symbol, timeframe)
-        if data.empty:
-            return [(start_date, end_date)]
-
-        missing_ranges = []
-        current_date = start_date
-
-        while current_date < end_date:
-            if current_date not in data.index:
-                range_start = current_date
-                while current_date < end_date and current_date not in data.index:
-                    current_date += timedelta(minutes=1)  # Assume 1-minute timeframe, adjust as needed
-                missing_ranges.append((range_start, current_date))
-            else:
-                current_date += timedelta(minutes=1)
+        '''
+        Merged [start, end) ranges of the bars of `timeframe` missing between
+        start_date and end_date, from the gaps between consecutive stored bars.
+        '''
+        step = timeframe_to_ms(timeframe)
+        start = pd.Timestamp(start_date).value // 1_000_000
+        end = pd.Timestamp(end_date).value // 1_000_000
+        first = -(-start // step) * step  # first bar opening at or after start_date
+        if first >= end:
+            return []
+
+        key = f"{symbol}_{timeframe}"
+        # Test the buffers directly: no frame is built and no empty buffer is created
+        timestamps = self.data.window(key).timestamp if key in self.data.buffers else np.array([], dtype=np.int64)
+        lo, hi = np.searchsorted(timestamps, [first, end])
+        # Bars before and after the range act as sentinels, so leading and trailing gaps are found like the others
+        bounds = np.concatenate(([first - step], timestamps[lo:hi], [end + step - 1 - (end - 1 - first) % step]))
+        gaps = np.flatnonzero(np.diff(bounds) > step)
+        return [(pd.Timestamp(int(bounds[i]) + step, unit='ms'), pd.Timestamp(min(int(bounds[i + 1]), end), unit='ms'))
+                for i in gaps]
 
-        return missing_ranges
+    async def backfill_missing(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> int:
+        '''
+        Fetch only the missing ranges (concurrently, through the Backfill) and
+        merge them into the data. Returns the number of bars fetched.
+        '''
+        ranges = self.get_missing_data_ranges(symbol, timeframe, start_date, end_date)
+        if not ranges:
+            return 0
+        # One semaphore for every range: at most `concurrency` requests in flight in total
+        semaphore = asyncio.Semaphore(self.backfill.concurrency)
+        results = await asyncio.gather(*(
+            self.backfill.run(symbol, timeframe, range_start.value // 1_000_000, range_end.value // 1_000_000, semaphore)
+            for range_start, range_end in ranges))
+        ohlcv = [row for rows in results for row in rows]
+        if ohlcv:
+            existing_data = self.get_data(symbol, timeframe)
+            updated_data = pd.concat([existing_data, ohlcv_frame(ohlcv)]) if not existing_data.empty else ohlcv_frame(ohlcv)
+            updated_data = updated_data[~updated_data.index.duplicated(keep='last')].sort_index()
+            self.data[f"{symbol}_{timeframe}"] = updated_data
+        return len(ohlcv)
 
     def get_data_info(self) -> Dict[str, Any]:
         info = {}
@@ -0,0 +1,148 @@
+import asyncio
+import json
+from collections import defaultdict
+from utils.logging_config import setup_logging
+
+CHANNELS = ('ticker', 'trades', 'candles', 'orderbook')
+
+
+class StreamClosed(Exception):
+    pass
+
+
+class WebSocketTransport:
+    '''
+    JSON messages over a WebSocket (aiohttp). Any object with the same
+    connect / send / receive / close coroutines can be used as a transport,
+    e.g. an adapter normalizing an exchange's own feed.
+    '''
+    def __init__(self, url, heartbeat=20):
+        self.url = url
+        self.heartbeat = heartbeat
+        self.session = None
+        self.ws = None
+
+    async def connect(self):
+        import aiohttp
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        self.ws = await self.session.ws_connect(self.url, heartbeat=self.heartbeat)
+
+    async def send(self, message):
+        await self.ws.send_str(json.dumps(message))
+
+    async def receive(self):
+        import aiohttp
+        msg = await self.ws.receive()
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            return json.loads(msg.data)
+        raise StreamClosed(f"WebSocket closed ({msg.type.name})")
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self.session is not None:
+            await self.session.close()
+
+
+class MarketStream:
+    '''
+    Push-based market data: subscribers get ticker, trade, candle and order book updates
+    as soon as the transport delivers them.
+
+    Messages are {"channel", "symbol", "seq", "data"}; `seq` increases by one
+    per channel and symbol. A jump in `seq` is reported to the `on_gap`
+    callbacks (e.g. to resynchronize from REST) before the message is
+    delivered. When the connection drops the stream reconnects with
+    exponential backoff and subscribes again; sequences restart after a
+    reconnect, so they are checked per connection.
+    '''
+    def __init__(self, transport, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.transport = transport
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscribers = defaultdict(list)
+        self.gap_handlers = []
+        self.sequences = {}
+        self.gaps = 0
+        self.reconnects = 0
+        self.running = False
+        self.connected = asyncio.Event()
+        self.pending = set()
+        self.logger, _ = setup_logging()
+
+    def subscribe(self, channel, symbol, callback):
+        '''
+        Register `callback(symbol, data)` (function or coroutine function) for a channel and symbol.
+        '''
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown channel: {channel} (expected one of {', '.join(CHANNELS)})")
+        key = (channel, symbol)
+        new = key not in self.subscribers
+        self.subscribers[key].append(callback)
+        if new and self.connected.is_set():
+            # Already connected: send the subscription now (otherwise it is sent on connection)
+            task = asyncio.ensure_future(self.transport.send({'op': 'subscribe', 'channel': channel, 'symbol': symbol}))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+
+    def on_gap(self, callback):
+        '''
+        Register `callback(channel, symbol, expected_seq, received_seq)`.
+        '''
+        self.gap_handlers.append(callback)
+
+    async def run(self):
+        self.running = True
+        delay = self.reconnect_delay
+        while self.running:
+            try:
+                await self.transport.connect()
+                self.sequences.clear()
+                for channel, symbol in list(self.subscribers):
+                    await self.transport.send({'op': 'subscribe', 'channel': channel, 'symbol': symbol})
+                self.connected.set()
+                delay = self.reconnect_delay
+                while self.running:
+                    await self.dispatch(await self.transport.receive())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected.clear()
+                if not self.running:
+                    break
+                self.reconnects += 1
+                self.logger.warning(f"Market stream disconnected ({e}), reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        self.connected.clear()
+
+    async def stop(self):
+        self.running = False
+        await self.transport.close()
+
+    async def dispatch(self, message):
+        channel, symbol = message.get('channel'), message.get('symbol')
+        key = (channel, symbol)
+        seq = message.get('seq')
+        if seq is not None:
+            previous = self.sequences.get(key)
+            if previous is not None and seq != previous + 1:
+                if seq <= previous:
+                    return  # duplicate or replayed message
+                self.gaps += 1
+                self.logger.warning(f"Sequence gap on {channel} {symbol}: expected {previous + 1}, got {seq}")
+                for handler in self.gap_handlers:
+                    await _call(handler, channel, symbol, previous + 1, seq)
+            self.sequences[key] = seq
+        for callback in self.subscribers.get(key, ()):
+            try:
+                await _call(callback, symbol, message.get('data'))
+            except Exception as e:
+                self.logger.error(f"Error in {channel} subscriber for {symbol}: {e}")
+
+
+async def _call(callback, *args):
+    result = callback(*args)
+    if asyncio.iscoroutine(result):
+        await result
@@ -1,32 +1,107 @@
-
 import asyncio
+import time
 from typing import List, Dict
 from core.exchange_handler import ExchangeHandler
 from utils.logging_config import setup_logging
 
 class RealTimeDataManager:
-    def __init__(self, exchange_handler: ExchangeHandler, symbols: List[str]):
-        self.logger = setup_logging()
+    def __init__(self, exchange_handler: ExchangeHandler, symbols: List[str], stream=None,
+                 min_interval: float = 1.0, max_interval: float = 30.0, activity_threshold: float = 0.0005):
+        self.logger, _ = setup_logging()
         self.exchange_handler = exchange_handler
         self.symbols = symbols
         self.running = False
         self.latest_data: Dict[str, Dict] = {}
+        # Polling adaptatif (sans stream) : l'intervalle d'un symbole est divisé par deux quand son prix
+        # bouge de plus de `activity_threshold` (relatif), et multiplié par 1,5 quand il ne bouge pas
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.activity_threshold = activity_threshold
+        self.intervals = {symbol: min_interval for symbol in symbols}
+        self.next_poll = {symbol: 0. for symbol in symbols}
+        self.last_update: Dict[str, float] = {}
+        self.last_change: Dict[str, float] = {}
+        self.volatility: Dict[str, float] = {}
+        self.polls = {symbol: 0 for symbol in symbols}
+        # MarketStream optionnel : les tickers sont poussés dès leur arrivée, sans polling
+        self.stream = stream
+        if stream is not None:
+            for symbol in symbols:
+                stream.subscribe('ticker', symbol, self.on_ticker)
+
+    def on_ticker(self, symbol: str, data: Dict):
+        self.latest_data[symbol] = data
+        self.last_update[symbol] = time.monotonic()
 
     async def start(self):
         self.logger.info("Démarrage du gestionnaire de données en temps réel")
         self.running = True
+        if self.stream is not None:
+            await self.stream.run()
+            return
         while self.running:
             try:
-                for symbol in self.symbols:
-                    data = await self.exchange_handler.fetch_ticker(symbol)
-                    self.latest_data[symbol] = data
-                    self.logger.debug(f"Données en temps réel pour {symbol}: {data}")
-                await asyncio.sleep(1)  # Attendre 1 seconde avant la prochaine mise à jour
+                await self.poll_due_symbols()
             except Exception as e:
                 self.logger.error(f"Erreur lors de la récupération des données en temps réel : {e}")
+            # Attendre la prochaine échéance, au plus min_interval
+            delay = min(self.next_poll.values(), default=time.monotonic() + self.min_interval) - time.monotonic()
+            await asyncio.sleep(min(max(delay, 0.), self.min_interval))
+
+    async def poll_due_symbols(self):
+        '''
+        Récupère en une fois (fetch_tickers ou gather borné) les tickers des symboles dont l'échéance est passée.
+        '''
+        now = time.monotonic()
+        due = [symbol for symbol in self.symbols if self.next_poll.get(symbol, 0.) <= now]
+        if not due:
+            return []
+        tickers = await self.exchange_handler.get_tickers(due)
+        now = time.monotonic()
+        for symbol in due:
+            ticker = tickers.get(symbol)
+            if ticker:
+                self.update_interval(symbol, ticker, now)
+                self.latest_data[symbol] = ticker
+                self.last_update[symbol] = now
+            self.polls[symbol] = self.polls.get(symbol, 0) + 1
+            self.next_poll[symbol] = now + self.intervals.get(symbol, self.min_interval)
+        self.logger.debug(f"Tickers mis à jour : {len(tickers)}/{len(due)} symboles")
+        return due
+
+    def update_interval(self, symbol: str, ticker: Dict, now: float):
+        previous = self.latest_data.get(symbol, {}).get('last')
+        price = ticker.get('last')
+        interval = self.intervals.get(symbol, self.min_interval)
+        if previous and price is not None:
+            change = abs(price - previous) / previous
+            # Moyenne exponentielle des variations relatives entre deux polls
+            self.volatility[symbol] = 0.8 * self.volatility.get(symbol, change) + 0.2 * change
+            if change >= self.activity_threshold or self.volatility[symbol] >= self.activity_threshold:
+                interval = max(self.min_interval, interval / 2)
+            elif change == 0:
+                interval = min(self.max_interval, interval * 1.5)
+            if change > 0:
+                self.last_change[symbol] = now
+        self.intervals[symbol] = interval
+
+    def get_staleness(self) -> Dict[str, Dict]:
+        '''
+        Par symbole : âge de la dernière donnée (s), intervalle de polling courant, nombre de polls et volatilité estimée.
+        '''
+        now = time.monotonic()
+        return {symbol: {
+            'age': now - self.last_update[symbol] if symbol in self.last_update else None,
+            'since_last_change': now - self.last_change[symbol] if symbol in self.last_change else None,
+            'interval': self.intervals.get(symbol, self.min_interval),
+            'polls': self.polls.get(symbol, 0),
+            'volatility': self.volatility.get(symbol)
+        } for symbol in self.symbols}
 
-    def stop(self):
+    async def stop(self):
         self.running = False
+        if self.stream is not None:
+            await self.stream.stop()
         self.logger.info("Arrêt du gestionnaire de données en temps réel")
 
     def get_latest_data(self, symbol: str) -> Dict:
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from data.candle_buffer import frame_to_ohlcv
+from utils.timeframes import timeframe_to_ms
+
+
+def can_resample(base_timeframe, timeframe):
+    base, step = timeframe_to_ms(base_timeframe), timeframe_to_ms(timeframe)
+    return step > base and step % base == 0
+
+
+def resample(data, timeframe, base_timeframe='1m', include_partial=False):
+    '''
+    Aggregate candles of `base_timeframe` (a DataFrame indexed by time or
+    [timestamp, o, h, l, c, v] rows sorted by time) into `timeframe` bars:
+    first open, highest high, lowest low, last close, summed volume, bars
+    aligned on the epoch like the exchanges' own.
+
+    The last bar is partial when the base candle closing it has not been seen
+    yet; it is dropped unless `include_partial`. Missing base candles inside a
+    bar do not make it partial. Returns rows, or a DataFrame if given one.
+    '''
+    if not can_resample(base_timeframe, timeframe):
+        raise ValueError(f"Cannot build {timeframe} candles from {base_timeframe} candles")
+    as_frame = isinstance(data, pd.DataFrame)
+    rows = frame_to_ohlcv(data) if as_frame else np.asarray(data, dtype=np.float64).reshape(-1, 6)
+    step = timeframe_to_ms(timeframe)
+    base = timeframe_to_ms(base_timeframe)
+
+    timestamps = rows[:, 0].astype(np.int64)
+    buckets = timestamps - timestamps % step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]]) if len(rows) else np.array([], dtype=np.intp)
+    ends = np.r_[starts[1:], len(rows)] - 1 if len(rows) else starts
+
+    bars = np.empty((len(starts), 6))
+    if len(starts):
+        bars[:, 0] = buckets[starts]
+        bars[:, 1] = rows[starts, 1]
+        bars[:, 2] = np.maximum.reduceat(rows[:, 2], starts)
+        bars[:, 3] = np.minimum.reduceat(rows[:, 3], starts)
+        bars[:, 4] = rows[ends, 4]
+        bars[:, 5] = np.add.reduceat(rows[:, 5], starts)
+        if not include_partial and timestamps[-1] < buckets[-1] + step - base:
+            bars = bars[:-1]
+
+    if as_frame:
+        df = pd.DataFrame(bars[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                          index=pd.DatetimeIndex(pd.to_datetime(bars[:, 0].astype(np.int64), unit='ms'), name='timestamp'))
+        return df.astype(data['close'].dtype if 'close' in data else np.float64)
+    return [[int(bar[0]), *bar[1:].tolist()] for bar in bars]
+
+
+class Resampler:
+    '''
+    Incremental resampling: feed every closed base candle to update(), which
+    returns the (timeframe, bar) pairs closed by it. A bar is emitted as soon
+    as its last base candle arrives, or when a candle of a later bar arrives
+    if that one was missing. partial() gives the bar still being built.
+    '''
+    def __init__(self, timeframes, base_timeframe='1m'):
+        for timeframe in timeframes:
+            if not can_resample(base_timeframe, timeframe):
+                raise ValueError(f"Cannot build {timeframe} candles from {base_timeframe} candles")
+        self.base = timeframe_to_ms(base_timeframe)
+        self.steps = {timeframe: timeframe_to_ms(timeframe) for timeframe in timeframes}
+        self.current = {timeframe: None for timeframe in timeframes}
+        self.last_timestamp = None
+
+    def update(self, timestamp, open, high, low, close, volume):
+        timestamp = int(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return []
+        self.last_timestamp = timestamp
+        closed = []
+        for timeframe, step in self.steps.items():
+            bucket = timestamp - timestamp % step
+            bar = self.current[timeframe]
+            if bar is not None and bar[0] != bucket:
+                closed.append((timeframe, bar))
+                bar = None
+            if bar is None:
+                bar = [bucket, open, high, low, close, volume]
+            else:
+                bar[2] = max(bar[2], high)
+                bar[3] = min(bar[3], low)
+                bar[4] = close
+                bar[5] += volume
+            if timestamp == bucket + step - self.base:
+                closed.append((timeframe, bar))
+                bar = None
+            self.current[timeframe] = bar
+        return closed
+
+    def partial(self, timeframe):
+        bar = self.current[timeframe]
+        return list(bar) if bar is not None else None
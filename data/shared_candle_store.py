@@ -0,0 +1,238 @@
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from data.candle_buffer import CandleWindow, PRICE_COLUMNS
+from utils.precision import OHLCV_COLUMNS, get_storage_dtype
+
+MAGIC = 0x43414E444C455331  # "CANDLES1"
+HEADER_FIELDS = 8
+# Header slots (int64)
+_MAGIC, _CAPACITY, _ITEMSIZE, _SEQUENCE, _COUNT = range(5)
+
+
+def _open_segment(name):
+    '''
+    Attach to an existing segment without registering it with this process'
+    resource tracker, which would otherwise unlink it when the reader exits.
+    '''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        # Skip the registration: unregistering afterwards would also drop the writer's one in its own process
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedCandleBuffer:
+    '''
+    Candles of one symbol and timeframe in a shared memory segment: an int64
+    header, the int64 timestamps, then one column per price field.
+
+    A single writer process creates it (create=True) and appends; any number
+    of readers attach by name and get read-only NumPy views, without copy or
+    pickling. Rows below the published count are never rewritten, except the
+    last one (candle still open, same timestamp) and when the segment is full
+    and the newest half is moved to the front. Both happen inside a seqlock:
+    the writer makes the sequence odd, writes, then makes it even again, and
+    snapshot() retries until it reads the same even sequence before and after
+    copying. Zero-copy windows stay valid while is_current(version) holds.
+    Appending a new candle only writes past the count, then publishes the new
+    count, so it does not invalidate readers.
+    '''
+    def __init__(self, name, capacity=100_000, create=False, dtype=None):
+        self.name = name
+        self.writer = create
+        if create:
+            dtype = np.dtype(dtype or get_storage_dtype())
+            size = 8 * HEADER_FIELDS + capacity * (8 + len(PRICE_COLUMNS) * dtype.itemsize)
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=self.segment.buf)
+            self.header[:] = 0
+            self.header[_CAPACITY] = capacity
+            self.header[_ITEMSIZE] = dtype.itemsize
+            self.header[_MAGIC] = MAGIC
+        else:
+            self.segment = _open_segment(name)
+            self.header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=self.segment.buf)
+            if self.header[_MAGIC] != MAGIC:
+                raise ValueError(f"{name} is not a shared candle segment")
+        self.capacity = int(self.header[_CAPACITY])
+        self.dtype = np.dtype(np.float32 if self.header[_ITEMSIZE] == 4 else np.float64)
+
+        offset = 8 * HEADER_FIELDS
+        self.timestamps = np.ndarray(self.capacity, dtype=np.int64, buffer=self.segment.buf, offset=offset)
+        offset += 8 * self.capacity
+        self.values = {}
+        for column in PRICE_COLUMNS:
+            self.values[column] = np.ndarray(self.capacity, dtype=self.dtype, buffer=self.segment.buf, offset=offset)
+            offset += self.dtype.itemsize * self.capacity
+        if not create:
+            self.timestamps.flags.writeable = False
+            for values in self.values.values():
+                values.flags.writeable = False
+
+    @classmethod
+    def attach(cls, name):
+        return cls(name)
+
+    def __reduce__(self):
+        # Sent to another process (e.g. a pool worker) as its name: the worker attaches as a reader
+        return (SharedCandleBuffer.attach, (self.name,))
+
+    def __len__(self):
+        return int(self.header[_COUNT])
+
+    @property
+    def version(self):
+        return int(self.header[_SEQUENCE])
+
+    def is_current(self, version):
+        return self.version == version
+
+    # Writer
+
+    def append(self, timestamp, open, high, low, close, volume):
+        timestamp = int(timestamp)
+        count = len(self)
+        last = int(self.timestamps[count - 1]) if count else None
+        if last is not None and timestamp < last:
+            return False
+        if last is not None and timestamp == last:
+            self._begin_write()
+            self._write_row(count - 1, timestamp, open, high, low, close, volume)
+            self._end_write()
+            return True
+        if count == self.capacity:
+            count = self._make_room()
+        self._write_row(count, timestamp, open, high, low, close, volume)
+        self.header[_COUNT] = count + 1
+        return True
+
+    def extend(self, ohlcv):
+        '''
+        Bulk append of [timestamp, open, high, low, close, volume] rows sorted by time.
+        '''
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        count = len(self)
+        if count and len(rows):
+            last = int(self.timestamps[count - 1])
+            same = rows[:, 0].astype(np.int64) == last
+            if same.any():
+                self.append(*rows[same][-1])
+            rows = rows[rows[:, 0].astype(np.int64) > last]
+        rows = rows[-self.capacity:]
+        if count + len(rows) > self.capacity:
+            count = self._make_room(count + len(rows) - self.capacity)
+        stop = count + len(rows)
+        self.timestamps[count:stop] = rows[:, 0].astype(np.int64)
+        for column_index, column in enumerate(PRICE_COLUMNS, start=1):
+            self.values[column][count:stop] = rows[:, column_index]
+        self.header[_COUNT] = stop
+        return len(rows)
+
+    def close(self):
+        self.segment.close()
+
+    def unlink(self):
+        if self.writer:
+            self.segment.unlink()
+
+    def _write_row(self, index, timestamp, open, high, low, close, volume):
+        self.timestamps[index] = timestamp
+        self.values['open'][index] = open
+        self.values['high'][index] = high
+        self.values['low'][index] = low
+        self.values['close'][index] = close
+        self.values['volume'][index] = volume
+
+    def _make_room(self, needed=None):
+        # Keep the newest half (or less when more room is needed) at the front of the segment
+        count = len(self)
+        keep = min(count, self.capacity // 2) if needed is None else count - needed
+        self._begin_write()
+        self.timestamps[:keep] = self.timestamps[count - keep:count]
+        for values in self.values.values():
+            values[:keep] = values[count - keep:count]
+        self.header[_COUNT] = keep
+        self._end_write()
+        return keep
+
+    def _begin_write(self):
+        self.header[_SEQUENCE] += 1
+
+    def _end_write(self):
+        self.header[_SEQUENCE] += 1
+
+    # Readers
+
+    def window(self, n=None):
+        '''
+        Zero-copy CandleWindow over the latest n candles, and the version to
+        check with is_current() before trusting it.
+        '''
+        while True:
+            version = self.version
+            if version % 2 == 0:
+                break
+            time.sleep(0)
+        count = len(self)
+        n = count if n is None else max(0, min(n, count))
+        columns = {'timestamp': self.timestamps[count - n:count]}
+        columns.update({column: values[count - n:count] for column, values in self.values.items()})
+        for view in columns.values():
+            view.flags.writeable = False
+        return CandleWindow(columns), version
+
+    def snapshot(self, n=None):
+        '''
+        Consistent copy of the latest n candles (retries while the writer rewrites rows).
+        '''
+        while True:
+            window, version = self.window(n)
+            columns = {column: np.array(view) for column, view in window.columns.items()}
+            if self.is_current(version):
+                return CandleWindow(columns)
+
+
+class SharedCandleStore:
+    '''
+    SharedCandleBuffer per symbol and timeframe, named `<prefix>_<SYMBOL>_<timeframe>`.
+    The writer opens the store with create=True and buffers are created on
+    first write; readers attach lazily to the buffers the writer published.
+    '''
+    def __init__(self, prefix='candles', capacity=100_000, create=False):
+        self.prefix = prefix
+        self.capacity = capacity
+        self.create = create
+        self.buffers = {}
+
+    def segment_name(self, symbol, timeframe):
+        return f"{self.prefix}_{symbol.replace('/', '-')}_{timeframe}"
+
+    def buffer(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self.buffers:
+            name = self.segment_name(symbol, timeframe)
+            self.buffers[key] = SharedCandleBuffer(name, self.capacity, create=True) if self.create else SharedCandleBuffer(name)
+        return self.buffers[key]
+
+    def publish(self, symbol, timeframe, ohlcv):
+        return self.buffer(symbol, timeframe).extend(ohlcv)
+
+    def window(self, symbol, timeframe, n=None):
+        return self.buffer(symbol, timeframe).window(n)
+
+    def snapshot(self, symbol, timeframe, n=None):
+        return self.buffer(symbol, timeframe).snapshot(n)
+
+    def close(self):
+        for buffer in self.buffers.values():
+            buffer.close()
+            if self.create:
+                buffer.unlink()
+        self.buffers.clear()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from collections import defaultdict
+from aiohttp import web, WSMsgType
+
+
+class LocalStreamServer:
+    '''
+    Local WebSocket stand-in for an exchange feed, speaking the MarketStream
+    protocol: clients send {"op": "subscribe", "channel", "symbol"} and
+    receive {"channel", "symbol", "seq", "data"} for every publish().
+
+        server = LocalStreamServer()
+        await server.start()
+        stream = MarketStream(WebSocketTransport(server.url))
+
+    drop_connections() and skip_sequence() simulate disconnections and lost
+    messages.
+    '''
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.clients = {}
+        self.sequences = defaultdict(int)
+        self.runner = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/ws"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/ws', self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.drop_connections()
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def publish(self, channel, symbol, data):
+        key = (channel, symbol)
+        self.sequences[key] += 1
+        message = json.dumps({'channel': channel, 'symbol': symbol, 'seq': self.sequences[key], 'data': data})
+        for ws, subscriptions in list(self.clients.items()):
+            if key in subscriptions and not ws.closed:
+                await ws.send_str(message)
+
+    def skip_sequence(self, channel, symbol, count=1):
+        self.sequences[(channel, symbol)] += count
+
+    async def drop_connections(self):
+        for ws in list(self.clients):
+            await ws.close()
+        self.clients.clear()
+        # A new connection starts new sequences, as exchanges do
+        self.sequences.clear()
+
+    async def wait_for_subscribers(self, channel, symbol, count=1, timeout=5):
+        async def subscribed():
+            while sum((channel, symbol) in subscriptions for subscriptions in self.clients.values()) < count:
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(subscribed(), timeout)
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients[ws] = set()
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                break
+            message = json.loads(msg.data)
+            if message.get('op') == 'subscribe':
+                self.clients.get(ws, set()).add((message['channel'], message['symbol']))
+        self.clients.pop(ws, None)
+        return ws
@@ -0,0 +1,111 @@
+from collections import defaultdict
+from utils.timeframes import timeframe_to_ms
+
+
+class TradeAggregator:
+    '''
+    Builds OHLCV candles of several timeframes from raw trades.
+
+    Trades may arrive late or out of order: open and close are the prices of
+    the earliest and latest trade by trade timestamp, not by arrival. Each
+    symbol has a watermark, the latest trade timestamp seen minus
+    `allowed_lateness` (ms). A bar is closed once the watermark passes its
+    end. It is then passed to every `on_bar_close(symbol, timeframe, bar)`
+    callback, in time order, as [timestamp, open, high, low, close, volume].
+    A trade whose bar is already closed in any timeframe is counted in
+    `late_trades` and dropped, so all timeframes see the same trades. Periods without trades produce no bar.
+    advance_watermark() closes bars on wall-clock time when a market is idle.
+    '''
+    def __init__(self, timeframes=('1m',), allowed_lateness=2_000, on_bar_close=None):
+        self.steps = {timeframe: timeframe_to_ms(timeframe) for timeframe in timeframes}
+        self.allowed_lateness = allowed_lateness
+        self.callbacks = [on_bar_close] if on_bar_close is not None else []
+        # symbol -> timeframe -> bar start -> [open, high, low, close, volume, first trade ts, last trade ts]
+        self.open_bars = defaultdict(lambda: {timeframe: {} for timeframe in self.steps})
+        self.closed_until = defaultdict(dict)
+        self.watermarks = {}
+        self.trades = 0
+        self.late_trades = 0
+
+    def on_bar_close(self, callback):
+        self.callbacks.append(callback)
+
+    def add_trade(self, symbol, timestamp, price, amount):
+        '''
+        Returns the bars closed by this trade as (timeframe, bar) pairs.
+        '''
+        timestamp, price, amount = int(timestamp), float(price), float(amount)
+        closed_until = self.closed_until[symbol]
+        if any(timestamp < closed_until.get(timeframe, timestamp) for timeframe in self.steps):
+            self.late_trades += 1
+            return []
+        self.trades += 1
+        bars = self.open_bars[symbol]
+        for timeframe, step in self.steps.items():
+            start = timestamp - timestamp % step
+            bar = bars[timeframe].get(start)
+            if bar is None:
+                bars[timeframe][start] = [price, price, price, price, amount, timestamp, timestamp]
+                continue
+            if price > bar[1]:
+                bar[1] = price
+            if price < bar[2]:
+                bar[2] = price
+            if timestamp < bar[5]:
+                bar[0], bar[5] = price, timestamp
+            if timestamp >= bar[6]:
+                bar[3], bar[6] = price, timestamp
+            bar[4] += amount
+        return self.advance_watermark(symbol, timestamp - self.allowed_lateness)
+
+    def add_trades(self, symbol, trades):
+        '''
+        Trades as ccxt dicts ('timestamp', 'price', 'amount') or (timestamp, price, amount) tuples.
+        '''
+        closed = []
+        for trade in trades:
+            if isinstance(trade, dict):
+                closed.extend(self.add_trade(symbol, trade['timestamp'], trade['price'], trade['amount']))
+            else:
+                closed.extend(self.add_trade(symbol, *trade))
+        return closed
+
+    def advance_watermark(self, symbol, watermark):
+        if watermark <= self.watermarks.get(symbol, watermark - 1):
+            return []
+        self.watermarks[symbol] = watermark
+        closed = []
+        for timeframe, step in self.steps.items():
+            bars = self.open_bars[symbol][timeframe]
+            for start in sorted(start for start in bars if start + step <= watermark):
+                bar = bars.pop(start)
+                closed.append((timeframe, [start, *bar[:5]]))
+            # Trades before this point can no longer be added to a bar
+            boundary = watermark - watermark % step
+            if boundary > self.closed_until[symbol].get(timeframe, boundary - 1):
+                self.closed_until[symbol][timeframe] = boundary
+        for timeframe, bar in closed:
+            for callback in self.callbacks:
+                callback(symbol, timeframe, bar)
+        return closed
+
+    def discard_until(self, symbol, timestamp):
+        '''
+        Drop the open bars ending at or before `timestamp` and the trades
+        older than it, e.g. once those bars have been reloaded from REST after
+        a gap in the trade stream.
+        '''
+        for timeframe, step in self.steps.items():
+            bars = self.open_bars[symbol][timeframe]
+            for start in [start for start in bars if start + step <= timestamp]:
+                del bars[start]
+            boundary = timestamp - timestamp % step
+            if boundary > self.closed_until[symbol].get(timeframe, boundary - 1):
+                self.closed_until[symbol][timeframe] = boundary
+
+    def partial(self, symbol, timeframe):
+        '''
+        Bars still open for a symbol and timeframe, oldest first.
+        '''
+        bars = self.open_bars[symbol][timeframe]
+        return [[start, *bars[start][:5]] for start in sorted(bars)]
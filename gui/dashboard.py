@@ -1,4 +1,5 @@
 
+from itertools import islice
 import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
@@ -96,5 +97,6 @@ class Dashboard:
 
         # Mettre à jour les dernières transactions
         self.transactions_tree.delete(*self.transactions_tree.get_children())
-        for transaction in self.engine.portfolio.trade_history[-10:]:  # Afficher les 10 dernières transactions
-            self.transactions_tree.insert('', 0, values=(transaction['timestamp'], transaction['symbol'], transaction['type'], transaction['amount'], transaction['price']))
+        # Afficher les 10 dernières transactions, la plus récente en haut (trade_history est une deque)
+        for transaction in islice(reversed(self.engine.portfolio.trade_history), 10):
+            self.transactions_tree.insert('', 'end', values=(transaction['timestamp'], transaction['symbol'], transaction['type'], transaction['amount'], transaction['price']))
@@ -0,0 +1,59 @@
+import math
+import numpy as np
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.dmi import DMI, StreamingDMI
+from indicators.smoothing import wilder
+
+def _directional_movement_index(plus_di, minus_di):
+    total = plus_di + minus_di
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, 100. * np.abs(plus_di - minus_di) / total, 0.)
+
+class ADX(BaseIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+
+    def calculate(self, high, low, close):
+        # DX from bar `period`, averaged over its first `period` values, then Wilder smoothing
+        plus_di, minus_di = DMI(self.period).calculate(high, low, close)
+        dx = _directional_movement_index(plus_di, minus_di)
+        return wilder(dx, self.period, start=2 * self.period - 1)
+
+class StreamingADX(BaseStreamingIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = np.nan
+        self.dmi = StreamingDMI(self.period)
+        self.warmup = []
+
+    def seed(self, high, low, close):
+        self.reset()
+        close = np.array(close, dtype=float)
+        if len(close) < 2 * self.period:
+            for bar in zip(high, low, close):
+                self.update(*bar)
+            return self
+        self.dmi.seed(high, low, close)
+        self.value = ADX(self.period).calculate(high, low, close)[-1]
+        return self
+
+    def update(self, high, low, close):
+        plus_di, minus_di = self.dmi.update(high, low, close)
+        if math.isnan(plus_di):
+            return self.value
+
+        total = plus_di + minus_di
+        dx = 100. * abs(plus_di - minus_di) / total if total > 0 else 0.
+        if math.isnan(self.value):
+            self.warmup.append(dx)
+            if len(self.warmup) == self.period:
+                self.value = sum(self.warmup) / self.period
+                self.warmup = []
+        else:
+            self.value = (self.value * (self.period - 1) + dx) / self.period
+        return self.value
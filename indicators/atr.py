@@ -0,0 +1,76 @@
+import math
+import numpy as np
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.smoothing import wilder
+
+def true_range(high, low, close):
+    '''
+    max(high - low, |high - previous close|, |low - previous close|) along the
+    last axis; the first bar has no previous close and uses high - low.
+    '''
+    high = np.array(high, dtype=float)
+    low = np.array(low, dtype=float)
+    close = np.array(close, dtype=float)
+    ranges = high - low
+    previous_close = close[..., :-1]
+    ranges[..., 1:] = np.maximum.reduce([ranges[..., 1:],
+                                         np.abs(high[..., 1:] - previous_close),
+                                         np.abs(low[..., 1:] - previous_close)])
+    return ranges
+
+def _true_range_step(high, low, previous_close):
+    if previous_close is None:
+        return high - low
+    return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+class TrueRange(BaseIndicator):
+    def calculate(self, high, low, close):
+        return true_range(high, low, close)
+
+class ATR(BaseIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+
+    def calculate(self, high, low, close):
+        # Wilder's ATR: mean of the first `period` true ranges (from bar 1), then Wilder smoothing
+        return wilder(true_range(high, low, close), self.period, start=self.period)
+
+class StreamingATR(BaseStreamingIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = np.nan
+        self.previous_close = None
+        self.warmup = []
+
+    def seed(self, high, low, close):
+        self.reset()
+        close = np.array(close, dtype=float)
+        if len(close) <= self.period:
+            for bar in zip(high, low, close):
+                self.update(*bar)
+            return self
+        self.value = ATR(self.period).calculate(high, low, close)[-1]
+        self.previous_close = close[-1]
+        return self
+
+    def update(self, high, low, close):
+        high, low, close = float(high), float(low), float(close)
+        if self.previous_close is None:
+            self.previous_close = close
+            return self.value
+
+        value = _true_range_step(high, low, self.previous_close)
+        self.previous_close = close
+        if math.isnan(self.value):
+            self.warmup.append(value)
+            if len(self.warmup) == self.period:
+                self.value = sum(self.warmup) / self.period
+                self.warmup = []
+        else:
+            self.value = (self.value * (self.period - 1) + value) / self.period
+        return self.value
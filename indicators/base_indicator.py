@@ -1,7 +1,32 @@
 
+from indicators.panel import calculate_panel
+
 class BaseIndicator:
     def __init__(self):
         pass
 
     def calculate(self, data):
         raise NotImplementedError("Subclass must implement abstract method")
+
+    def calculate_panel(self, data, column='close'):
+        '''
+        Compute the indicator for many symbols at once from a symbols x time
+        array, a DataFrame with one column per symbol or a dict of per-symbol
+        series. Results come back in the same layout; ragged histories and
+        gaps are handled by indicators.panel.
+        '''
+        return calculate_panel(self, data, column)
+
+class BaseStreamingIndicator:
+    '''
+    Incremental counterpart of a BaseIndicator: seeded once from history,
+    then updated one price at a time with a cost independent of history length.
+    '''
+    def __init__(self):
+        self.value = None
+
+    def seed(self, data):
+        raise NotImplementedError("Subclass must implement abstract method")
+
+    def update(self, price):
+        raise NotImplementedError("Subclass must implement abstract method")
@@ -1,6 +1,8 @@
 
+from collections import deque
 import numpy as np
-from indicators.base_indicator import BaseIndicator
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.rolling import rolling_mean_std
 
 class BollingerBands(BaseIndicator):
     def __init__(self, period=20, std_dev=2):
@@ -9,26 +11,25 @@ class BollingerBands(BaseIndicator):
         self.std_dev = std_dev
 
     def calculate(self, data):
-        close_prices = np.array(data)
-        
-        # Calculate middle band (simple moving average)
-        middle_band = np.convolve(close_prices, np.ones(self.period), 'valid') / self.period
+        close_prices = np.array(data, dtype=float)
 
-        # Calculate standard deviation
-        rolling_std = np.std([close_prices[i:i+self.period] for i in range(len(close_prices)-self.period+1)], axis=1)
+        # Rolling middle band (simple moving average) and standard deviation in one O(n) pass
+        middle_band, rolling_std = rolling_mean_std(close_prices, self.period)
 
-        # Calculate upper and lower bands
+        # Calculate upper and lower bands (NaN until the first full window)
         upper_band = middle_band + (rolling_std * self.std_dev)
         lower_band = middle_band - (rolling_std * self.std_dev)
 
-        # Pad the beginning of the bands to match the input data length
-        padding = np.array([np.nan] * (len(close_prices) - len(middle_band)))
-        middle_band = np.concatenate((padding, middle_band))
-        upper_band = np.concatenate((padding, upper_band))
-        lower_band = np.concatenate((padding, lower_band))
-
         return upper_band, middle_band, lower_band
 
+    def calculate_all(self, data):
+        close_prices = np.array(data, dtype=float)
+        upper_band, middle_band, lower_band = self.calculate(close_prices)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bandwidth = (upper_band - lower_band) / middle_band
+            percent_b = (close_prices - lower_band) / (upper_band - lower_band)
+        return upper_band, middle_band, lower_band, bandwidth, percent_b
+
     def get_signal(self, data):
         close_prices = np.array(data)
         upper_band, middle_band, lower_band = self.calculate(close_prices)
@@ -45,12 +46,63 @@ class BollingerBands(BaseIndicator):
             return 'NEUTRAL'
 
     def get_bandwidth(self, data):
-        upper_band, middle_band, lower_band = self.calculate(data)
-        bandwidth = (upper_band - lower_band) / middle_band
-        return bandwidth
+        return self.calculate_all(data)[3]
 
     def get_percent_b(self, data):
-        close_prices = np.array(data)
-        upper_band, _, lower_band = self.calculate(close_prices)
-        percent_b = (close_prices - lower_band) / (upper_band - lower_band)
-        return percent_b
+        return self.calculate_all(data)[4]
+
+class StreamingBollingerBands(BaseStreamingIndicator):
+    def __init__(self, period=20, std_dev=2):
+        super().__init__()
+        self.period = period
+        self.std_dev = std_dev
+        self.reset()
+
+    def reset(self):
+        self.window = deque(maxlen=self.period)
+        self.mean = np.nan
+        self.m2 = np.nan
+        self.updates_since_resync = 0
+        self.value = (np.nan, np.nan, np.nan)
+
+    def seed(self, data):
+        self.reset()
+        self.window.extend(np.array(data, dtype=float)[-self.period:])
+        if len(self.window) == self.period:
+            self._resync()
+        return self
+
+    def update(self, price):
+        price = float(price)
+        if len(self.window) < self.period:
+            self.window.append(price)
+            if len(self.window) == self.period:
+                self._resync()
+            return self.value
+
+        # Sliding-window Welford update: the oldest price leaves, the new one enters
+        oldest = self.window[0]
+        self.window.append(price)
+        previous_mean = self.mean
+        self.mean = previous_mean + (price - oldest) / self.period
+        self.m2 += (price - oldest) * (price - self.mean + oldest - previous_mean)
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.period:
+            # Recompute from the window once per period to bound rounding drift (amortized O(1))
+            self._resync()
+        else:
+            self._set_value()
+        return self.value
+
+    def _resync(self):
+        window = np.array(self.window)
+        self.mean = window.mean()
+        self.m2 = np.sum((window - self.mean) ** 2)
+        self.updates_since_resync = 0
+        self._set_value()
+
+    def _set_value(self):
+        rolling_std = np.sqrt(max(self.m2, 0.) / self.period)
+        upper_band = self.mean + (rolling_std * self.std_dev)
+        lower_band = self.mean - (rolling_std * self.std_dev)
+        self.value = (upper_band, self.mean, lower_band)
@@ -0,0 +1,100 @@
+import numpy as np
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.atr import true_range, _true_range_step
+from indicators.smoothing import wilder
+
+def directional_movement(high, low):
+    '''
+    +DM and -DM along the last axis (0 for the first bar).
+    '''
+    high = np.array(high, dtype=float)
+    low = np.array(low, dtype=float)
+    up_move = np.zeros_like(high)
+    down_move = np.zeros_like(low)
+    up_move[..., 1:] = high[..., 1:] - high[..., :-1]
+    down_move[..., 1:] = low[..., :-1] - low[..., 1:]
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.)
+    return plus_dm, minus_dm
+
+def _directional_index(smoothed_dm, smoothed_tr):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(smoothed_tr > 0, 100. * smoothed_dm / smoothed_tr, 0.)
+
+class DMI(BaseIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+
+    def calculate(self, high, low, close):
+        # Wilder smoothing of TR, +DM and -DM over bars 1..n-1; NaN before bar `period`
+        plus_dm, minus_dm = directional_movement(high, low)
+        smoothed_tr = wilder(true_range(high, low, close), self.period, start=self.period)
+        plus_di = _directional_index(wilder(plus_dm, self.period, start=self.period), smoothed_tr)
+        minus_di = _directional_index(wilder(minus_dm, self.period, start=self.period), smoothed_tr)
+        plus_di[..., :self.period] = np.nan
+        minus_di[..., :self.period] = np.nan
+        return plus_di, minus_di
+
+class StreamingDMI(BaseStreamingIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = (np.nan, np.nan)
+        self.previous = None
+        self.smoothed = None
+        self.warmup = []
+
+    def seed(self, high, low, close):
+        self.reset()
+        high = np.array(high, dtype=float)
+        low = np.array(low, dtype=float)
+        close = np.array(close, dtype=float)
+        if len(close) <= self.period:
+            for bar in zip(high, low, close):
+                self.update(*bar)
+            return self
+
+        plus_dm, minus_dm = directional_movement(high, low)
+        self.smoothed = [float(wilder(values, self.period, start=self.period)[-1])
+                         for values in (true_range(high, low, close), plus_dm, minus_dm)]
+        self.previous = (high[-1], low[-1], close[-1])
+        self._set_value()
+        return self
+
+    def update(self, high, low, close):
+        high, low, close = float(high), float(low), float(close)
+        if self.previous is None:
+            self.previous = (high, low, close)
+            return self.value
+
+        previous_high, previous_low, previous_close = self.previous
+        up_move = high - previous_high
+        down_move = previous_low - low
+        bar = (_true_range_step(high, low, previous_close),
+               up_move if up_move > down_move and up_move > 0 else 0.,
+               down_move if down_move > up_move and down_move > 0 else 0.)
+        self.previous = (high, low, close)
+
+        if self.smoothed is None:
+            self.warmup.append(bar)
+            if len(self.warmup) == self.period:
+                self.smoothed = [sum(values) / self.period for values in zip(*self.warmup)]
+                self.warmup = []
+                self._set_value()
+        else:
+            # Plain floats: numpy scalars would dominate the per-update cost
+            self.smoothed = [(smoothed * (self.period - 1) + value) / self.period
+                             for smoothed, value in zip(self.smoothed, bar)]
+            self._set_value()
+        return self.value
+
+    def _set_value(self):
+        smoothed_tr, plus_dm, minus_dm = self.smoothed
+        if smoothed_tr > 0:
+            self.value = (100. * plus_dm / smoothed_tr, 100. * minus_dm / smoothed_tr)
+        else:
+            self.value = (0., 0.)
@@ -0,0 +1,31 @@
+import numpy as np
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators import smoothing
+
+class EMA(BaseIndicator):
+    def __init__(self, period=20):
+        super().__init__()
+        self.period = period
+
+    def calculate(self, data):
+        # Seeded with the first price, like pandas ewm(span=period, adjust=False)
+        return smoothing.ema(np.array(data, dtype=float), self.period)
+
+class StreamingEMA(BaseStreamingIndicator):
+    def __init__(self, period=20):
+        super().__init__()
+        self.period = period
+        self.alpha = 2 / (period + 1)
+
+    def seed(self, data):
+        close_prices = np.array(data, dtype=float)
+        self.value = smoothing.ema(close_prices, self.period)[-1] if len(close_prices) else None
+        return self
+
+    def update(self, price):
+        price = float(price)
+        if self.value is None:
+            self.value = price
+        else:
+            self.value = self.alpha * price + (1 - self.alpha) * self.value
+        return self.value
@@ -0,0 +1,147 @@
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Default memory budget of the shared indicator cache, in bytes
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class IndicatorCache:
+    '''
+    LRU cache of indicator results, bounded by the memory size of the cached
+    values. Results are stored read-only since they are shared between callers.
+    '''
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+        self.misses += 1
+        return self.put(key, compute())
+
+    def put(self, key, result):
+        result = _freeze(result)
+        nbytes = result_nbytes(result)
+        if nbytes > self.max_bytes:
+            return result
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        self.entries[key] = (result, nbytes)
+        self.size += nbytes
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+        return result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class CachedIndicator:
+    '''
+    Wraps an indicator so that `calculate` goes through an IndicatorCache.
+
+    The key is (indicator class, parameters, input fingerprint). When `symbol`
+    and `timeframe` are given, the fingerprint is cheap: symbol, timeframe,
+    last timestamp, length and last value of every input, which assumes closed
+    candles never change. Without them the input bytes are hashed instead.
+    Every other attribute is forwarded to the wrapped indicator.
+    '''
+    def __init__(self, indicator, cache):
+        self.indicator = indicator
+        self.cache = cache
+
+    def calculate(self, *data, symbol=None, timeframe=None, timestamp=None):
+        key = (type(self.indicator).__name__, indicator_parameters(self.indicator),
+               fingerprint(data, symbol, timeframe, timestamp))
+        return self.cache.get_or_compute(key, lambda: self.indicator.calculate(*data))
+
+    def __getattr__(self, name):
+        return getattr(self.indicator, name)
+
+
+def indicator_parameters(indicator):
+    '''
+    Hashable view of the scalar attributes of an indicator (its parameters).
+    '''
+    return tuple(sorted((name, value) for name, value in vars(indicator).items()
+                        if isinstance(value, (int, float, str, bool, type(None)))))
+
+
+def fingerprint(data, symbol=None, timeframe=None, timestamp=None):
+    '''
+    Cheap identity of a tuple of indicator inputs (see CachedIndicator).
+    '''
+    if symbol is None or timeframe is None:
+        digest = hashlib.blake2b(digest_size=16)
+        for values in data:
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            digest.update(str(values.shape).encode())
+            digest.update(values.tobytes())
+        return ('hash', digest.hexdigest())
+
+    if timestamp is None and isinstance(data[0], (pd.Series, pd.DataFrame)) and len(data[0]):
+        timestamp = data[0].index[-1]
+    lasts = tuple(_last_value(values) for values in data)
+    return (symbol, timeframe, timestamp, len(data[0]), lasts)
+
+
+def result_nbytes(result):
+    if isinstance(result, (tuple, list)):
+        return sum(result_nbytes(values) for values in result)
+    if isinstance(result, dict):
+        return sum(result_nbytes(values) for values in result.values())
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=False).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(index=False))
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    return 64
+
+
+def _last_value(values):
+    if isinstance(values, pd.DataFrame):
+        return tuple(values.iloc[-1]) if len(values) else None
+    values = np.asarray(values)
+    if values.size == 0:
+        return None
+    return tuple(values[..., -1].ravel().tolist())
+
+
+def _freeze(result):
+    if isinstance(result, tuple):
+        return tuple(_freeze(values) for values in result)
+    if isinstance(result, dict):
+        return {name: _freeze(values) for name, values in result.items()}
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+    return result
+
+
+default_cache = IndicatorCache()
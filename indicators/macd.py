@@ -1,5 +1,6 @@
 
-from indicators.base_indicator import BaseIndicator
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators import smoothing
 import pandas as pd
 
 import numpy as np
@@ -12,11 +13,10 @@ class MACD(BaseIndicator):
 
     def calculate(self, close_prices):
         # Convert to numpy array if it's not already
-        close_prices = np.array(close_prices)
+        close_prices = np.array(close_prices, dtype=float)
         
-        # Calculate EMAs
-        fast_ema = self.ema(close_prices, self.fast_period)
-        slow_ema = self.ema(close_prices, self.slow_period)
+        # Calculate both EMAs in a single pass
+        fast_ema, slow_ema = smoothing.ema_multi(close_prices, [self.fast_period, self.slow_period])
         
         # Calculate MACD line
         macd_line = fast_ema - slow_ema
@@ -30,9 +30,47 @@ class MACD(BaseIndicator):
         return macd_line, signal_line, histogram
 
     def ema(self, data, period):
+        return smoothing.ema(data, period)
+
+class StreamingMACD(BaseStreamingIndicator):
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        super().__init__()
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.fast_ema = None
+        self.slow_ema = None
+        self.signal_ema = None
+
+    def seed(self, data):
+        close_prices = np.array(data, dtype=float)
+        if len(close_prices) == 0:
+            self.fast_ema = self.slow_ema = self.signal_ema = None
+            self.value = None
+            return self
+
+        fast_ema, slow_ema = smoothing.ema_multi(close_prices, [self.fast_period, self.slow_period])
+        signal_line = smoothing.ema(fast_ema - slow_ema, self.signal_period)
+        self.fast_ema, self.slow_ema, self.signal_ema = fast_ema[-1], slow_ema[-1], signal_line[-1]
+        macd_value = self.fast_ema - self.slow_ema
+        self.value = (macd_value, self.signal_ema, macd_value - self.signal_ema)
+        return self
+
+    def update(self, price):
+        price = float(price)
+        if self.fast_ema is None:
+            self.fast_ema = self.slow_ema = price
+            macd_value = self.fast_ema - self.slow_ema
+            self.signal_ema = macd_value
+        else:
+            self.fast_ema = self._step(self.fast_ema, price, self.fast_period)
+            self.slow_ema = self._step(self.slow_ema, price, self.slow_period)
+            macd_value = self.fast_ema - self.slow_ema
+            self.signal_ema = self._step(self.signal_ema, macd_value, self.signal_period)
+        self.value = (macd_value, self.signal_ema, macd_value - self.signal_ema)
+        return self.value
+
+    @staticmethod
+    def _step(previous, value, period):
         alpha = 2 / (period + 1)
-        ema = np.zeros_like(data)
-        ema[0] = data[0]
-        for i in range(1, len(data)):
-            ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
-        return ema
+        return alpha * value + (1 - alpha) * previous
@@ -0,0 +1,145 @@
+
+import numpy as np
+import pandas as pd
+from utils.precision import to_storage
+
+
+class PricePanel:
+    '''
+    Symbols x time matrix built from a 2D array, a DataFrame (one column per
+    symbol) or a dict of per-symbol series/DataFrames/arrays.
+
+    Pandas inputs are aligned on the union of their timestamps; plain arrays
+    of different lengths are right-aligned so their latest bars line up.
+    Missing values are NaN.
+    '''
+    def __init__(self, values, symbols=None, index=None, positions=None, kind='array'):
+        self.values = values
+        self.symbols = symbols
+        self.index = index
+        self.positions = positions
+        self.kind = kind
+
+    @classmethod
+    def from_data(cls, data, column='close'):
+        if isinstance(data, PricePanel):
+            return data
+        if isinstance(data, pd.DataFrame):
+            return cls(data.to_numpy(dtype=float).T, list(data.columns), data.index, kind='frame')
+        if isinstance(data, dict):
+            return cls._from_dict(data, column)
+        values = np.array(data, dtype=float)
+        if values.ndim != 2:
+            raise ValueError("Panel data must be two-dimensional (symbols x time)")
+        return cls(values)
+
+    @classmethod
+    def _from_dict(cls, data, column):
+        symbols = list(data.keys())
+        series = {}
+        for symbol, values in data.items():
+            if isinstance(values, pd.DataFrame):
+                values = values[column]
+            series[symbol] = values
+
+        if symbols and all(isinstance(values, pd.Series) for values in series.values()):
+            index = series[symbols[0]].index
+            for values in series.values():
+                index = index.union(values.index)
+            matrix = np.full((len(symbols), len(index)), np.nan)
+            positions = {}
+            for row, symbol in enumerate(symbols):
+                positions[symbol] = index.get_indexer(series[symbol].index)
+                matrix[row, positions[symbol]] = series[symbol].to_numpy(dtype=float)
+            return cls(matrix, symbols, index, positions, kind='dict')
+
+        arrays = [np.asarray(series[symbol], dtype=float) for symbol in symbols]
+        length = max((len(values) for values in arrays), default=0)
+        matrix = np.full((len(symbols), length), np.nan)
+        positions = {}
+        for row, (symbol, values) in enumerate(zip(symbols, arrays)):
+            positions[symbol] = np.arange(length - len(values), length)
+            matrix[row, positions[symbol]] = values
+        return cls(matrix, symbols, None, positions, kind='dict')
+
+    def wrap(self, result):
+        '''
+        Convert a symbols x time result (or a tuple of them) back to the input layout.
+        '''
+        if isinstance(result, tuple):
+            outputs = [self.wrap(values) for values in result]
+            if self.kind == 'dict':
+                return {symbol: tuple(output[symbol] for output in outputs) for symbol in self.symbols}
+            return tuple(outputs)
+
+        if self.kind == 'frame':
+            return pd.DataFrame(result.T, index=self.index, columns=self.symbols)
+        if self.kind == 'dict':
+            return {symbol: result[row, self.positions[symbol]] for row, symbol in enumerate(self.symbols)}
+        return result
+
+
+def left_align(values):
+    '''
+    Shift every row so that its first valid value is in column 0.
+
+    Interior gaps are forward-filled and the tail of shifted rows repeats the
+    last value, so recursive indicators stay finite. Returns the aligned
+    matrix and the start offset of each row (for restore()).
+    '''
+    values = np.array(values, dtype=float)
+    n_rows, length = values.shape
+    missing = np.isnan(values)
+    if not missing.any():
+        return values, np.zeros(n_rows, dtype=np.int64)
+    valid_rows = ~missing.all(axis=1)
+    starts = np.where(valid_rows, np.argmax(~missing, axis=1), length)
+
+    positions = np.where(missing, 0, np.arange(length))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    filled = np.take_along_axis(values, positions, axis=1)
+    filled[~valid_rows] = 0.
+
+    columns = np.minimum(np.arange(length) + starts[:, None], length - 1)
+    aligned = np.take_along_axis(filled, columns, axis=1)
+    return aligned, starts
+
+
+def restore(values, starts):
+    '''
+    Undo left_align(): shift rows back in place, NaN before each row's start.
+    '''
+    values = np.asarray(values, dtype=float)
+    if not starts.any():
+        return values
+    columns = np.arange(values.shape[1]) - starts[:, None]
+    restored = np.take_along_axis(values, np.maximum(columns, 0), axis=1)
+    restored[columns < 0] = np.nan
+    return restored
+
+
+def calculate_panel(indicator, data, column='close'):
+    '''
+    Run `indicator.calculate` on every symbol of a panel in one vectorized call.
+    Bars missing from the input (before a symbol's history, in gaps or after
+    its last bar) are NaN in the result. Results are returned in the storage
+    dtype (see utils.precision).
+    '''
+    panel = PricePanel.from_data(data, column)
+    if panel.values.size == 0:
+        return panel.wrap(to_storage(indicator.calculate(panel.values)))
+
+    aligned, starts = left_align(panel.values)
+    result = indicator.calculate(aligned)
+    missing = np.isnan(panel.values)
+    if isinstance(result, tuple):
+        result = tuple(_mask(restore(values, starts), missing) for values in result)
+    else:
+        result = _mask(restore(result, starts), missing)
+    return panel.wrap(to_storage(result))
+
+
+def _mask(values, missing):
+    # left_align() fills gaps and tails so the recursions stay finite; they are not real bars
+    values[missing] = np.nan
+    return values
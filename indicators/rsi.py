@@ -1,6 +1,19 @@
 
 import numpy as np
-from indicators.base_indicator import BaseIndicator
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.smoothing import wilder
+
+def _average_gains_losses(deltas, period):
+    # Seed averages, then Wilder smoothing of the gains and losses for bars period..n-1
+    seed = deltas[..., :period+1]
+    up = np.where(seed >= 0, seed, 0.).sum(axis=-1)/period
+    down = -np.where(seed < 0, seed, 0.).sum(axis=-1)/period
+    pad = np.zeros(deltas.shape[:-1] + (1,))
+    gains = np.concatenate((pad, np.where(deltas > 0, deltas, 0.)), axis=-1)
+    losses = np.concatenate((pad, np.where(deltas > 0, 0., -deltas)), axis=-1)
+    ups = wilder(gains, period, start=period - 1, initial=up)[..., period:]
+    downs = wilder(losses, period, start=period - 1, initial=down)[..., period:]
+    return up, down, ups, downs
 
 class RSI(BaseIndicator):
     def __init__(self, period=14):
@@ -8,41 +21,23 @@ class RSI(BaseIndicator):
         self.period = period
 
     def calculate(self, data):
+        # Accepts a single series or a 2D array with one series per row
         close_prices = np.array(data, dtype=float)
-        
-        # Handle the case of zero prices
-        if np.all(close_prices == 0):
-            return np.full_like(close_prices, np.nan, dtype=float)
-        
-        deltas = np.diff(close_prices)
-        
-        # Handle the case of constant prices
-        if np.all(deltas == 0):
-            return np.full_like(close_prices, 50., dtype=float)
-        
-        seed = deltas[:self.period+1]
-        up = seed[seed >= 0].sum()/self.period
-        down = -seed[seed < 0].sum()/self.period
-        rs = np.zeros_like(close_prices, dtype=float)
-        rs[:self.period] = up / down if down != 0 else np.inf
-        rsi = np.zeros_like(close_prices, dtype=float)
-        rsi[:self.period] = 100. - 100./(1. + rs[:self.period])
-
-        for i in range(self.period, len(close_prices)):
-            delta = deltas[i - 1]
-            if delta > 0:
-                upval = delta
-                downval = 0.
-            else:
-                upval = 0.
-                downval = -delta
+        rows = np.atleast_2d(close_prices)
+        deltas = np.diff(rows, axis=-1)
 
-            up = (up*(self.period-1) + upval)/self.period
-            down = (down*(self.period-1) + downval)/self.period
-            rs[i] = up / down if down != 0 else np.inf
-            rsi[i] = 100. - 100./(1. + rs[i])
+        up, down, ups, downs = _average_gains_losses(deltas, self.period)
+        rs = np.zeros_like(rows, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs[:, :self.period] = np.where(down != 0, up / down, np.inf)[:, None]
+            rs[:, self.period:] = np.where(downs != 0, ups / downs, np.inf)
+        rsi = 100. - 100./(1. + rs)
 
-        return rsi
+        # Handle the cases of zero prices and of constant prices
+        rsi[np.all(deltas == 0, axis=-1)] = 50.
+        rsi[np.all(rows == 0, axis=-1)] = np.nan
+
+        return rsi[0] if close_prices.ndim == 1 else rsi
 
     def get_signal(self, data, overbought=70, oversold=30):
         rsi_values = self.calculate(data)
@@ -54,3 +49,78 @@ class RSI(BaseIndicator):
             return 'BUY'
         else:
             return 'NEUTRAL'
+
+class StreamingRSI(BaseStreamingIndicator):
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = np.nan
+        self.count = 0
+        self.last_price = None
+        self.up = None
+        self.down = None
+        self.all_zero = True
+        self.all_flat = True
+        # The batch seed spans the first period + 2 prices, so they are kept until then
+        self.warmup = []
+
+    def seed(self, data):
+        self.reset()
+        close_prices = np.array(data, dtype=float)
+        if len(close_prices) < self.period + 2:
+            for price in close_prices:
+                self.update(price)
+            return self
+
+        self.count = len(close_prices)
+        self.last_price = close_prices[-1]
+        deltas = np.diff(close_prices)
+        self.all_zero = bool(np.all(close_prices == 0))
+        self.all_flat = bool(np.all(deltas == 0))
+        _, _, ups, downs = _average_gains_losses(deltas, self.period)
+        self.up, self.down = ups[-1], downs[-1]
+        self.value = self._current_value()
+        return self
+
+    def update(self, price):
+        price = float(price)
+        if self.last_price is not None:
+            self.all_flat = self.all_flat and price == self.last_price
+        self.all_zero = self.all_zero and price == 0
+        self.count += 1
+
+        if self.up is None:
+            self.warmup.append(price)
+            self.last_price = price
+            if len(self.warmup) == self.period + 2:
+                _, _, ups, downs = _average_gains_losses(np.diff(self.warmup), self.period)
+                self.up, self.down = ups[-1], downs[-1]
+                self.warmup = []
+                self.value = self._current_value()
+            else:
+                self.value = RSI(self.period).calculate(self.warmup)[-1]
+            return self.value
+
+        delta = price - self.last_price
+        if delta > 0:
+            upval = delta
+            downval = 0.
+        else:
+            upval = 0.
+            downval = -delta
+        self.up = (self.up*(self.period-1) + upval)/self.period
+        self.down = (self.down*(self.period-1) + downval)/self.period
+        self.last_price = price
+        self.value = self._current_value()
+        return self.value
+
+    def _current_value(self):
+        if self.all_zero:
+            return np.nan
+        if self.all_flat:
+            return 50.
+        rs = self.up / self.down if self.down != 0 else np.inf
+        return 100. - 100./(1. + rs)
@@ -0,0 +1,51 @@
+from collections import deque
+import numpy as np
+from indicators.base_indicator import BaseIndicator, BaseStreamingIndicator
+from indicators.rolling import rolling_mean_std
+
+class SMA(BaseIndicator):
+    def __init__(self, period=20):
+        super().__init__()
+        self.period = period
+
+    def calculate(self, data):
+        # NaN until a full window is available
+        mean, _ = rolling_mean_std(data, self.period)
+        return mean
+
+class StreamingSMA(BaseStreamingIndicator):
+    def __init__(self, period=20):
+        super().__init__()
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.window = deque(maxlen=self.period)
+        self.total = 0.
+        self.updates_since_resync = 0
+        self.value = np.nan
+
+    def seed(self, data):
+        self.reset()
+        self.window.extend(np.array(data, dtype=float)[-self.period:])
+        self._resync()
+        return self
+
+    def update(self, price):
+        price = float(price)
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.period:
+            # Re-sum the window once per period to bound rounding drift (amortized O(1))
+            self._resync()
+        elif len(self.window) == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+    def _resync(self):
+        self.total = float(np.sum(self.window))
+        self.updates_since_resync = 0
+        self.value = self.total / self.period if len(self.window) == self.period else np.nan
@@ -0,0 +1,81 @@
+'''
+Indicators computed for a whole range of periods in one pass, as
+(len(periods), len(data)) matrices whose row k equals the single-period
+indicator for periods[k]. Computed in float64, returned in the storage
+dtype (see utils.precision).
+'''
+import numpy as np
+from indicators import smoothing
+from utils.precision import to_storage
+
+def ema_sweep(data, periods):
+    return to_storage(smoothing.ema_multi(np.array(data, dtype=float), periods))
+
+def sma_sweep(data, periods):
+    close_prices = np.array(data, dtype=float)
+    periods = np.asarray(periods, dtype=np.int64)
+    length = len(close_prices)
+    result = np.full((len(periods), length), np.nan)
+    if length == 0:
+        return result
+
+    # Prefix sums of the series centered on its first value, shared by every period
+    sums = np.concatenate(([0.], np.cumsum(close_prices - close_prices[0])))
+    for row, period in enumerate(periods):
+        if 1 <= period <= length:
+            result[row, period - 1:] = close_prices[0] + (sums[period:] - sums[:-period]) / period
+    return to_storage(result)
+
+def rsi_sweep(data, periods):
+    '''
+    RSI for every period, with the same seeding and special cases as RSI.calculate.
+    '''
+    close_prices = np.array(data, dtype=float)
+    periods = np.asarray(periods, dtype=np.int64)
+    length = len(close_prices)
+    if length == 0:
+        return np.zeros((len(periods), 0))
+
+    deltas = np.diff(close_prices)
+    gains = np.concatenate(([0.], np.where(deltas > 0, deltas, 0.)))
+    losses = np.concatenate(([0.], np.where(deltas > 0, 0., -deltas)))
+    # Seed averages over deltas[:period + 1], as in RSI.calculate
+    seed_counts = np.minimum(periods + 1, len(deltas))
+    up = np.cumsum(gains)[seed_counts] / periods
+    down = np.cumsum(losses)[seed_counts] / periods
+
+    # Wilder smoothing for all periods at once: row k starts at periods[k] - 1 from its seed
+    columns = np.arange(length)
+    starts = (periods - 1)[:, None]
+    decay = (periods - 1) / periods
+    averages = []
+    for values, initial in ((gains, up), (losses, down)):
+        inputs = np.where(columns > starts, values / periods[:, None], 0.)
+        inside = periods - 1 < length
+        inputs[inside, periods[inside] - 1] = initial[inside]
+        smoothed = smoothing.linear_filter(inputs, decay)
+        # Bars before the first smoothed value use the seed average
+        averages.append(np.where(columns < starts, initial[:, None], smoothed))
+    ups, downs = averages
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.where(downs != 0, ups / downs, np.inf)
+    rsi = 100. - 100./(1. + rs)
+    if np.all(deltas == 0):
+        rsi[:] = 50.
+    if np.all(close_prices == 0):
+        rsi[:] = np.nan
+    return to_storage(rsi)
+
+def macd_sweep(data, fast_periods, slow_periods, signal_period=9):
+    '''
+    MACD, signal and histogram for every (fast, slow) pair, each shaped
+    (len(fast_periods), len(slow_periods), len(data)). The EMAs are computed
+    once per distinct period.
+    '''
+    close_prices = np.array(data, dtype=float)
+    fast = smoothing.ema_multi(close_prices, fast_periods)
+    slow = smoothing.ema_multi(close_prices, slow_periods)
+    macd_line = fast[:, None, :] - slow[None, :, :]
+    signal_line = smoothing.ema(macd_line.reshape(-1, len(close_prices)), signal_period).reshape(macd_line.shape)
+    return to_storage((macd_line, signal_line, macd_line - signal_line))
@@ -0,0 +1,35 @@
+'''
+Function-style access to the indicator library. Series inputs give Series
+outputs on the same index; arrays and lists give numpy arrays.
+'''
+import numpy as np
+import pandas as pd
+from indicators.ema import EMA
+from indicators.sma import SMA
+from indicators.atr import ATR, true_range
+from indicators.dmi import DMI
+from indicators.adx import ADX
+
+def _like(values, reference):
+    if isinstance(reference, pd.Series):
+        return pd.Series(values, index=reference.index)
+    return values
+
+def calculate_ema(data, period):
+    return _like(EMA(period).calculate(data), data)
+
+def calculate_sma(data, period):
+    return _like(SMA(period).calculate(data), data)
+
+def calculate_true_range(high, low, close):
+    return _like(true_range(high, low, close), close)
+
+def calculate_atr(high, low, close, period=14):
+    return _like(ATR(period).calculate(high, low, close), close)
+
+def calculate_dmi(high, low, close, period=14):
+    plus_di, minus_di = DMI(period).calculate(high, low, close)
+    return _like(plus_di, close), _like(minus_di, close)
+
+def calculate_adx(high, low, close, period=14):
+    return _like(ADX(period).calculate(high, low, close), close)
@@ -8,10 +8,12 @@ from utils.security import APIKeyManager
 from utils.password_manager import PasswordManager
 from analysis.sentiment_analysis import SentimentAnalyzer
 from data.real_time_data_manager import RealTimeDataManager
+from data.market_stream import MarketStream, WebSocketTransport
 from utils.error_handling import error_handler, APIError, StrategyError, DataError
 from analysis.volatility_analyzer import VolatilityAnalyzer
+from utils.precision import set_precision
 import threading
-from config import EXCHANGE, TRADING_PARAMS, RISK_MANAGEMENT, STRATEGIES, LOGGING
+from config import EXCHANGE, TRADING_PARAMS, RISK_MANAGEMENT, STRATEGIES, LOGGING, PRECISION, DATA_STORE, DATABASE, STREAM
 
 async def run_async_tasks(engine, data_manager):
     await asyncio.gather(
@@ -25,6 +27,7 @@ async def run_async_tasks(engine, data_manager):
 async def main():
     # Setup logging
     logger = setup_logging(LOGGING['level'], LOGGING['format'])
+    set_precision(PRECISION['dtype'])
     engine = None
     data_manager = None
 
@@ -45,13 +48,17 @@ async def main():
 
         # Initialize the trading engine
         config = {
-            'exchange': {'name': EXCHANGE['name'], 'api_key': keys['api_key'], 'secret_key': keys['secret_key']},
+            'exchange': {'name': EXCHANGE['name'], 'api_key': keys['api_key'], 'secret_key': keys['secret_key'],
+                         'cache_ttl': EXCHANGE.get('cache_ttl')},
             'initial_balance': TRADING_PARAMS['initial_balance'],
             'risk_params': RISK_MANAGEMENT,
             'strategies': STRATEGIES,
             'update_interval': TRADING_PARAMS.get('update_interval', 1),  # seconds
             'strategy_interval': TRADING_PARAMS.get('strategy_interval', 5),  # seconds
-            'optimize_parameters': TRADING_PARAMS.get('optimize_parameters', False)
+            'optimize_parameters': TRADING_PARAMS.get('optimize_parameters', False),
+            'data_store_path': DATA_STORE.get('path'),
+            'backfill_checkpoint': DATA_STORE.get('backfill_checkpoint'),
+            'database_path': DATABASE['name']
         }
 
         # Initialize Sentiment Analyzer
@@ -64,7 +71,10 @@ async def main():
         engine = TradingEngine(config)
 
         # Initialize RealTimeDataManager
-        data_manager = RealTimeDataManager(engine.exchange_handler, TRADING_PARAMS['symbols'])
+        stream = MarketStream(WebSocketTransport(STREAM['url'])) if STREAM.get('url') else None
+        data_manager = RealTimeDataManager(engine.exchange_handler, TRADING_PARAMS['symbols'], stream)
+        if stream is not None and STREAM.get('trade_candles', True):
+            engine.stream_candles(stream)
 
         # Update TradingEngine with RealTimeDataManager, SentimentAnalyzer, and VolatilityAnalyzer
         engine.set_data_manager(data_manager)
@@ -1,13 +1,21 @@
 
+from collections import deque
 from typing import Dict
 import pandas as pd
 
 class Portfolio:
-    def __init__(self, initial_balance: float):
+    '''
+    Positions, balance and history. Only the last `max_history` trades and
+    values are kept in memory; with a `ledger` (data.database.Database) every
+    trade and equity snapshot is also persisted.
+    '''
+    def __init__(self, initial_balance: float, ledger=None, max_history: int = 10_000):
         self.positions: Dict[str, float] = {}
         self.balance: float = initial_balance
-        self.trade_history: list = []
-        self.value_history: list = [initial_balance]
+        self.initial_balance: float = initial_balance
+        self.ledger = ledger
+        self.trade_history: deque = deque(maxlen=max_history)
+        self.value_history: deque = deque([initial_balance], maxlen=max_history)
 
     def update_status(self, exchange_data):
         total_value = self.balance
@@ -16,7 +24,7 @@ class Portfolio:
             if latest_price is not None:
                 total_value += amount * latest_price
         self.trade_history.append({'timestamp': pd.Timestamp.now(), 'total_value': total_value})
-        self.value_history.append(total_value)
+        self._record_value(total_value)
         
     def execute_trade(self, order):
         symbol = order['symbol']
@@ -37,7 +45,10 @@ class Portfolio:
                 self.balance += amount * price
             else:
                 raise ValueError("Insufficient position for this trade")
-        self.trade_history.append({'timestamp': pd.Timestamp.now(), 'action': side, 'symbol': symbol, 'amount': amount, 'price': price})
+        trade = {'timestamp': pd.Timestamp.now(), 'action': side, 'symbol': symbol, 'amount': amount, 'price': price}
+        self.trade_history.append(trade)
+        if self.ledger is not None:
+            self.ledger.record_trade(dict(trade, order_id=order.get('id'), strategy=order.get('strategy')))
         self.update_value_history()
 
     def get_position(self, symbol):
@@ -49,7 +60,7 @@ class Portfolio:
     def calculate_returns(self):
         if len(self.value_history) < 2:
             return pd.Series()
-        returns = pd.Series(self.value_history).pct_change()
+        returns = pd.Series(list(self.value_history)).pct_change()
         return returns.dropna()
 
     def get_total_value(self):
@@ -67,20 +78,25 @@ class Portfolio:
         for symbol, amount in self.positions.items():
             if exchange_data:
                 latest_price = exchange_data.get_latest_price(symbol)
-            elif self.trade_history and self.trade_history[-1]['symbol'] == symbol:
+            elif self.trade_history and self.trade_history[-1].get('symbol') == symbol:
                 latest_price = self.trade_history[-1]['price']
             else:
                 latest_price = None
             
             if latest_price is not None:
                 total_value += amount * latest_price
+        self._record_value(total_value)
+
+    def _record_value(self, total_value):
         self.value_history.append(total_value)
+        if self.ledger is not None:
+            self.ledger.record_equity(total_value, self.balance)
 
     def get_metrics(self):
         returns = self.calculate_returns()
         sharpe_ratio = returns.mean() / returns.std() if len(returns) > 0 else 0
         max_drawdown = self.calculate_drawdown()
-        total_return = (self.value_history[-1] / self.value_history[0]) - 1 if len(self.value_history) > 1 else 0
+        total_return = (self.value_history[-1] / self.initial_balance) - 1 if len(self.value_history) > 1 else 0
         
         return {
             'total_value': self.value_history[-1],
@@ -2,33 +2,43 @@
 from strategies.base_strategy import BaseStrategy
 from indicators.macd import MACD
 from indicators.adx import ADX
+from indicators.indicator_cache import CachedIndicator, default_cache
 
 class MomentumStrategy(BaseStrategy):
     def __init__(self, config, exchange_data, historical_data, portfolio):
-        super().__init__(config, exchange_data, historical_data, portfolio)
-        self.macd = MACD(fast_period=self.config['macd_fast'], slow_period=self.config['macd_slow'], signal_period=self.config['macd_signal'])
+        super().__init__(config)
+        self.exchange_data = exchange_data
+        self.historical_data = historical_data
+        self.portfolio = portfolio
+        self.macd = CachedIndicator(MACD(fast_period=self.config['macd_fast'], slow_period=self.config['macd_slow'], signal_period=self.config['macd_signal']), default_cache)
         self.adx = ADX(period=self.config['adx_period'])
         self.adx_threshold = self.config['adx_threshold']
         self.risk_per_trade = self.config['risk_per_trade']
+        # Bougies nécessaires pour deux valeurs valides de MACD / signal et d'ADX
+        self.lookback = max(self.config['macd_slow'] + self.config['macd_signal'], 2 * self.config['adx_period']) + 1
         
     async def analyze(self, symbol, timeframe):
-        data = await self.historical_data.get_candles(symbol, timeframe)
-        close_prices = [candle['close'] for candle in data]
-        high_prices = [candle['high'] for candle in data]
-        low_prices = [candle['low'] for candle in data]
+        # Vues sans copie sur le buffer de bougies
+        candles = await self.historical_data.get_candles(symbol, timeframe)
+        if len(candles) < self.lookback:
+            return None
+        close_prices = candles.close
+        timestamp = int(candles.timestamp[-1])
         
-        macd_line, signal_line, _ = self.macd.calculate(close_prices)
-        adx_values = self.adx.calculate(high_prices, low_prices, close_prices)
+        macd_line, signal_line, _ = self.macd.calculate(close_prices, symbol=symbol, timeframe=timeframe, timestamp=timestamp)
+        adx_values = self.adx.calculate(candles.high, candles.low, close_prices)
         
         return {
             'macd_line': macd_line,
             'signal_line': signal_line,
             'adx_values': adx_values,
             'close_prices': close_prices,
-            'timestamp': data[-1]['timestamp']
+            'timestamp': timestamp
         }
 
     async def generate_signal(self, analysis_result):
+        if analysis_result is None:
+            return None
         macd_line = analysis_result['macd_line']
         signal_line = analysis_result['signal_line']
         adx_values = analysis_result['adx_values']
@@ -2,6 +2,9 @@
 from strategies.base_strategy import BaseStrategy
 from indicators.macd import MACD
 from indicators.rsi import RSI
+from indicators.atr import true_range
+from indicators.indicator_cache import CachedIndicator, default_cache
+from data.candle_buffer import CandleWindow
 from analysis.sentiment_analysis import SentimentAnalyzer
 import numpy as np
 import pandas as pd
@@ -12,7 +15,7 @@ class SentimentMomentumStrategy(BaseStrategy):
     def __init__(self, config):
         self.required_parameters = ['macd_fast', 'macd_slow', 'macd_signal', 'rsi_period', 'sentiment_threshold', 'risk_per_trade', 'macd_threshold', 'rsi_overbought', 'rsi_oversold']
         super().__init__(config)
-        self.logger = setup_logging()
+        self.logger, _ = setup_logging()
         self.set_parameters(config)
 
     def set_parameters(self, params):
@@ -22,8 +25,9 @@ class SentimentMomentumStrategy(BaseStrategy):
                 raise StrategyError(f"Missing required parameters: {', '.join(missing_params)}")
             super().set_parameters(params)
             if all(param in self.parameters for param in ['macd_fast', 'macd_slow', 'macd_signal', 'rsi_period']):
-                self.macd = MACD(fast_period=self.parameters['macd_fast'], slow_period=self.parameters['macd_slow'], signal_period=self.parameters['macd_signal'])
-                self.rsi = RSI(period=self.parameters['rsi_period'])
+                # Résultats partagés avec les autres stratégies sur le même symbole et timeframe
+                self.macd = CachedIndicator(MACD(fast_period=self.parameters['macd_fast'], slow_period=self.parameters['macd_slow'], signal_period=self.parameters['macd_signal']), default_cache)
+                self.rsi = CachedIndicator(RSI(period=self.parameters['rsi_period']), default_cache)
             self.logger.info(f"Parameters set: {self.parameters}")
         except Exception as e:
             self.logger.error(f"Error setting parameters: {str(e)}")
@@ -39,20 +43,22 @@ class SentimentMomentumStrategy(BaseStrategy):
         if not latest_data:
             raise ValueError("No data provided for analysis")
         
-        df = pd.DataFrame(latest_data)
-        close_prices = df['close'].values
-        macd, signal, _ = self.macd.calculate(close_prices)
-        rsi = self.rsi.calculate(close_prices)
+        # CandleWindow du moteur (vues sans copie) ou liste de bougies
+        candles = latest_data if isinstance(latest_data, CandleWindow) else CandleWindow.from_records(latest_data)
+        close_prices = candles.close
+        last_timestamp = int(candles.timestamp[-1])
+        macd, signal, _ = self.macd.calculate(close_prices, symbol=symbol, timeframe=timeframe, timestamp=last_timestamp)
+        rsi = self.rsi.calculate(close_prices, symbol=symbol, timeframe=timeframe, timestamp=last_timestamp)
 
         return {
             'symbol': symbol,
-            'close': float(df['close'].iloc[-1]),
-            'timestamp': df['timestamp'].iloc[-1],
+            'close': float(close_prices[-1]),
+            'timestamp': last_timestamp,
             'macd': float(macd[-1]),
             'signal': float(signal[-1]),
             'rsi': float(rsi[-1]),
             'sentiment': sentiment_score,
-            'atr': float(self.calculate_atr(df['high'].values, df['low'].values, close_prices))
+            'atr': float(self.calculate_atr(candles.high, candles.low, close_prices))
         }
 
     @error_handler
@@ -89,8 +95,6 @@ class SentimentMomentumStrategy(BaseStrategy):
         return entry_price * (1.06 if position_type == 'BUY' else 0.94)  # 6% take-profit
 
     def calculate_atr(self, high, low, close, period=14):
-        high_low = high - low
-        high_close = np.abs(high - np.roll(close, 1))
-        low_close = np.abs(low - np.roll(close, 1))
-        ranges = np.max([high_low, high_close, low_close], axis=0)
+        # Moyenne des `period` derniers true ranges (le premier bar n'a pas de clôture précédente)
+        ranges = true_range(high, low, close)
         return np.mean(ranges[-period:])
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from data.backfill import Backfill, merge_ohlcv
+from utils.error_handling import DataError
+from utils.timeframes import timeframe_to_ms, align
+
+try:
+    from data.candle_store import CandleStore
+except ImportError:
+    CandleStore = None
+
+START = 1_699_999_980_000  # minute-aligned
+STEP = 60_000
+
+class PagedExchangeHandler:
+    '''
+    Serves a synthetic 1m series, `limit` bars per call, failing once on `fail_since`.
+    '''
+    def __init__(self, count, fail_since=None):
+        self.ohlcv = [[START + i * STEP, 1., 2., 0.5, float(i), 1.] for i in range(count)]
+        self.fail_since = fail_since
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if since == self.fail_since:
+            self.fail_since = None
+            raise ConnectionError("connection reset")
+        return [row for row in self.ohlcv if row[0] >= since][:limit]
+
+class TestTimeframes(unittest.TestCase):
+    def test_timeframe_to_ms(self):
+        self.assertEqual(timeframe_to_ms('1m'), 60_000)
+        self.assertEqual(timeframe_to_ms('4h'), 14_400_000)
+        self.assertEqual(timeframe_to_ms('1w'), 604_800_000)
+        self.assertRaises(ValueError, timeframe_to_ms, '1M')
+
+    def test_align(self):
+        self.assertEqual(align(START + 59_999, '1m'), START)
+        self.assertEqual(align(START + 61_000, '1m'), START + 60_000)
+
+class TestBackfill(unittest.TestCase):
+    def test_concurrent_chunks(self):
+        handler = PagedExchangeHandler(1000)
+        backfill = Backfill(handler, page_limit=100, concurrency=4)
+        self.assertEqual(len(backfill.chunks(START, START + 1000 * STEP, '1m')), 10)
+        rows = asyncio.run(backfill.run('BTC/USDT', '1m', START + 5 * STEP, START + 1000 * STEP))
+        self.assertEqual([row[4] for row in rows], [float(i) for i in range(5, 1000)])
+        self.assertEqual(handler.max_in_flight, 4)
+
+    def test_merge_keeps_last_written(self):
+        rows = merge_ohlcv([[[2, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1]], [[2, 9, 9, 9, 9, 9]]])
+        self.assertEqual(rows, [[1, 1., 1., 1., 1., 1.], [2, 9., 9., 9., 9., 9.]])
+
+    @unittest.skipIf(CandleStore is None, "pyarrow is not installed")
+    def test_resume_from_checkpoint(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CandleStore(os.path.join(directory, 'candles'))
+            checkpoint = os.path.join(directory, 'backfill.json')
+            handler = PagedExchangeHandler(500, fail_since=START + 300 * STEP)
+            backfill = Backfill(handler, store, checkpoint, page_limit=100, concurrency=1)
+            with self.assertRaises(ConnectionError):
+                asyncio.run(backfill.run('BTC/USDT', '1m', START, START + 500 * STEP))
+
+            calls = handler.calls
+            backfill = Backfill(handler, store, checkpoint, page_limit=100)
+            rows = asyncio.run(backfill.run('BTC/USDT', '1m', START, START + 500 * STEP))
+            self.assertEqual(len(rows), 500)
+            self.assertEqual(handler.calls - calls, 2)
+            self.assertEqual(backfill.checkpoint.completed('BTC/USDT|1m|%d' % START), set())
+        finally:
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(CandleStore is None, "pyarrow is not installed")
+    def test_short_chunk_is_a_failure_and_resumes_with_later_end(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CandleStore(os.path.join(directory, 'candles'))
+            checkpoint = os.path.join(directory, 'backfill.json')
+            handler = PagedExchangeHandler(500)
+            served = handler.ohlcv
+            # The exchange stops answering after bar 250 (the handler returns [] on errors)
+            handler.ohlcv = served[:250]
+            backfill = Backfill(handler, store, checkpoint, page_limit=100, concurrency=1)
+            with self.assertRaises(DataError):
+                asyncio.run(backfill.run('BTC/USDT', '1m', START, START + 400 * STEP))
+            self.assertEqual(backfill.checkpoint.completed('BTC/USDT|1m|%d' % START), {START, START + 100 * STEP})
+
+            # Rerun up to a later end: the checkpointed chunks are read back from the store
+            handler.ohlcv, calls = served, handler.calls
+            backfill = Backfill(handler, store, checkpoint, page_limit=100, concurrency=1)
+            rows = asyncio.run(backfill.run('BTC/USDT', '1m', START, START + 500 * STEP))
+            self.assertEqual([row[4] for row in rows], [float(i) for i in range(500)])
+            self.assertEqual(handler.calls - calls, 3)
+        finally:
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(CandleStore is None, "pyarrow is not installed")
+    def test_stored_days_are_compacted(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CandleStore(directory)
+            handler = PagedExchangeHandler(3000)
+            # One chunk per 100 bars: each day gets several parts until compaction
+            rows = asyncio.run(Backfill(handler, store, page_limit=100).run('BTC/USDT', '1m', START, START + 3000 * STEP))
+            days = os.path.join(directory, 'BTC-USDT', '1m')
+            self.assertEqual([len(os.listdir(os.path.join(days, day))) for day in os.listdir(days)], [1] * 4)
+            stored = store.read('BTC/USDT', '1m')
+            self.assertEqual(len(stored), 3000)
+            self.assertEqual(list(stored['close']), [row[4] for row in rows])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_empty_range_before_listing_is_complete(self):
+        handler = PagedExchangeHandler(100)
+        handler.ohlcv = handler.ohlcv[50:]
+        rows = asyncio.run(Backfill(handler, page_limit=20).run('BTC/USDT', '1m', START, START + 100 * STEP))
+        self.assertEqual(len(rows), 50)
+
+if __name__ == '__main__':
+    unittest.main()
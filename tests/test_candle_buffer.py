@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from data.candle_buffer import CandleBuffer, CandleBufferMap, CandleWindow
+from data.exchange_data import ExchangeData
+
+def candles(start, count, step=60_000):
+    return [[start + i * step, 100. + i, 101. + i, 99. + i, 100.5 + i, 10. + i] for i in range(count)]
+
+class FakeExchangeHandler:
+    def __init__(self):
+        self.ohlcv = []
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        return self.ohlcv[-limit:] if limit else self.ohlcv
+
+class TestCandleBuffer(unittest.TestCase):
+    def test_wraparound_keeps_latest_contiguous(self):
+        buffer = CandleBuffer(capacity=8)
+        rows = candles(0, 21)
+        for count, row in enumerate(rows, start=1):
+            buffer.append(*row)
+            window = buffer.window()
+            expected = rows[max(0, count - 8):count]
+            np.testing.assert_array_equal(window.timestamp, [row[0] for row in expected])
+            np.testing.assert_array_equal(window.close, [row[4] for row in expected])
+        self.assertEqual(len(buffer), 8)
+
+    def test_window_is_zero_copy_and_read_only(self):
+        buffer = CandleBuffer(capacity=16)
+        buffer.extend(candles(0, 10))
+        window = buffer.window(4)
+        self.assertTrue(np.shares_memory(window.close, buffer.values['close']))
+        self.assertFalse(window.close.flags.writeable)
+        self.assertEqual(len(window), 4)
+
+    def test_open_candle_updates_in_place(self):
+        buffer = CandleBuffer(capacity=16)
+        buffer.extend(candles(0, 3))
+        buffer.append(120_000, 1, 2, 0.5, 1.5, 7)
+        buffer.append(60_000, 0, 0, 0, 0, 0)  # older than the last candle: ignored
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.last()['close'], 1.5)
+        # Bulk insert overlapping the buffer only adds newer candles
+        self.assertEqual(buffer.extend(candles(60_000, 5)), 3)
+        np.testing.assert_array_equal(np.diff(buffer.window().timestamp), 60_000)
+
+    def test_truncate_after(self):
+        buffer = CandleBuffer(capacity=8)
+        buffer.extend(candles(0, 12))
+        self.assertEqual(buffer.truncate_after(9 * 60_000), 2)
+        self.assertEqual(buffer.last_timestamp, 9 * 60_000)
+        buffer.append(*candles(10 * 60_000, 1)[0])
+        np.testing.assert_array_equal(buffer.window().timestamp, [i * 60_000 for i in range(4, 11)])
+
+    def test_map_dataframe_compatibility(self):
+        data = CandleBufferMap(capacity=100)
+        frame = pd.DataFrame({'close': [1., 2., 3.]}, index=pd.date_range('2023-01-01', periods=3, freq='h'))
+        data['BTC/USDT'] = frame
+        result = data['BTC/USDT']
+        self.assertEqual(list(result.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertTrue((result.index == frame.index).all())
+        np.testing.assert_array_equal(result['close'], frame['close'])
+
+    def test_membership_does_not_build_frames(self):
+        data = CandleBufferMap(capacity=100)
+        data['BTC/USDT'] = candles(0, 10)
+        with patch.object(CandleWindow, 'to_frame', side_effect=AssertionError('frame built')):
+            self.assertIn('BTC/USDT', data)
+            self.assertNotIn('ETH/USDT', data)
+            exchange_data = ExchangeData(FakeExchangeHandler(), buffer_capacity=100)
+            exchange_data.data['BTC/USDT'] = candles(0, 10)
+            self.assertEqual(exchange_data.get_latest_price('BTC/USDT'), 109.5)
+
+class TestReplayCursor(unittest.TestCase):
+    def setUp(self):
+        self.exchange_data = ExchangeData(FakeExchangeHandler(), buffer_capacity=100)
+        self.exchange_data.data['BTC/USDT'] = candles(1_600_000_000_000, 30)
+
+    def test_replay_keeps_future_data(self):
+        start = pd.Timestamp(1_600_000_000_000, unit='ms')
+        for i in range(30):
+            self.exchange_data.update_to_timestamp(start + pd.Timedelta(minutes=i))
+            self.assertEqual(len(self.exchange_data.get_window('BTC/USDT')), i + 1)
+            self.assertEqual(self.exchange_data.get_latest_price('BTC/USDT'), candles(1_600_000_000_000, i + 1)[-1][4])
+        self.exchange_data.update_to_timestamp(start + pd.Timedelta(minutes=4, seconds=30))
+        self.assertEqual(len(self.exchange_data.get_data('BTC/USDT')), 5)
+        self.exchange_data.update_to_timestamp(start - pd.Timedelta(minutes=1))
+        self.assertIsNone(self.exchange_data.get_latest_price('BTC/USDT'))
+        self.assertEqual(self.exchange_data.get_latest_data(), {})
+        self.exchange_data.clear_cursors()
+        self.assertEqual(len(self.exchange_data.get_window('BTC/USDT')), 30)
+
+    def test_mapping_views_respect_cursor(self):
+        self.exchange_data.data['ETH/USDT'] = candles(1_600_000_000_000, 30)
+        self.exchange_data.update_to_timestamp(pd.Timestamp(1_600_000_000_000 + 9 * 60_000, unit='ms'))
+        for symbol, frame in self.exchange_data.data.items():
+            self.assertEqual(len(frame), 10, symbol)
+            self.assertEqual(frame.index[-1], pd.Timestamp(1_600_000_000_000 + 9 * 60_000, unit='ms'))
+        self.assertEqual(len(self.exchange_data.data['BTC/USDT']), 10)
+        # A buffer replaced during the replay gets a cursor on its own rows
+        self.exchange_data.data['BTC/USDT'] = candles(1_600_000_000_000 - 5 * 60_000, 100)
+        self.assertEqual(len(self.exchange_data.data['BTC/USDT']), 15)
+        self.assertEqual(len(self.exchange_data.get_window('BTC/USDT')), 15)
+        self.exchange_data.clear_cursors()
+        self.assertEqual(len(self.exchange_data.data['BTC/USDT']), 100)
+
+    def test_cursor_survives_appends(self):
+        buffer = self.exchange_data.data.buffer('BTC/USDT')
+        self.exchange_data.update_to_timestamp(pd.Timestamp(1_600_000_000_000 + 9 * 60_000, unit='ms'))
+        buffer.extend(candles(1_600_000_000_000 + 30 * 60_000, 80))
+        window = self.exchange_data.get_window('BTC/USDT')
+        self.assertEqual(len(window), 0)
+        self.assertEqual(buffer.seek(1_600_000_000_000 + 39 * 60_000), buffer.end - 70)
+        self.assertEqual(len(buffer.window(until=buffer.end - 70)), 30)
+
+class TestCandleWindow(unittest.TestCase):
+    def test_from_records(self):
+        records = [{'timestamp': 1000, 'open': 1., 'high': 2., 'low': 0.5, 'close': 1.5, 'volume': 10.},
+                   {'timestamp': 2000, 'open': 1.5, 'high': 3., 'low': 1., 'close': 2.5, 'volume': 20.}]
+        window = CandleWindow.from_records(records)
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.timestamp.dtype, np.int64)
+        np.testing.assert_array_equal(window.close, [1.5, 2.5])
+        np.testing.assert_array_equal(CandleWindow.from_records([[1000, 1., 2., 0.5, 1.5, 10.]]).high, [2.])
+
+class TestExchangeDataBuffers(unittest.TestCase):
+    def test_update_symbol_appends_in_place(self):
+        handler = FakeExchangeHandler()
+        exchange_data = ExchangeData(handler, buffer_capacity=50)
+        exchange_data.set_trading_pairs(['BTC/USDT'])
+        handler.ohlcv = candles(1_600_000_000_000, 1)
+        asyncio.run(exchange_data.update_symbol('BTC/USDT'))
+        handler.ohlcv[-1][4] = 105.
+        asyncio.run(exchange_data.update_symbol('BTC/USDT'))
+        handler.ohlcv = candles(1_600_000_000_000, 2)
+        asyncio.run(exchange_data.update_symbol('BTC/USDT'))
+
+        self.assertEqual(len(exchange_data.get_window('BTC/USDT')), 2)
+        self.assertEqual(exchange_data.get_latest_price('BTC/USDT'), 101.5)
+        self.assertEqual(exchange_data.get_latest_data()['BTC/USDT']['volume'], 11.)
+        frame = exchange_data.get_data('BTC/USDT')
+        self.assertEqual(frame.index[-1], pd.Timestamp(1_600_000_060_000, unit='ms'))
+        exchange_data.update_to_timestamp(frame.index[0])
+        self.assertEqual(len(exchange_data.get_data('BTC/USDT')), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from data.historical_data import HistoricalData
+
+try:
+    from data.candle_store import CandleStore, DAY_MS
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+START = 1_700_006_400_000  # 2023-11-15 00:00 UTC
+
+def candles(first, count, step=60_000):
+    return [[START + (first + i) * step, 100. + i, 101. + i, 99. + i, 100.5 + i, 1.] for i in range(count)]
+
+class FakeExchangeHandler:
+    def __init__(self, ohlcv):
+        self.ohlcv = ohlcv
+        self.calls = []
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(since)
+        return [row for row in self.ohlcv if since is None or row[0] >= since]
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestCandleStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = CandleStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_append_and_range_read(self):
+        self.store.append('BTC/USDT', '1m', candles(0, 3000))
+        days = os.listdir(os.path.join(self.root, 'BTC-USDT', '1m'))
+        self.assertEqual(len(days), 3)
+        df = self.store.read('BTC/USDT', '1m', START + DAY_MS, START + DAY_MS + 60 * 60_000)
+        self.assertEqual(len(df), 60)
+        self.assertEqual(df.index[0], pd.Timestamp(START + DAY_MS, unit='ms'))
+        self.assertEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(self.store.last_timestamp('BTC/USDT', '1m'), START + 2999 * 60_000)
+
+    def test_later_writes_win_and_compaction(self):
+        self.store.append('ETH/USDT', '1m', candles(0, 100))
+        updated = candles(50, 100)
+        updated[0][4] = 1.
+        self.store.append('ETH/USDT', '1m', updated)
+        df = self.store.read('ETH/USDT', '1m')
+        self.assertEqual(len(df), 150)
+        self.assertEqual(df['close'].iloc[50], 1.)
+        self.assertEqual(self.store.compact('ETH/USDT', '1m'), 1)
+        day = os.listdir(os.path.join(self.root, 'ETH-USDT', '1m'))[0]
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'ETH-USDT', '1m', day))), 1)
+        self.assertTrue(self.store.read('ETH/USDT', '1m').equals(df))
+
+    def test_compact_only_touches_the_range(self):
+        self.store.append('BTC/USDT', '1m', candles(0, 3000))
+        self.store.append('BTC/USDT', '1m', candles(0, 3000))
+        self.assertEqual(self.store.compact('BTC/USDT', '1m', start=START + DAY_MS, end=START + 2 * DAY_MS), 1)
+        directory = os.path.join(self.root, 'BTC-USDT', '1m')
+        parts = sorted(len(os.listdir(os.path.join(directory, day))) for day in os.listdir(directory))
+        self.assertEqual(parts, [1, 2, 2])
+        self.assertEqual(len(self.store.read('BTC/USDT', '1m')), 3000)
+
+    def test_historical_data_fetches_only_missing_tail(self):
+        self.store.append('BTC/USDT', '1m', candles(0, 500))
+        handler = FakeExchangeHandler(candles(0, 520))
+        historical_data = HistoricalData(handler, self.store)
+        asyncio.run(historical_data.update_data('BTC/USDT', '1m'))
+        self.assertEqual(handler.calls, [START + 499 * 60_000])
+        self.assertEqual(len(historical_data.get_data('BTC/USDT', '1m')), 520)
+        self.assertEqual(self.store.last_timestamp('BTC/USDT', '1m'), START + 519 * 60_000)
+
+if __name__ == '__main__':
+    unittest.main()
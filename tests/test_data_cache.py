@@ -0,0 +1,49 @@
+import unittest
+from data.data_cache import DataCache, CandleRecord, RECORD_BYTES
+
+def rows(count, start=0):
+    return [[(start + i) * 60_000, 1., 2., 0.5, 1.5, 10.] for i in range(count)]
+
+class TestDataCache(unittest.TestCase):
+    def test_rows_per_key_limit(self):
+        cache = DataCache(max_rows=5)
+        for row in rows(8):
+            cache.add('BTC/USDT', row)
+        records = cache.get('BTC/USDT')
+        self.assertEqual([record.timestamp for record in records], [i * 60_000 for i in range(3, 8)])
+        self.assertIsInstance(records[0], CandleRecord)
+        self.assertEqual([record.timestamp for record in cache.get('BTC/USDT', limit=2)], [6 * 60_000, 7 * 60_000])
+        self.assertEqual(len(cache.get('BTC/USDT', limit=50)), 5)
+        self.assertEqual(cache.latest('BTC/USDT').timestamp, 7 * 60_000)
+        self.assertEqual(cache.stats()['evicted_rows'], 3)
+
+    def test_bulk_insert_and_open_candle(self):
+        cache = DataCache(max_rows=100)
+        cache.extend('ETH/USDT', rows(150))
+        self.assertEqual(cache.stats()['rows'], 100)
+        cache.add('ETH/USDT', {'timestamp': 149 * 60_000, 'open': 1., 'high': 3., 'low': 0.5, 'close': 2.5, 'volume': 12.})
+        self.assertEqual(cache.stats()['rows'], 100)
+        self.assertEqual(cache.latest('ETH/USDT').close, 2.5)
+
+    def test_key_and_byte_limits(self):
+        cache = DataCache(max_rows=10, max_keys=2, max_bytes=15 * RECORD_BYTES)
+        cache.extend('A', rows(10))
+        cache.extend('B', rows(10))
+        # A was least recently used: its oldest rows go first
+        self.assertEqual(len(cache.get('A')), 5)
+        cache.add('C', rows(1)[0])
+        self.assertEqual(set(cache.cache), {'A', 'C'})
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+        self.assertEqual(stats['evicted_keys'], 1)
+
+    def test_hit_miss_statistics(self):
+        cache = DataCache()
+        self.assertEqual(cache.get('XRP/USDT'), [])
+        cache.add('XRP/USDT', rows(1)[0])
+        cache.get('XRP/USDT')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
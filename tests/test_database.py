@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from data.database import Database
+from portfolio_management.portfolio import Portfolio
+
+START = 1_700_000_000_000
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database = Database(os.path.join(self.directory, 'test.db'), flush_interval=0.05)
+
+    def tearDown(self):
+        self.database.close()
+        shutil.rmtree(self.directory)
+
+    def test_wal_mode(self):
+        mode = self.database._reader().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_trades_keyset_pagination(self):
+        for i in range(25):
+            self.database.record_trade({'timestamp': START + i, 'symbol': 'BTC/USDT' if i % 2 else 'ETH/USDT',
+                                        'side': 'buy', 'amount': 1, 'price': 100 + i})
+        self.assertTrue(self.database.flush(5))
+        self.assertEqual(self.database.count('trades'), 25)
+        first = self.database.get_trades(limit=10)
+        second = self.database.get_trades(limit=10, before_id=first[-1]['id'])
+        self.assertEqual([t['price'] for t in first], [124. - i for i in range(10)])
+        self.assertEqual(second[0]['price'], 114.)
+        self.assertEqual(first[0]['side'], 'BUY')
+        self.assertEqual(len(self.database.get_trades(symbol='BTC/USDT', limit=100)), 12)
+
+    def test_orders_upsert(self):
+        order = {'id': 42, 'timestamp': START, 'symbol': 'BTC/USDT', 'side': 'buy', 'amount': 1., 'price': 100., 'status': 'open'}
+        self.database.record_order(order)
+        self.database.record_order(dict(order, status='closed', filled=1.))
+        self.database.flush(5)
+        orders = self.database.get_orders()
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(orders[0]['status'], 'closed')
+        self.assertEqual(self.database.get_orders(status='open'), [])
+
+    def test_orders_pagination_with_equal_timestamps(self):
+        for i in range(7):
+            self.database.record_order({'id': f'o{i}', 'timestamp': START + i // 3, 'symbol': 'BTC/USDT', 'side': 'buy'})
+        self.database.flush(5)
+        ids, before = [], None
+        while True:
+            page = self.database.get_orders(limit=2, before=before)
+            if not page:
+                break
+            ids.extend(order['id'] for order in page)
+            before = (page[-1]['timestamp'], page[-1]['id'])
+        self.assertEqual(ids, ['o6', 'o5', 'o4', 'o3', 'o2', 'o1', 'o0'])
+
+    def test_portfolio_ledger(self):
+        portfolio = Portfolio(1000, ledger=self.database, max_history=3)
+        for _ in range(3):
+            portfolio.execute_trade({'symbol': 'BTC/USDT', 'side': 'BUY', 'amount': 1, 'price': 100})
+        self.database.flush(5)
+        self.assertEqual(len(portfolio.value_history), 3)
+        self.assertEqual(self.database.count('trades'), 3)
+        self.assertEqual(len(self.database.get_equity()), 3)
+        self.assertEqual(portfolio.get_metrics()['total_return'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from data.candle_buffer import CandleWindow
+from data.historical_data import HistoricalData
+from utils.precision import ohlcv_frame
+
+START = 1_699_999_800_000  # aligned on 5 minutes
+STEP = 300_000
+
+class FakeExchangeHandler:
+    def __init__(self, count):
+        self.ohlcv = [[START + i * STEP, 1., 2., 0.5, float(i), 1.] for i in range(count)]
+        self.requests = []
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append(since)
+        return [row for row in self.ohlcv if row[0] >= since][:limit]
+
+def ms(timestamp):
+    return pd.Timestamp(timestamp).value // 1_000_000
+
+class TestMissingDataRanges(unittest.TestCase):
+    def setUp(self):
+        self.handler = FakeExchangeHandler(100)
+        self.historical_data = HistoricalData(self.handler)
+        present = [row for i, row in enumerate(self.handler.ohlcv) if not (10 <= i < 20 or i == 50 or i >= 90)]
+        self.historical_data.data['BTC/USDT_5m'] = ohlcv_frame(present)
+
+    def test_ranges_are_merged_and_timeframe_aware(self):
+        ranges = self.historical_data.get_missing_data_ranges(
+            'BTC/USDT', '5m', pd.Timestamp(START - 2 * STEP, unit='ms'), pd.Timestamp(START + 95 * STEP, unit='ms'))
+        self.assertEqual([(ms(a), ms(b)) for a, b in ranges], [
+            (START - 2 * STEP, START),
+            (START + 10 * STEP, START + 20 * STEP),
+            (START + 50 * STEP, START + 51 * STEP),
+            (START + 90 * STEP, START + 95 * STEP)])
+
+    def test_unaligned_bounds(self):
+        ranges = self.historical_data.get_missing_data_ranges(
+            'BTC/USDT', '5m', pd.Timestamp(START + 12 * STEP + 1, unit='ms'), pd.Timestamp(START + 50 * STEP + 1, unit='ms'))
+        self.assertEqual([(ms(a), ms(b)) for a, b in ranges], [
+            (START + 13 * STEP, START + 20 * STEP),
+            (START + 50 * STEP, START + 50 * STEP + 1)])
+
+    def test_empty_data(self):
+        ranges = self.historical_data.get_missing_data_ranges(
+            'ETH/USDT', '1h', pd.Timestamp(START, unit='ms'), pd.Timestamp(START + 3_600_000, unit='ms'))
+        self.assertEqual(len(ranges), 1)
+
+    def test_no_frame_is_built(self):
+        with patch.object(CandleWindow, 'to_frame', side_effect=AssertionError('frame built')):
+            ranges = self.historical_data.get_missing_data_ranges(
+                'BTC/USDT', '5m', pd.Timestamp(START, unit='ms'), pd.Timestamp(START + 100 * STEP, unit='ms'))
+        self.assertEqual(len(ranges), 3)
+
+    def test_backfill_only_fetches_gaps(self):
+        fetched = asyncio.run(self.historical_data.backfill_missing(
+            'BTC/USDT', '5m', pd.Timestamp(START, unit='ms'), pd.Timestamp(START + 100 * STEP, unit='ms')))
+        self.assertEqual(fetched, 21)
+        self.assertEqual(sorted(self.handler.requests), [START + 10 * STEP, START + 50 * STEP, START + 90 * STEP])
+        data = self.historical_data.get_data('BTC/USDT', '5m')
+        self.assertEqual(list(data['close']), [float(i) for i in range(100)])
+
+class TestCandleAccess(unittest.TestCase):
+    def setUp(self):
+        self.historical_data = HistoricalData(FakeExchangeHandler(0))
+        self.historical_data.data['BTC/USDT_5m'] = ohlcv_frame(FakeExchangeHandler(50).ohlcv)
+
+    def test_get_candles_is_a_view(self):
+        candles = asyncio.run(self.historical_data.get_candles('BTC/USDT', '5m', 10))
+        self.assertEqual(len(candles), 10)
+        self.assertEqual(candles.close[-1], 49.)
+        self.assertIsNotNone(candles.close.base)
+        self.assertFalse(candles.close.flags.writeable)
+        self.assertEqual(len(asyncio.run(self.historical_data.get_candles('ETH/USDT', '5m'))), 0)
+
+    def test_append_candle_and_ticker(self):
+        self.historical_data.append_candle('BTC/USDT', '5m', {'timestamp': START + 50 * STEP, 'open': 50., 'high': 51.,
+                                                              'low': 49., 'close': 50.5, 'volume': 3.})
+        self.historical_data.update_from_ticker('BTC/USDT', '5m', {'timestamp': START + 50 * STEP + 1000, 'last': 52.})
+        self.historical_data.update_from_ticker('BTC/USDT', '5m', {'timestamp': START + 51 * STEP + 1000, 'last': 53.})
+        candles = asyncio.run(self.historical_data.get_candles('BTC/USDT', '5m', 2))
+        self.assertEqual(list(candles.timestamp), [START + 50 * STEP, START + 51 * STEP])
+        self.assertEqual(list(candles.high), [52., 53.])
+        self.assertEqual(list(candles.close), [52., 53.])
+        self.assertEqual(list(candles.volume), [3., 0.])
+        self.assertEqual(len(self.historical_data.get_data('BTC/USDT', '5m')), 52)
+
+if __name__ == '__main__':
+    unittest.main()
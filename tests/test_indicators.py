@@ -0,0 +1,404 @@
+
+import unittest
+import numpy as np
+import pandas as pd
+from indicators import smoothing
+from indicators.rolling import rolling_mean_std
+from indicators.panel import left_align, restore
+from indicators.rsi import RSI, StreamingRSI
+from indicators.macd import MACD, StreamingMACD
+from indicators.bollinger_bands import BollingerBands, StreamingBollingerBands
+from indicators.ema import EMA, StreamingEMA
+from indicators.sma import SMA, StreamingSMA
+from indicators.atr import ATR, StreamingATR
+from indicators.dmi import DMI, StreamingDMI
+from indicators.adx import ADX, StreamingADX
+from indicators.technical_indicators import calculate_ema, calculate_true_range
+from indicators.sweep import ema_sweep, sma_sweep, rsi_sweep, macd_sweep
+from indicators.indicator_cache import IndicatorCache, CachedIndicator
+from core.plugin_manager import PluginManager
+
+def reference_ema(data, period):
+    alpha = 2 / (period + 1)
+    ema = np.zeros(len(data))
+    ema[0] = data[0]
+    for i in range(1, len(data)):
+        ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
+    return ema
+
+def reference_rsi(data, period):
+    # Loop implementation RSI.calculate replaced
+    deltas = np.diff(data)
+    seed = deltas[:period+1]
+    up = seed[seed >= 0].sum()/period
+    down = -seed[seed < 0].sum()/period
+    rsi = np.zeros_like(data)
+    rsi[:period] = 100. - 100./(1. + up / down)
+    for i in range(period, len(data)):
+        delta = deltas[i - 1]
+        upval, downval = (delta, 0.) if delta > 0 else (0., -delta)
+        up = (up*(period-1) + upval)/period
+        down = (down*(period-1) + downval)/period
+        rsi[i] = 100. - 100./(1. + up / down)
+    return rsi
+
+def reference_atr(high, low, close, period):
+    ranges = calculate_true_range(high, low, close)
+    atr = np.full(len(close), np.nan)
+    atr[period] = np.mean(ranges[1:period + 1])
+    for i in range(period + 1, len(close)):
+        atr[i] = (atr[i - 1] * (period - 1) + ranges[i]) / period
+    return atr
+
+class TestSmoothing(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.prices = 100 + np.cumsum(rng.normal(size=1000))
+
+    def test_ema_matches_recursion(self):
+        for length in [1, 2, 31, 32, 33, 1000]:
+            for period in [2, 12, 26, 200]:
+                np.testing.assert_allclose(smoothing.ema(self.prices[:length], period),
+                                           reference_ema(self.prices[:length], period), rtol=1e-12)
+
+    def test_backends(self):
+        previous = smoothing.get_backend()
+        expected = RSI(14).calculate(self.prices)
+        try:
+            smoothing.set_backend('numpy')
+            np.testing.assert_allclose(smoothing.ema(self.prices, 12), reference_ema(self.prices, 12), rtol=1e-12)
+            np.testing.assert_allclose(RSI(14).calculate(self.prices), expected, rtol=1e-12)
+            if smoothing.numba is not None:
+                smoothing.set_backend('numba')
+                np.testing.assert_array_equal(smoothing.ema(self.prices, 12), reference_ema(self.prices, 12))
+                np.testing.assert_array_equal(smoothing.ema_multi(self.prices[None, :], [12, 26])[1, 0],
+                                              reference_ema(self.prices, 26))
+            self.assertRaises(ValueError, smoothing.set_backend, 'cuda')
+        finally:
+            smoothing.set_backend(previous)
+
+    def test_numpy_backend_nan_placement(self):
+        previous = smoothing.get_backend()
+        prices = self.prices.copy()
+        prices[500] = np.nan
+        panel = np.vstack([self.prices[:100], self.prices[100:200]])
+        panel[0, 40] = np.nan
+        try:
+            smoothing.set_backend('numpy')
+            result = smoothing.ema(prices, 12)
+            expected = reference_ema(prices, 12)
+            np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+            np.testing.assert_allclose(result, expected, rtol=1e-12)
+            rsi = RSI(14).calculate(panel)
+            np.testing.assert_array_equal(np.isnan(rsi[0]), np.arange(100) >= 40)
+            self.assertFalse(np.isnan(rsi[1]).any())
+            if smoothing.numba is not None:
+                smoothing.set_backend('numba')
+                np.testing.assert_array_equal(np.isnan(RSI(14).calculate(panel)), np.isnan(rsi))
+        finally:
+            smoothing.set_backend(previous)
+
+    @unittest.skipIf(smoothing.numba is None, "numba is not installed")
+    def test_numba_wilder_is_bit_identical(self):
+        previous = smoothing.get_backend()
+        rng = np.random.default_rng(7)
+        high = self.prices + rng.random(len(self.prices))
+        low = self.prices - rng.random(len(self.prices))
+        try:
+            smoothing.set_backend('numba')
+            for period in [2, 14, 50]:
+                np.testing.assert_array_equal(RSI(period).calculate(self.prices), reference_rsi(self.prices, period))
+                np.testing.assert_array_equal(ATR(period).calculate(high, low, self.prices),
+                                              reference_atr(high, low, self.prices, period))
+            panel = np.vstack([self.prices, self.prices[::-1]])
+            np.testing.assert_array_equal(RSI(14).calculate(panel)[1], reference_rsi(self.prices[::-1], 14))
+        finally:
+            smoothing.set_backend(previous)
+
+    def test_ema_empty(self):
+        self.assertEqual(len(smoothing.ema(np.array([]), 12)), 0)
+
+    def test_ema_integer_input(self):
+        prices = np.array(range(50, 0, -1))
+        np.testing.assert_allclose(smoothing.ema(prices, 12), reference_ema(prices.astype(float), 12), rtol=1e-12)
+
+    def test_ema_multi(self):
+        periods = [5, 12, 26, 50]
+        result = smoothing.ema_multi(self.prices, periods)
+        self.assertEqual(result.shape, (len(periods), len(self.prices)))
+        for row, period in zip(result, periods):
+            np.testing.assert_allclose(row, reference_ema(self.prices, period), rtol=1e-12)
+
+    def test_ema_rows(self):
+        panel = np.vstack([self.prices, self.prices[::-1]])
+        result = smoothing.ema(panel, 12)
+        np.testing.assert_allclose(result[1], reference_ema(self.prices[::-1], 12), rtol=1e-12)
+
+    def test_wilder(self):
+        period = 14
+        result = smoothing.wilder(self.prices, period, start=period - 1)
+        self.assertTrue(np.all(np.isnan(result[:period - 1])))
+        expected = np.mean(self.prices[:period])
+        for i in range(period - 1, len(self.prices)):
+            if i >= period:
+                expected = (expected * (period - 1) + self.prices[i]) / period
+            self.assertAlmostEqual(result[i], expected, places=9)
+
+class TestRolling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.prices = 20000 + np.cumsum(rng.normal(scale=0.01, size=500))
+
+    def test_rolling_mean_std_matches_windows(self):
+        for window in [1, 5, 20]:
+            mean, std = rolling_mean_std(self.prices, window)
+            self.assertTrue(np.all(np.isnan(mean[:window - 1])))
+            for i in range(window - 1, len(self.prices)):
+                values = self.prices[i - window + 1:i + 1]
+                self.assertAlmostEqual(mean[i], values.mean(), places=8)
+                np.testing.assert_allclose(std[i], values.std(), rtol=1e-7, atol=1e-12)
+
+    def test_rolling_with_missing_values(self):
+        prices = self.prices.copy()
+        prices[100] = np.nan
+        mean, std = rolling_mean_std(prices, 20)
+        self.assertTrue(np.all(np.isnan(std[100:120])))
+        self.assertFalse(np.any(np.isnan(std[120:])))
+        self.assertAlmostEqual(std[99] / self.prices[80:100].std(), 1, places=7)
+
+    def test_bollinger_bands_short_series(self):
+        upper, middle, lower = BollingerBands(period=20).calculate(self.prices[:10])
+        self.assertEqual(len(middle), 10)
+        self.assertTrue(np.all(np.isnan(middle)))
+
+    def test_bollinger_bands_calculate_all(self):
+        indicator = BollingerBands(period=20, std_dev=2)
+        upper, middle, lower, bandwidth, percent_b = indicator.calculate_all(self.prices)
+        i = len(self.prices) - 1
+        window = self.prices[-20:]
+        self.assertAlmostEqual(middle[i], window.mean(), places=8)
+        self.assertAlmostEqual((upper[i] - middle[i]) / (2 * window.std()), 1, places=7)
+        np.testing.assert_allclose(bandwidth, indicator.get_bandwidth(self.prices))
+        np.testing.assert_allclose(percent_b, (self.prices - lower) / (upper - lower))
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.prices = 100 + np.cumsum(rng.normal(size=300))
+
+    def test_streaming_rsi_matches_batch(self):
+        for seed_length in [0, 10, 16, 100]:
+            stream = StreamingRSI(14).seed(self.prices[:seed_length])
+            for i in range(seed_length, len(self.prices)):
+                value = stream.update(self.prices[i])
+                self.assertAlmostEqual(value, RSI(14).calculate(self.prices[:i+1])[-1], places=9)
+
+    def test_streaming_rsi_special_cases(self):
+        self.assertTrue(np.isnan(StreamingRSI(14).seed([0] * 20).value))
+        stream = StreamingRSI(14).seed([10] * 20)
+        self.assertEqual(stream.value, 50)
+        self.assertEqual(stream.update(11), RSI(14).calculate([10] * 20 + [11])[-1])
+
+    def test_streaming_macd_matches_batch(self):
+        stream = StreamingMACD().seed(self.prices[:50])
+        for i in range(50, len(self.prices)):
+            value = stream.update(self.prices[i])
+            expected = [line[-1] for line in MACD().calculate(self.prices[:i+1])]
+            np.testing.assert_allclose(value, expected, rtol=1e-9, atol=1e-12)
+
+    def test_streaming_bollinger_bands_matches_batch(self):
+        stream = StreamingBollingerBands(period=20).seed(self.prices[:5])
+        for i in range(5, len(self.prices)):
+            value = stream.update(self.prices[i])
+            if i < 19:
+                self.assertTrue(np.isnan(value[1]))
+            else:
+                expected = [band[-1] for band in BollingerBands(period=20).calculate(self.prices[:i+1])]
+                np.testing.assert_allclose(value, expected, rtol=1e-10)
+
+class TestPanelIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.series = {
+            'BTC/USDT': 100 + np.cumsum(rng.normal(size=200)),
+            'ETH/USDT': 50 + np.cumsum(rng.normal(size=120)),
+            'DOGE/USDT': 10 + np.cumsum(rng.normal(scale=0.1, size=30)),
+        }
+
+    def test_left_align_roundtrip(self):
+        values = np.array([[np.nan, np.nan, 1., 2., np.nan, 4.], [1., 2., 3., 4., 5., 6.]])
+        aligned, starts = left_align(values)
+        np.testing.assert_array_equal(starts, [2, 0])
+        np.testing.assert_array_equal(aligned[0], [1., 2., 2., 4., 4., 4.])
+        restored = restore(aligned, starts)
+        self.assertTrue(np.all(np.isnan(restored[0, :2])))
+        np.testing.assert_array_equal(restored[0, 2:], [1., 2., 2., 4.])
+
+    def test_ragged_dict_matches_single_series(self):
+        for indicator in [RSI(14), MACD(), BollingerBands(period=20)]:
+            results = indicator.calculate_panel(self.series)
+            for symbol, prices in self.series.items():
+                expected = indicator.calculate(prices)
+                if not isinstance(expected, tuple):
+                    expected, results[symbol] = (expected,), (results[symbol],)
+                for line, result in zip(expected, results[symbol]):
+                    np.testing.assert_allclose(result, line, rtol=1e-9, atol=1e-9)
+
+    def test_dataframe_panel(self):
+        index = pd.date_range('2024-01-01', periods=200, freq='h')
+        frame = pd.DataFrame({symbol: pd.Series(prices, index=index[-len(prices):])
+                              for symbol, prices in self.series.items()})
+        result = RSI(14).calculate_panel(frame)
+        self.assertIsInstance(result, pd.DataFrame)
+        self.assertEqual(result.shape, frame.shape)
+        self.assertTrue(result['ETH/USDT'].iloc[:80].isna().all())
+        np.testing.assert_allclose(result['ETH/USDT'].iloc[80:], RSI(14).calculate(self.series['ETH/USDT']), rtol=1e-9)
+
+    def test_dataframe_panel_symbol_ending_early(self):
+        index = pd.date_range('2024-01-01', periods=200, freq='h')
+        frame = pd.DataFrame({'BTC/USDT': self.series['BTC/USDT'],
+                              'ETH/USDT': pd.Series(self.series['ETH/USDT'], index=index[:120])}, index=index)
+        for indicator in [RSI(14), MACD()]:
+            result = indicator.calculate_panel(frame)
+            lines = result if isinstance(result, tuple) else (result,)
+            expected = indicator.calculate(self.series['ETH/USDT'])
+            expected = expected if isinstance(expected, tuple) else (expected,)
+            for line, reference in zip(lines, expected):
+                self.assertTrue(line['ETH/USDT'].iloc[120:].isna().all())
+                np.testing.assert_allclose(line['ETH/USDT'].iloc[:120], reference, rtol=1e-9, atol=1e-9)
+
+def reference_dmi_adx(high, low, close, period):
+    # Textbook Wilder recursion on running sums
+    n = len(close)
+    tr, plus_dm, minus_dm = np.zeros(n), np.zeros(n), np.zeros(n)
+    for i in range(1, n):
+        tr[i] = max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1]))
+        up, down = high[i] - high[i-1], low[i-1] - low[i]
+        plus_dm[i] = up if up > down and up > 0 else 0
+        minus_dm[i] = down if down > up and down > 0 else 0
+    plus_di, dx, adx = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    smoothed = [sum(tr[1:period+1]), sum(plus_dm[1:period+1]), sum(minus_dm[1:period+1])]
+    for i in range(period, n):
+        if i > period:
+            smoothed = [s - s / period + x for s, x in zip(smoothed, (tr[i], plus_dm[i], minus_dm[i]))]
+        plus, minus = 100 * smoothed[1] / smoothed[0], 100 * smoothed[2] / smoothed[0]
+        plus_di[i], dx[i] = plus, 100 * abs(plus - minus) / (plus + minus)
+    adx[2*period-1] = np.mean(dx[period:2*period])
+    for i in range(2*period, n):
+        adx[i] = (adx[i-1] * (period - 1) + dx[i]) / period
+    return plus_di, adx
+
+class TestTrendIndicators(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(11)
+        self.close = 100 + np.cumsum(np.random.normal(0, 1, 300))
+        self.high = self.close + np.random.rand(300)
+        self.low = self.close - np.random.rand(300)
+
+    def test_true_range_first_bar(self):
+        np.testing.assert_allclose(calculate_true_range([10, 12, 15], [8, 9, 11], [9, 11, 14]), [2, 3, 4])
+
+    def test_dmi_adx_match_wilder_recursion(self):
+        plus_di, adx = reference_dmi_adx(self.high, self.low, self.close, 14)
+        np.testing.assert_allclose(DMI(14).calculate(self.high, self.low, self.close)[0], plus_di, rtol=1e-10)
+        np.testing.assert_allclose(ADX(14).calculate(self.high, self.low, self.close), adx, rtol=1e-10)
+        self.assertTrue(np.isnan(ATR(14).calculate(self.high, self.low, self.close)[:14]).all())
+
+    def test_sma_ema(self):
+        np.testing.assert_allclose(SMA(20).calculate(self.close)[19:],
+                                   np.convolve(self.close, np.ones(20) / 20, mode='valid'), rtol=1e-12)
+        series = pd.Series(self.close, index=pd.date_range('2023-01-01', periods=300, freq='h'))
+        result = calculate_ema(series, 10)
+        self.assertIsInstance(result, pd.Series)
+        np.testing.assert_allclose(result, series.ewm(span=10, adjust=False).mean(), rtol=1e-12)
+
+    def test_streaming_matches_batch(self):
+        for streaming, batch in ((StreamingEMA, EMA), (StreamingSMA, SMA)):
+            indicator = streaming(14).seed(self.close[:5])
+            values = [indicator.update(price) for price in self.close[5:]]
+            np.testing.assert_allclose(values, batch(14).calculate(self.close)[5:], rtol=1e-9)
+        bars = list(zip(self.high, self.low, self.close))
+        for streaming, batch in ((StreamingATR, ATR), (StreamingDMI, DMI), (StreamingADX, ADX)):
+            expected = batch(14).calculate(self.high, self.low, self.close)
+            expected = expected[0] if isinstance(expected, tuple) else expected
+            for start in (5, 100):
+                indicator = streaming(14).seed(self.high[:start], self.low[:start], self.close[:start])
+                values = [indicator.update(*bar) for bar in bars[start:]]
+                values = [value[0] if isinstance(value, tuple) else value for value in values]
+                np.testing.assert_allclose(values, expected[start:], rtol=1e-9)
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(3)
+        self.close = 100 + np.cumsum(np.random.normal(0, 1, 300))
+        self.cache = IndicatorCache()
+
+    def test_shared_results(self):
+        first = CachedIndicator(MACD(12, 26, 9), self.cache)
+        second = CachedIndicator(MACD(12, 26, 9), self.cache)
+        macd, signal, _ = first.calculate(self.close, symbol='BTC/USDT', timeframe='1h', timestamp=1000)
+        again, _, _ = second.calculate(self.close, symbol='BTC/USDT', timeframe='1h', timestamp=1000)
+        self.assertIs(macd, again)
+        self.assertFalse(macd.flags.writeable)
+        np.testing.assert_allclose(signal, MACD(12, 26, 9).calculate(self.close)[1])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_includes_parameters_and_data(self):
+        CachedIndicator(MACD(12, 26, 9), self.cache).calculate(self.close)
+        CachedIndicator(MACD(5, 35, 5), self.cache).calculate(self.close)
+        CachedIndicator(MACD(12, 26, 9), self.cache).calculate(self.close[:-1])
+        CachedIndicator(RSI(14), self.cache).calculate(self.close, symbol='BTC/USDT', timeframe='1h', timestamp=1000)
+        # Same last candle but its close moved: must not hit
+        updated = self.close.copy()
+        updated[-1] += 1
+        CachedIndicator(RSI(14), self.cache).calculate(updated, symbol='BTC/USDT', timeframe='1h', timestamp=1000)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 5))
+
+    def test_lru_eviction_by_size(self):
+        cache = IndicatorCache(max_bytes=int(1.5 * self.close.nbytes))
+        rsi = CachedIndicator(RSI(14), cache)
+        rsi.calculate(self.close[:100])
+        rsi.calculate(self.close[:200])
+        rsi.calculate(self.close[:100])
+        rsi.calculate(self.close)
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+        self.assertEqual((stats['entries'], stats['evictions'], stats['hits']), (2, 1, 1))
+        # The least recently used entry (200 bars) was evicted
+        rsi.calculate(self.close[:100])
+        rsi.calculate(self.close[:200])
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_plugin_manager_shares_cache(self):
+        manager = PluginManager(indicator_cache=self.cache)
+        macd = manager.load_indicator('MACD', {'fast_period': 12, 'slow_period': 26, 'signal_period': 9})
+        self.assertIs(macd, manager.load_indicator('MACD', {'signal_period': 9, 'slow_period': 26, 'fast_period': 12}))
+        self.assertEqual(macd.fast_period, 12)
+        macd.calculate(self.close, symbol='ETH/USDT', timeframe='1h', timestamp=1000)
+        manager.load_indicator('MACD').calculate(self.close, symbol='ETH/USDT', timeframe='1h', timestamp=1000)
+        self.assertEqual(manager.get_indicator_cache_stats()['hits'], 1)
+
+class TestSweeps(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(5)
+        self.close = 100 + np.cumsum(np.random.normal(0, 1, 400))
+
+    def test_rows_match_single_period(self):
+        periods = list(range(2, 51))
+        for length in (10, 60, 400):
+            close = self.close[:length]
+            for sweep, indicator in ((rsi_sweep, RSI), (ema_sweep, EMA), (sma_sweep, SMA)):
+                result = sweep(close, periods)
+                self.assertEqual(result.shape, (len(periods), length))
+                for row, period in zip(result, periods):
+                    np.testing.assert_allclose(row, indicator(period).calculate(close), rtol=1e-9, atol=1e-12)
+
+    def test_macd_grid(self):
+        macd_line, signal_line, _ = macd_sweep(self.close, [8, 12], [26, 30], 9)
+        self.assertEqual(macd_line.shape, (2, 2, 400))
+        expected = MACD(12, 30, 9).calculate(self.close)
+        np.testing.assert_allclose(macd_line[1, 1], expected[0], rtol=1e-10)
+        np.testing.assert_allclose(signal_line[1, 1], expected[1], rtol=1e-10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from data.market_stream import MarketStream, WebSocketTransport
+from data.real_time_data_manager import RealTimeDataManager
+from data.stream_server import LocalStreamServer
+
+async def wait_until(condition, timeout=5):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+class TestMarketStream(unittest.TestCase):
+    def run_with_server(self, scenario):
+        async def main():
+            server = LocalStreamServer()
+            await server.start()
+            stream = MarketStream(WebSocketTransport(server.url), reconnect_delay=0.01)
+            try:
+                await scenario(server, stream)
+            finally:
+                await stream.stop()
+                await server.stop()
+        asyncio.run(main())
+
+    def test_updates_are_pushed_to_subscribers(self):
+        async def scenario(server, stream):
+            received = []
+            stream.subscribe('trades', 'BTC/USDT', lambda symbol, data: received.append((symbol, data)))
+            task = asyncio.ensure_future(stream.run())
+            await server.wait_for_subscribers('trades', 'BTC/USDT')
+            await server.publish('trades', 'BTC/USDT', {'price': 1.5, 'amount': 2})
+            await server.publish('trades', 'ETH/USDT', {'price': 9})
+            await wait_until(lambda: received)
+            self.assertEqual(received, [('BTC/USDT', {'price': 1.5, 'amount': 2})])
+            task.cancel()
+        self.run_with_server(scenario)
+
+    def test_sequence_gap_and_reconnect(self):
+        async def scenario(server, stream):
+            received, gaps = [], []
+            stream.subscribe('ticker', 'BTC/USDT', lambda symbol, data: received.append(data['last']))
+            stream.on_gap(lambda *gap: gaps.append(gap))
+            task = asyncio.ensure_future(stream.run())
+            await server.wait_for_subscribers('ticker', 'BTC/USDT')
+            await server.publish('ticker', 'BTC/USDT', {'last': 1})
+            server.skip_sequence('ticker', 'BTC/USDT', 2)
+            await server.publish('ticker', 'BTC/USDT', {'last': 2})
+            await wait_until(lambda: len(received) == 2)
+            self.assertEqual(gaps, [('ticker', 'BTC/USDT', 2, 4)])
+
+            await server.drop_connections()
+            await server.wait_for_subscribers('ticker', 'BTC/USDT')
+            await server.publish('ticker', 'BTC/USDT', {'last': 3})
+            await wait_until(lambda: len(received) == 3)
+            self.assertEqual(stream.reconnects, 1)
+            self.assertEqual(stream.gaps, 1)
+            task.cancel()
+        self.run_with_server(scenario)
+
+    def test_real_time_data_manager_uses_stream(self):
+        async def scenario(server, stream):
+            manager = RealTimeDataManager(None, ['BTC/USDT', 'ETH/USDT'], stream)
+            task = asyncio.ensure_future(manager.start())
+            await server.wait_for_subscribers('ticker', 'ETH/USDT')
+            await server.publish('ticker', 'ETH/USDT', {'last': 2000.})
+            await wait_until(lambda: manager.get_latest_data('ETH/USDT'))
+            self.assertEqual(manager.get_latest_data('ETH/USDT'), {'last': 2000.})
+            self.assertEqual(manager.get_latest_data('BTC/USDT'), {})
+            await manager.stop()
+            await asyncio.wait_for(task, 5)
+        self.run_with_server(scenario)
+
+if __name__ == '__main__':
+    unittest.main()
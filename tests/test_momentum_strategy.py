@@ -0,0 +1,32 @@
+import asyncio
+import unittest
+from data.historical_data import HistoricalData
+from strategies.momentum_strategy import MomentumStrategy
+
+START = 1_700_000_000_000
+
+class TestMomentumStrategy(unittest.TestCase):
+    def setUp(self):
+        self.historical_data = HistoricalData(None)
+        config = {'symbols': ['BTC/USDT'], 'timeframe': '1h', 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+                  'adx_period': 14, 'adx_threshold': 25, 'risk_per_trade': 0.01}
+        self.strategy = MomentumStrategy(config, None, self.historical_data, None)
+
+    def test_no_signal_without_candles(self):
+        analysis = asyncio.run(self.strategy.analyze('BTC/USDT', '1h'))
+        self.assertIsNone(analysis)
+        self.assertIsNone(asyncio.run(self.strategy.generate_signal(analysis)))
+
+    def test_no_signal_below_lookback(self):
+        for i in range(self.strategy.lookback - 1):
+            self.historical_data.append_candle('BTC/USDT', '1h', [START + i * 3_600_000, 1., 2., 0.5, 1. + i, 1.])
+        self.assertIsNone(asyncio.run(self.strategy.analyze('BTC/USDT', '1h')))
+
+    def test_analysis_with_enough_candles(self):
+        for i in range(self.strategy.lookback):
+            self.historical_data.append_candle('BTC/USDT', '1h', [START + i * 3_600_000, 1. + i, 2. + i, 0.5 + i, 1.5 + i, 1.])
+        analysis = asyncio.run(self.strategy.analyze('BTC/USDT', '1h'))
+        self.assertEqual(analysis['timestamp'], START + (self.strategy.lookback - 1) * 3_600_000)
+
+if __name__ == '__main__':
+    unittest.main()
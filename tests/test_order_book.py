@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+from core.exchange_handler import ExchangeHandler
+from core.order_book import OrderBook, OrderBookOutOfSync
+from data.market_stream import MarketStream
+
+SNAPSHOT = {
+    'bids': [[100., 1.], [99., 2.], [98., 3.]],
+    'asks': [[101., 1.], [102., 2.], [103., 3.]],
+    'sequence': 10
+}
+
+class FakeExchange:
+    def __init__(self):
+        self.snapshots = 0
+
+    async def fetch_order_book(self, symbol):
+        self.snapshots += 1
+        return dict(SNAPSHOT)
+
+class TestOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = OrderBook('BTC/USDT')
+        self.book.apply_snapshot(SNAPSHOT)
+
+    def test_queries(self):
+        self.assertEqual(self.book.best_bid(), (100., 1.))
+        self.assertEqual(self.book.best_ask(), (101., 1.))
+        self.assertEqual(self.book.spread(), 1.)
+        self.assertEqual(self.book.mid_price(), 100.5)
+        self.assertEqual(self.book.depth_at(99, 'bids'), 2.)
+        self.assertEqual(self.book.depth_at(99.5, 'bids'), 0.)
+        self.assertEqual(self.book.vwap(2, 'buy'), 101.5)
+        self.assertAlmostEqual(self.book.vwap(4, 'bids'), (100 + 2 * 99 + 98) / 4)
+        self.assertIsNone(self.book.vwap(100, 'asks'))
+        self.assertRaises(ValueError, self.book.vwap, 0, 'asks')
+
+    def test_deltas(self):
+        self.assertTrue(self.book.apply_delta({'bids': [[100., 0.], [99.5, 4.]], 'asks': [[100.5, 1.]], 'sequence': 11}))
+        self.assertEqual(self.book.best_bid(), (99.5, 4.))
+        self.assertEqual(self.book.best_ask(), (100.5, 1.))
+        self.assertEqual([level[0] for level in self.book.bids.levels()], [99.5, 99., 98.])
+        self.assertFalse(self.book.apply_delta({'bids': [[1., 1.]], 'sequence': 11}))
+        with self.assertRaises(OrderBookOutOfSync):
+            self.book.apply_delta({'bids': [[1., 1.]], 'sequence': 13})
+        self.assertFalse(self.book.synced)
+
+    def test_checksum(self):
+        expected = OrderBook('BTC/USDT')
+        expected.apply_snapshot({'bids': [[100., 1.], [99., 5.], [98., 3.]], 'asks': SNAPSHOT['asks']})
+        self.assertTrue(self.book.apply_delta({'bids': [[99., 5.]], 'sequence': 11, 'checksum': expected.checksum()}))
+        with self.assertRaises(OrderBookOutOfSync):
+            self.book.apply_delta({'asks': [[101., 2.]], 'sequence': 12, 'checksum': expected.checksum()})
+
+    def test_depth_limit(self):
+        book = OrderBook('BTC/USDT', depth=2)
+        book.apply_snapshot(SNAPSHOT)
+        self.assertEqual(len(book.bids), 2)
+        self.assertEqual(book.to_dict()['asks'], [[101., 1.], [102., 2.]])
+
+class TestExchangeHandlerOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.handler = ExchangeHandler({'name': 'binance', 'api_key': 'key', 'secret_key': 'secret'})
+        asyncio.run(self.handler.exchange.close())
+        self.handler.exchange = FakeExchange()
+
+    def test_untracked_book_is_refreshed(self):
+        handler = self.handler
+        asyncio.run(handler.get_order_book('BTC/USDT'))
+        asyncio.run(handler.get_order_book('BTC/USDT'))
+        self.assertEqual(handler.exchange.snapshots, 2)
+
+    def test_snapshot_only_when_needed(self):
+        handler = self.handler
+        stream = MarketStream(transport=None)
+        handler.track_order_book(stream, 'BTC/USDT')
+        stream.connected.set()
+        asyncio.run(handler.get_order_book('BTC/USDT'))
+        self.assertTrue(handler.apply_order_book_update('BTC/USDT', {'asks': [[101., 0.]], 'sequence': 11}))
+        book = asyncio.run(handler.get_order_book('BTC/USDT', depth=1))
+        self.assertEqual(book['asks'], [[102., 2.]])
+        self.assertEqual(handler.exchange.snapshots, 1)
+        self.assertFalse(handler.apply_order_book_update('BTC/USDT', {'asks': [[101., 1.]], 'sequence': 20}))
+        asyncio.run(handler.get_order_book('BTC/USDT'))
+        self.assertEqual(handler.exchange.snapshots, 2)
+        # Disconnected stream: the book may be stale
+        stream.connected.clear()
+        asyncio.run(handler.get_order_book('BTC/USDT'))
+        self.assertEqual(handler.exchange.snapshots, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from utils.precision import set_precision, get_storage_dtype, ohlcv_frame
+from indicators.rsi import RSI
+from indicators.macd import MACD
+from indicators.sweep import ema_sweep
+
+class TestPrecision(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = 30000 + np.cumsum(rng.normal(0, 20, 2000))
+        self.ohlcv = [[1_600_000_000_000 + i * 60_000, c, c + 5, c - 5, c, 1000 + i] for i, c in enumerate(self.close)]
+
+    def tearDown(self):
+        set_precision('float64')
+
+    def test_float32_storage(self):
+        set_precision('float32')
+        df = ohlcv_frame(self.ohlcv)
+        self.assertTrue((df.dtypes == np.float32).all())
+        self.assertEqual(df.index[1] - df.index[0], np.timedelta64(60, 's'))
+        set_precision('float64')
+        self.assertLess(df.memory_usage(index=False).sum(), ohlcv_frame(self.ohlcv).memory_usage(index=False).sum() * 0.51)
+
+    def test_indicator_error_budget(self):
+        set_precision('float32')
+        close32 = ohlcv_frame(self.ohlcv)['close'].to_numpy()
+        u = 2. ** -24
+        np.testing.assert_allclose(close32, self.close, rtol=u)
+        macd32 = MACD().calculate(close32)[0]
+        self.assertEqual(macd32.dtype, np.float64)
+        self.assertLess(np.max(np.abs(macd32 - MACD().calculate(self.close)[0])), 4 * u * self.close.max())
+        # Typical bar moves (~20) are far above 1e-7 * price, so RSI barely moves
+        self.assertLess(np.max(np.abs(RSI(14).calculate(close32) - RSI(14).calculate(self.close))), 1e-3)
+
+    def test_sweep_buffers(self):
+        set_precision('float32')
+        self.assertEqual(get_storage_dtype(), np.float32)
+        self.assertEqual(ema_sweep(self.close, [5, 10]).dtype, np.float32)
+        self.assertRaises(ValueError, set_precision, 'float16')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from core.exchange_handler import ExchangeHandler
+from data.real_time_data_manager import RealTimeDataManager
+
+class FakeTickerHandler:
+    def __init__(self, prices):
+        self.prices = prices
+        self.requests = []
+
+    async def get_tickers(self, symbols):
+        self.requests.append(list(symbols))
+        return {symbol: {'symbol': symbol, 'last': self.prices[symbol]} for symbol in symbols}
+
+class FakeExchange:
+    def __init__(self, bulk):
+        self.has = {'fetchTickers': bulk}
+        self.calls = []
+
+    async def fetch_tickers(self, symbols):
+        self.calls.append(('fetch_tickers', symbols))
+        return {symbol: {'last': 1.} for symbol in symbols}
+
+    async def fetch_ticker(self, symbol):
+        self.calls.append(('fetch_ticker', symbol))
+        return {'last': 2.}
+
+class TestAdaptivePolling(unittest.TestCase):
+    def setUp(self):
+        self.symbols = [f"S{i}/USDT" for i in range(200)]
+        self.handler = FakeTickerHandler({symbol: 100. for symbol in self.symbols})
+        self.manager = RealTimeDataManager(self.handler, self.symbols, min_interval=1, max_interval=8)
+
+    def poll(self):
+        for symbol in self.symbols:
+            self.manager.next_poll[symbol] = 0.
+        return asyncio.run(self.manager.poll_due_symbols())
+
+    def test_one_batched_request_per_cycle(self):
+        self.assertEqual(len(self.poll()), 200)
+        self.assertEqual(len(self.handler.requests), 1)
+        self.assertEqual(asyncio.run(self.manager.poll_due_symbols()), [])
+        staleness = self.manager.get_staleness()
+        self.assertEqual(staleness['S0/USDT']['polls'], 1)
+        self.assertLess(staleness['S0/USDT']['age'], 1)
+
+    def test_intervals_follow_activity(self):
+        self.poll()
+        for _ in range(10):
+            self.handler.prices['S0/USDT'] *= 1.01
+            self.poll()
+        self.assertEqual(self.manager.intervals['S0/USDT'], 1)
+        self.assertEqual(self.manager.intervals['S1/USDT'], 8)
+        self.assertIsNone(self.manager.get_staleness()['S1/USDT']['since_last_change'])
+
+class TestExchangeHandlerTickers(unittest.TestCase):
+    def make_handler(self, bulk):
+        handler = ExchangeHandler({'name': 'binance', 'api_key': 'key', 'secret_key': 'secret'})
+        asyncio.run(handler.exchange.close())
+        handler.exchange = FakeExchange(bulk)
+        return handler
+
+    def test_bulk_request(self):
+        handler = self.make_handler(True)
+        tickers = asyncio.run(handler.get_tickers(['BTC/USDT', 'ETH/USDT']))
+        self.assertEqual(set(tickers), {'BTC/USDT', 'ETH/USDT'})
+        self.assertEqual(len(handler.exchange.calls), 1)
+
+    def test_gather_fallback(self):
+        handler = self.make_handler(False)
+        tickers = asyncio.run(handler.get_tickers(['BTC/USDT', 'ETH/USDT', 'XRP/USDT']))
+        self.assertEqual(tickers['XRP/USDT'], {'last': 2.})
+        self.assertEqual(len(handler.exchange.calls), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+from core.exchange_handler import ExchangeHandler
+from core.request_coalescer import RequestCoalescer
+
+class FakeExchange:
+    def __init__(self):
+        self.calls = []
+        self.has = {}
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(('fetch_ohlcv', symbol, since))
+        await asyncio.sleep(0.01)
+        return [[1000, 1., 2., 0.5, 1.5, 10.]]
+
+    async def fetch_ticker(self, symbol):
+        self.calls.append(('fetch_ticker', symbol))
+        await asyncio.sleep(0.01)
+        return {'symbol': symbol, 'last': 1.}
+
+def make_handler(cache_ttl=None):
+    handler = ExchangeHandler({'name': 'binance', 'api_key': 'key', 'secret_key': 'secret', 'cache_ttl': cache_ttl})
+    asyncio.run(handler.exchange.close())
+    handler.exchange = FakeExchange()
+    return handler
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_identical_calls_share_one_request(self):
+        handler = make_handler()
+
+        async def main():
+            return await asyncio.gather(
+                handler.get_ohlcv('BTC/USDT', '1m', limit=1),
+                handler.get_ohlcv('BTC/USDT', '1m', limit=1),
+                handler.get_ohlcv('ETH/USDT', '1m', limit=1),
+                handler.get_ohlcv('BTC/USDT', '1m', since=5, limit=1))
+
+        results = asyncio.run(main())
+        self.assertIs(results[0], results[1])
+        self.assertEqual(len(handler.exchange.calls), 3)
+        self.assertEqual(handler.coalescer.stats(), {'calls': 3, 'coalesced': 1, 'cache_hits': 0, 'in_flight': 0})
+        asyncio.run(handler.get_ohlcv('BTC/USDT', '1m', limit=1))
+        self.assertEqual(len(handler.exchange.calls), 4)
+
+    def test_ttl_cache(self):
+        handler = make_handler({'get_ticker': 60})
+        asyncio.run(handler.get_ticker('BTC/USDT'))
+        asyncio.run(handler.get_ticker('BTC/USDT'))
+        self.assertEqual(len(handler.exchange.calls), 1)
+        handler.coalescer.invalidate('get_ticker')
+        asyncio.run(handler.get_ticker('BTC/USDT'))
+        self.assertEqual(len(handler.exchange.calls), 2)
+
+    def test_errors_reach_every_caller_and_are_not_cached(self):
+        coalescer = RequestCoalescer({'fetch': 60})
+        attempts = []
+
+        async def fetch():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise ConnectionError("timeout")
+
+        async def main():
+            return await asyncio.gather(coalescer.call('fetch', fetch), coalescer.call('fetch', fetch), return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+        asyncio.run(main())
+        self.assertEqual(len(attempts), 2)
+
+    def test_cancelled_caller_does_not_cancel_shared_request(self):
+        coalescer = RequestCoalescer()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 42
+
+        async def main():
+            first = asyncio.ensure_future(coalescer.call('fetch', fetch))
+            second = asyncio.ensure_future(coalescer.call('fetch', fetch))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 42)
+
+if __name__ == '__main__':
+    unittest.main()
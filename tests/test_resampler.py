@@ -0,0 +1,141 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from core.engine import TradingEngine
+from data.historical_data import HistoricalData
+from data.resampler import resample, Resampler, can_resample
+from utils.timeframes import timeframe_to_ms
+
+try:
+    from data.candle_store import CandleStore
+except ImportError:
+    CandleStore = None
+
+START = 1_699_999_200_000  # aligned on 1 hour
+MINUTE = 60_000
+
+def minutes(count, skip=()):
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    return [[START + i * MINUTE, close[i] - 0.1, close[i] + rng.random(), close[i] - rng.random(), close[i], float(i)]
+            for i in range(count) if i not in skip]
+
+class TestResample(unittest.TestCase):
+    def test_matches_pandas(self):
+        rows = minutes(300, skip={7, 61})
+        df = pd.DataFrame([row[1:] for row in rows], columns=['open', 'high', 'low', 'close', 'volume'],
+                          index=pd.to_datetime([row[0] for row in rows], unit='ms'))
+        expected = df.resample('15min').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+        result = resample(df, '15m')
+        self.assertEqual(len(result), 20)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+    def test_partial_bar(self):
+        rows = minutes(70)
+        self.assertEqual(len(resample(rows, '1h')), 1)
+        bars = resample(rows, '1h', include_partial=True)
+        self.assertEqual(len(bars), 2)
+        self.assertEqual(bars[1][0], START + 60 * MINUTE)
+        self.assertEqual(bars[1][5], sum(range(60, 70)))
+
+    def test_invalid_timeframes(self):
+        self.assertFalse(can_resample('5m', '7m'))
+        self.assertRaises(ValueError, resample, minutes(10), '1m')
+
+    def test_incremental_matches_batch(self):
+        rows = minutes(240, skip={59, 100})
+        resampler = Resampler(['5m', '1h'])
+        closed = {'5m': [], '1h': []}
+        for row in rows:
+            for timeframe, bar in resampler.update(*row):
+                closed[timeframe].append(bar)
+        for timeframe in closed:
+            batch = resample(rows, timeframe)
+            np.testing.assert_allclose(closed[timeframe], batch[:len(closed[timeframe])])
+        self.assertEqual(len(closed['1h']), 4)
+        self.assertIsNone(resampler.partial('1h'))
+
+    def test_bar_closes_on_its_last_minute(self):
+        resampler = Resampler(['5m'])
+        for row in minutes(4):
+            self.assertEqual(resampler.update(*row), [])
+        self.assertEqual(resampler.partial('5m')[0], START)
+        closed = resampler.update(*minutes(5)[4])
+        self.assertEqual(closed[0][1][0], START)
+
+class TestLiveResampling(unittest.TestCase):
+    def test_closed_base_candles_update_derived_timeframes(self):
+        rows = minutes(150)
+        historical_data = HistoricalData(None)
+        historical_data.data['BTC/USDT_1m'] = rows[:90]
+        historical_data.derive_timeframe('BTC/USDT', '1m', '5m')
+        historical_data.derive_timeframe('BTC/USDT', '1m', '1h')
+        historical_data.track_timeframes('BTC/USDT', '1m', ['5m', '1h'])
+        # Bar opened from tickers before the hour's last minute is folded in
+        historical_data.update_from_ticker('BTC/USDT', '1h', {'last': 1., 'timestamp': START + 120 * MINUTE})
+        for row in rows[90:]:
+            historical_data.append_candle('BTC/USDT', '1m', row)
+        for timeframe in ('5m', '1h'):
+            expected = resample(rows[:-1], timeframe)
+            window = historical_data.data.window(f'BTC/USDT_{timeframe}')
+            np.testing.assert_allclose(np.column_stack([window[column] for column in
+                                                        ('timestamp', 'open', 'high', 'low', 'close', 'volume')])[:len(expected)], expected)
+        self.assertEqual(int(historical_data.data.window('BTC/USDT_1h').timestamp[-1]), START + 120 * MINUTE)
+
+class HistoryExchangeHandler:
+    '''
+    Serves 5000 bars of any timeframe up to now, at most 1000 per call.
+    '''
+    def __init__(self):
+        self.requests = []
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append(timeframe)
+        step = timeframe_to_ms(timeframe)
+        last = int(time.time() * 1000) // step * step
+        first = last - 4999 * step if since is None else max(since - since % step, last - 4999 * step)
+        return [[t, 1., 2., 0.5, 1.5, 1.] for t in range(first, last + 1, step)][:min(limit or 500, 1000)]
+
+class TestEngineHistory(unittest.TestCase):
+    def make_engine(self):
+        config = {'exchange': {'name': 'binance', 'api_key': 'key', 'secret_key': 'secret'},
+                  'TRADING_PARAMS': {'initial_balance': 1000, 'symbols': ['BTC/USDT'], 'timeframes': ['1m', '1h', '4h']},
+                  'RISK_MANAGEMENT': {}, 'strategies': [], 'history_bars': 10, 'max_base_bars': 1000}
+        engine = TradingEngine(config)
+        asyncio.run(engine.exchange_handler.exchange.close())
+        return engine
+
+    def test_base_history_covers_derived_timeframes(self):
+        engine = self.make_engine()
+        handler = HistoryExchangeHandler()
+        engine.historical_data = HistoricalData(handler)
+        asyncio.run(engine.initialize_historical_data())
+        # 1h is derived from 600 minutes of history; 4h would need 2400 and is fetched directly
+        self.assertGreaterEqual(len(engine.historical_data.get_data('BTC/USDT', '1h')), 9)
+        self.assertEqual(set(handler.requests), {'1m', '4h'})
+        self.assertIn(('BTC/USDT', '1m'), engine.historical_data.resamplers)
+
+    @unittest.skipIf(CandleStore is None, "pyarrow is not installed")
+    def test_startup_compacts_the_store(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store = CandleStore(directory)
+            # Two runs that each stored the same old day
+            store.append('BTC/USDT', '1m', minutes(100))
+            store.append('BTC/USDT', '1m', minutes(100))
+            engine = self.make_engine()
+            engine.historical_data = HistoricalData(HistoryExchangeHandler(), store)
+            asyncio.run(engine.initialize_historical_data())
+            days = os.path.join(directory, 'BTC-USDT', '1m')
+            self.assertTrue(all(len(os.listdir(os.path.join(days, day))) == 1 for day in os.listdir(days)))
+            self.assertEqual(len(store.read('BTC/USDT', '1m', START, START + 100 * MINUTE)), 100)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
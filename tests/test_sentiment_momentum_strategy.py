@@ -138,7 +138,7 @@ class TestSentimentMomentumStrategy(asynctest.TestCase):
         low = np.array([8, 9, 11])
         close = np.array([9, 11, 14])
         atr = self.strategy.calculate_atr(high, low, close, period=3)
-        expected_atr = (4 + 3 + 6) / 3  # (12-8, 12-9, 15-11) = (4, 3, 4)
+        expected_atr = (2 + 3 + 4) / 3  # (10-8, 12-9, 15-11); the first bar has no previous close
         self.assertAlmostEqual(atr, expected_atr, places=2)
 
     def test_set_parameters_missing_param(self):
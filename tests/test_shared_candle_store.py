@@ -0,0 +1,59 @@
+import os
+import unittest
+from multiprocessing import get_context
+import numpy as np
+from data.shared_candle_store import SharedCandleBuffer, SharedCandleStore
+
+START = 1_700_000_000_000
+
+def candles(first, count):
+    return [[START + (first + i) * 60_000, 1., 2., 0.5, float(first + i), 1.] for i in range(count)]
+
+def last_close(buffer):
+    window = buffer.snapshot(1)
+    return float(window.close[-1]), len(buffer)
+
+class TestSharedCandleStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SharedCandleStore(f"test{os.getpid()}", capacity=100, create=True)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_reader_sees_writer_appends(self):
+        self.store.publish('BTC/USDT', '1m', candles(0, 10))
+        reader = SharedCandleStore(self.store.prefix)
+        window, version = reader.window('BTC/USDT', '1m')
+        self.assertEqual(len(window), 10)
+        self.assertFalse(window.close.flags.writeable)
+        self.assertRaises(ValueError, window.close.__setitem__, 0, 1.)
+
+        self.store.publish('BTC/USDT', '1m', candles(10, 5))
+        self.assertTrue(reader.buffer('BTC/USDT', '1m').is_current(version))
+        self.assertEqual(len(reader.snapshot('BTC/USDT', '1m')), 15)
+
+        self.store.buffer('BTC/USDT', '1m').append(*candles(14, 1)[0][:4], 99., 1.)
+        self.assertFalse(reader.buffer('BTC/USDT', '1m').is_current(version))
+        self.assertEqual(reader.snapshot('BTC/USDT', '1m', 1).close[-1], 99.)
+        del window
+        reader.close()
+
+    def test_full_segment_keeps_newest(self):
+        buffer = self.store.buffer('ETH/USDT', '1m')
+        buffer.extend(candles(0, 100))
+        buffer.append(*candles(100, 1)[0])
+        self.assertEqual(len(buffer), 51)
+        buffer.extend(candles(101, 120))
+        snapshot = buffer.snapshot()
+        self.assertEqual(len(snapshot), 100)
+        np.testing.assert_array_equal(snapshot.close, np.arange(121, 221, dtype=float))
+
+    def test_pool_workers_attach_by_name(self):
+        buffer = self.store.buffer('BTC/USDT', '1m')
+        buffer.extend(candles(0, 50))
+        with get_context('spawn').Pool(2) as pool:
+            results = pool.map(last_close, [buffer, buffer])
+        self.assertEqual(results, [(49., 50), (49., 50)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,20 @@ from data.exchange_data import ExchangeData
 from portfolio_management.portfolio import Portfolio
 from portfolio_management.risk_management import RiskManager
 
+def concrete(strategy_class, **kwargs):
+    '''
+    These strategies only implement generate_signals(); stub the other
+    BaseStrategy hooks so they can be instantiated.
+    '''
+    async def analyze(self, symbol, timeframe, latest_data, sentiment_score):
+        return None
+
+    async def generate_signal(self, analysis_result):
+        return None
+
+    hooks = {'update_parameters': lambda self: None, 'analyze': analyze, 'generate_signal': generate_signal}
+    return type(strategy_class.__name__, (strategy_class,), hooks)(**kwargs)
+
 class TestStrategies(unittest.TestCase):
     def setUp(self):
         # Create sample data for testing with both upward and downward trends
@@ -30,32 +44,31 @@ class TestStrategies(unittest.TestCase):
             'volume': np.random.randint(1000, 2000, 100)
         }, index=dates)
 
-        self.exchange_data = ExchangeData('binance', 'dummy_api_key', 'dummy_api_secret')
+        self.exchange_data = ExchangeData(None)
         self.exchange_data.data['BTC/USDT'] = self.sample_data
-        self.portfolio = Portfolio()
-        self.portfolio.balance = 1000  # Set initial balance
-        self.risk_manager = RiskManager()
+        self.portfolio = Portfolio(1000)
+        self.risk_manager = RiskManager({})
 
     def test_moving_average_strategy(self):
-        strategy = MovingAverageStrategy()
+        strategy = concrete(MovingAverageStrategy)
         signals = strategy.generate_signals(self.exchange_data)
         self.assertIsInstance(signals, list)
         self.assertTrue(len(signals) > 0)
 
     def test_rsi_strategy(self):
-        strategy = RSIStrategy()
+        strategy = concrete(RSIStrategy)
         signals = strategy.generate_signals(self.exchange_data)
         self.assertIsInstance(signals, list)
         self.assertTrue(len(signals) > 0)
 
     def test_bollinger_bands_strategy(self):
-        strategy = BollingerBandsStrategy()
+        strategy = concrete(BollingerBandsStrategy)
         signals = strategy.generate_signals(self.exchange_data)
         self.assertIsInstance(signals, list)
         self.assertTrue(len(signals) > 0)
 
     def test_ema_crossover_strategy(self):
-        strategy = EMACrossoverStrategy(short_window=5, long_window=10)
+        strategy = concrete(EMACrossoverStrategy, short_window=5, long_window=10)
         signals = strategy.generate_signals(self.exchange_data)
         self.assertIsInstance(signals, list)
         self.assertTrue(len(signals) > 0, "No signals were generated")
@@ -74,12 +87,14 @@ class TestStrategies(unittest.TestCase):
 
     def test_portfolio(self):
         # Simulate buying at a high price
-        self.portfolio.execute_trade({'symbol': 'BTC/USDT', 'action': 'buy', 'amount': 1, 'price': 200})
+        self.portfolio.execute_trade({'symbol': 'BTC/USDT', 'side': 'BUY', 'amount': 1, 'price': 200})
         self.assertEqual(self.portfolio.get_position('BTC/USDT'), 1)
         self.portfolio.update_status(self.exchange_data)
         
         # Simulate a price drop
-        self.exchange_data.data['BTC/USDT'].loc[self.exchange_data.data['BTC/USDT'].index[-1], 'close'] = 180
+        buffer = self.exchange_data.data.buffer('BTC/USDT')
+        last = buffer.last()
+        buffer.append(last['timestamp'], last['open'], last['high'], last['low'], 180, last['volume'])
         self.portfolio.update_status(self.exchange_data)
         
         self.assertTrue(len(self.portfolio.value_history) > 0)
@@ -87,12 +102,14 @@ class TestStrategies(unittest.TestCase):
         
         # Test other portfolio methods
         self.assertIsInstance(self.portfolio.calculate_returns(), pd.Series)
-        self.assertGreater(self.portfolio.get_total_value(self.exchange_data), 0)
+        self.assertGreater(self.exchange_data.get_total_value(self.portfolio), 0)
 
     def test_risk_management(self):
-        signal = {'symbol': 'BTC/USDT', 'action': 'buy', 'amount': 1, 'price': 100}
-        self.assertTrue(self.risk_manager.check_risk(signal, self.portfolio, self.exchange_data))
-        position_size = self.risk_manager.get_position_size('BTC/USDT')
+        signal = {'symbol': 'BTC/USDT', 'type': 'BUY', 'amount': 1, 'price': 100}
+        self.assertTrue(self.risk_manager.check_risk_reward_ratio(signal))
+        self.assertTrue(self.risk_manager.check_risk_per_trade(signal, self.portfolio))
+        stop_loss = self.risk_manager.calculate_stop_loss(signal['price'], signal['type'])
+        position_size = self.risk_manager.calculate_position_size(self.portfolio.get_balance(), 0.02, signal['price'], stop_loss)
         self.assertIsInstance(position_size, float)
         self.assertGreater(position_size, 0)
 
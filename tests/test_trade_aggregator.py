@@ -0,0 +1,114 @@
+import asyncio
+import time
+import unittest
+import numpy as np
+from core.engine import TradingEngine
+from data.candle_buffer import CandleBufferMap
+from data.historical_data import HistoricalData
+from data.market_stream import MarketStream
+from data.trade_aggregator import TradeAggregator
+
+START = 1_699_999_200_000  # aligned on 1 hour
+MINUTE = 60_000
+
+class TestTradeAggregator(unittest.TestCase):
+    def setUp(self):
+        self.closed = []
+        self.aggregator = TradeAggregator(['1m', '5m'], allowed_lateness=1_000,
+                                          on_bar_close=lambda symbol, timeframe, bar: self.closed.append((timeframe, bar)))
+
+    def test_ohlcv_from_out_of_order_trades(self):
+        self.aggregator.add_trades('BTC/USDT', [
+            (START + 10_000, 100., 1.),
+            (START + 30_000, 103., 1.),
+            (START + 5_000, 101., 2.),   # earlier trade arriving late: becomes the open
+            (START + 20_000, 99., 1.),
+        ])
+        self.assertEqual(self.closed, [])
+        self.assertEqual(self.aggregator.partial('BTC/USDT', '1m'), [[START, 101., 103., 99., 103., 5.]])
+        self.aggregator.add_trade('BTC/USDT', START + MINUTE + 500, 104., 1.)
+        self.assertEqual(self.closed, [])  # still within the allowed lateness
+        self.aggregator.add_trade('BTC/USDT', START + 59_900, 98., 1.)
+        self.aggregator.add_trade('BTC/USDT', START + MINUTE + 1_000, 105., 1.)
+        self.assertEqual(self.closed, [('1m', [START, 101., 103., 98., 98., 6.])])
+
+    def test_late_trades_are_dropped(self):
+        self.aggregator.add_trade('BTC/USDT', START, 100., 1.)
+        self.aggregator.add_trade('BTC/USDT', START + 2 * MINUTE, 100., 1.)
+        self.aggregator.add_trade('BTC/USDT', START + 30_000, 50., 1.)
+        self.assertEqual(self.aggregator.late_trades, 1)
+        self.assertEqual(self.closed[0][1][3], 100.)
+
+    def test_higher_timeframes_and_buffers(self):
+        buffers = CandleBufferMap(100)
+        self.aggregator.on_bar_close(lambda symbol, timeframe, bar: buffers.buffer(f"{symbol}_{timeframe}").append(*bar))
+        for minute in range(11):
+            self.aggregator.add_trade('ETH/USDT', START + minute * MINUTE, 10. + minute, 1.)
+        self.aggregator.advance_watermark('ETH/USDT', START + 20 * MINUTE)
+        self.assertEqual(len(buffers.window('ETH/USDT_1m')), 11)
+        five = buffers.window('ETH/USDT_5m')
+        self.assertEqual(list(five.open), [10., 15., 20.])
+        self.assertEqual(list(five.close), [14., 19., 20.])
+        self.assertEqual(list(five.volume), [5., 5., 1.])
+        self.assertEqual(self.aggregator.partial('ETH/USDT', '5m'), [])
+
+class RecentExchangeHandler:
+    '''
+    1m bars up to the current (open) minute, like an exchange's OHLCV endpoint.
+    '''
+    def __init__(self):
+        self.requests = []
+
+    async def get_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append(since)
+        now = int(time.time() * 1000)
+        return [[t, 1., 2., 0.5, 1.5, 1.] for t in range(since, now - now % MINUTE + 1, MINUTE)][:limit]
+
+class TestEngineStreamCandles(unittest.TestCase):
+    def setUp(self):
+        config = {'exchange': {'name': 'binance', 'api_key': 'key', 'secret_key': 'secret'},
+                  'TRADING_PARAMS': {'initial_balance': 1000, 'symbols': ['ETH/USDT'], 'timeframes': ['1m', '5m']},
+                  'RISK_MANAGEMENT': {}, 'strategies': []}
+        self.engine = TradingEngine(config)
+        asyncio.run(self.engine.exchange_handler.exchange.close())
+        self.engine.historical_data = HistoricalData(None)
+        history = [[START + minute * MINUTE, 1., 1., 1., 1., 1.] for minute in range(-10, 0)]
+        self.engine.historical_data.data['ETH/USDT_1m'] = history
+        self.engine.historical_data.derive_timeframe('ETH/USDT', '1m', '5m')
+        self.engine.historical_data.track_timeframes('ETH/USDT', '1m', ['5m'])
+
+    def test_higher_timeframes_have_a_single_producer(self):
+        self.engine.stream_candles(MarketStream(transport=None))
+        self.assertEqual(list(self.engine.trade_aggregator.steps), ['1m'])
+        for minute in range(11):
+            self.engine.on_trades('ETH/USDT', {'timestamp': START + minute * MINUTE, 'price': 10. + minute, 'amount': 1.})
+        self.engine.trade_aggregator.advance_watermark('ETH/USDT', START + 20 * MINUTE)
+        five = self.engine.historical_data.data.window('ETH/USDT_5m')
+        np.testing.assert_array_equal(five.timestamp, [START + minute * MINUTE for minute in (-10, -5, 0, 5)])
+        self.assertEqual(list(five.open[2:]), [10., 15.])
+        self.assertEqual(list(five.close[2:]), [14., 19.])
+        self.assertEqual(list(five.volume[2:]), [5., 5.])
+
+    def test_sequence_gap_reloads_missed_candles(self):
+        now = int(time.time() * 1000)
+        last = now - now % MINUTE - 6 * MINUTE
+        self.engine.historical_data = HistoricalData(RecentExchangeHandler())
+        self.engine.historical_data.data['ETH/USDT_1m'] = [[last + minute * MINUTE, 1., 1., 1., 1., 1.] for minute in range(-9, 1)]
+        self.engine.historical_data.track_timeframes('ETH/USDT', '1m', ['5m'])
+        stream = MarketStream(transport=None)
+        self.engine.stream_candles(stream)
+        trade = {'timestamp': last + MINUTE, 'price': 3., 'amount': 1.}
+        asyncio.run(stream.dispatch({'channel': 'trades', 'symbol': 'ETH/USDT', 'seq': 1, 'data': trade}))
+        asyncio.run(stream.dispatch({'channel': 'trades', 'symbol': 'ETH/USDT', 'seq': 4, 'data': trade}))
+
+        self.assertEqual(self.engine.historical_data.exchange_handler.requests, [last])
+        window = self.engine.historical_data.data.window('ETH/USDT_1m')
+        self.assertEqual(len(np.unique(np.diff(window.timestamp))), 1)
+        self.assertGreaterEqual(int(window.timestamp[-1]), last + 5 * MINUTE)
+        self.assertEqual(float(window.close[-1]), 1.5)
+        # The partial bar built from the trades before the gap was dropped with the trades older than the reload
+        self.assertEqual(self.engine.trade_aggregator.partial('ETH/USDT', '1m'), [])
+        self.assertGreater(len(self.engine.historical_data.data.window('ETH/USDT_5m')), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+'''
+Storage precision of the data and indicator pipeline.
+
+Candle data (ExchangeData, HistoricalData) and large indicator buffers
+(panel and parameter-sweep results) are stored in the storage dtype, float64
+by default or float32 to halve their memory. Timestamps stay int64 /
+datetime64 and every accumulation (EMA/Wilder recursions, rolling sums,
+variances) is carried out in float64 whatever the storage dtype.
+
+Error budget in float32 mode (u = 2**-24 ~ 6e-8, half an ulp):
+- stored prices and volumes: relative error <= u, i.e. 0.0006 basis points;
+  integer volumes are exact up to 2**24;
+- averages (EMA, SMA, Bollinger middle band, MACD lines): absolute error
+  <= u * max |price| over the window, since they are convex combinations;
+- differences (MACD, RSI gains/losses, true range, standard deviations):
+  absolute error <= 2u * price, so the relative error stays small as long as
+  typical bar moves are much larger than 1e-7 * price;
+- stored indicator outputs add one more rounding of at most u relative.
+'''
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+PRECISIONS = {'float32': np.float32, 'float64': np.float64}
+
+# Accumulations are always done at this precision
+ACCUMULATOR_DTYPE = np.float64
+
+_storage_dtype = np.float64
+
+
+def set_precision(name):
+    global _storage_dtype
+    if name not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {name} (expected one of {', '.join(PRECISIONS)})")
+    _storage_dtype = PRECISIONS[name]
+
+
+def get_storage_dtype():
+    return _storage_dtype
+
+
+def to_storage(values):
+    '''
+    Cast an array (or a tuple of arrays) of floating point results to the storage dtype.
+    '''
+    if isinstance(values, tuple):
+        return tuple(to_storage(value) for value in values)
+    values = np.asarray(values)
+    if values.dtype == _storage_dtype or not np.issubdtype(values.dtype, np.floating):
+        return values
+    return values.astype(_storage_dtype)
+
+
+def ohlcv_frame(ohlcv):
+    '''
+    DataFrame indexed by timestamp (from ms since epoch) with OHLCV columns in the storage dtype.
+    '''
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+    df = df.set_index('timestamp')
+    return df.astype(_storage_dtype)
@@ -0,0 +1,30 @@
+'''
+Exchange timeframe strings ('1m', '15m', '4h', '1d', '1w', ...) as durations in milliseconds.
+'''
+import re
+
+UNIT_MS = {
+    's': 1_000,
+    'm': 60_000,
+    'h': 3_600_000,
+    'd': 86_400_000,
+    'w': 604_800_000,
+}
+
+_TIMEFRAME = re.compile(r'^(\d+)([smhdw])$')
+
+
+def timeframe_to_ms(timeframe):
+    match = _TIMEFRAME.match(timeframe)
+    if match is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * UNIT_MS[match.group(2)]
+
+
+def align(timestamp, timeframe):
+    '''
+    Start (ms) of the bar containing `timestamp` (ms). Weekly bars are aligned
+    on the epoch (a Thursday); exchanges aligning weeks on Monday are not handled.
+    '''
+    step = timeframe_to_ms(timeframe)
+    return timestamp - timestamp % step